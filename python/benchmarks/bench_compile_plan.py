@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Any
+
+from omni_api import apply_plan, compile_plan
+from omni_api.planner import build_plan
+
+
+def wide_case(width: int) -> tuple[dict[str, Any], dict[str, Any]]:
+    source = {f"field_{i}": i for i in range(width)}
+    schema = {
+        "type": "object",
+        "properties": {f"field_{i}": {"type": "number"} for i in range(0, width, 2)},
+    }
+    return source, schema
+
+
+def deep_case(depth: int, fanout: int) -> tuple[dict[str, Any], dict[str, Any]]:
+    source: dict[str, Any] = {}
+    node = source
+    for level in range(depth):
+        for i in range(fanout):
+            node[f"leaf_{level}_{i}"] = level * fanout + i
+        node = node.setdefault(f"level_{level}", {})
+    schema = {
+        "type": "object",
+        "properties": {f"leaf_{level}_0": {"type": "number"} for level in range(depth)},
+    }
+    return source, schema
+
+
+def bench(name: str, source: dict[str, Any], schema: dict[str, Any], number: int) -> None:
+    plan = build_plan(source, schema)
+    compiled = compile_plan(plan, schema)
+    assert compiled(source) == apply_plan(source, schema, plan)
+
+    generic = min(timeit.repeat(lambda: apply_plan(source, schema, plan), number=number, repeat=5))
+    specialized = min(timeit.repeat(lambda: compiled(source), number=number, repeat=5))
+    print(
+        f"{name:<10} apply_plan={generic / number * 1e6:9.2f}us/record "
+        f"compiled={specialized / number * 1e6:9.2f}us/record "
+        f"speedup={generic / specialized:5.2f}x"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare apply_plan with compile_plan per record.")
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    bench("wide", *wide_case(500), number=args.number)
+    bench("deep", *deep_case(40, 4), number=args.number)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
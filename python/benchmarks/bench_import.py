@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Modules a deterministic-only import should not pay for.
+HEAVY = ("asyncio", "ssl", "urllib.request", "http.client", "sqlite3", "omni_api.llm", "omni_api.async_api")
+
+SCENARIOS = {
+    "import omni_api": "import omni_api",
+    "+ transform_async": "import omni_api; omni_api.transform_async",
+    "+ ollama provider": "import omni_api; from omni_api.providers import get_provider; get_provider('ollama')",
+}
+
+
+def import_times(statement: str) -> tuple[int, list[str]]:
+    """Microseconds spent importing from ``omni_api`` onwards, and the heavy modules loaded."""
+    probe = f"{statement}; import sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines read "import time: <self us> | <cumulative us> | <module>", children
+    # indented under their parent; top-level lines after omni_api are lazy loads.
+    total = 0
+    started = False
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        if module.strip() == "omni_api":
+            started = True
+        if started and not module.startswith("  "):
+            total += int(cumulative)
+    return total, [name for name in proc.stdout.strip().split(",") if name]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold-start import cost of omni_api (python -X importtime).")
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    for name, statement in SCENARIOS.items():
+        totals = []
+        heavy: list[str] = []
+        for _ in range(args.runs):
+            total, heavy = import_times(statement)
+            totals.append(total)
+        print(
+            f"{name:<20} min={min(totals) / 1000:6.1f} ms  median={statistics.median(totals) / 1000:6.1f} ms  "
+            f"heavy={', '.join(heavy) or '-'}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import pickle
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from omni_api.plan_types import Mapping, TransformPlan
+
+
+@dataclass(frozen=True)
+class ListMapping:
+    # Pre-slots representation, kept here for comparison.
+    from_path: str
+    to_key: str
+    op: str = "copy"
+
+
+@dataclass(frozen=True)
+class ListPlan:
+    version: str = "1"
+    mappings: list[ListMapping] = field(default_factory=list)
+    defaults: list[dict[str, Any]] = field(default_factory=list)
+    drops: list[str] = field(default_factory=list)
+    required: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+def plan_parts(i: int, width: int) -> dict[str, Any]:
+    # Paths are built fresh per plan, as they are when each plan comes from planning.
+    return {
+        "mappings": [(f"source.group_{j}.field_{j}", f"field_{j}") for j in range(width)],
+        "drops": [f"source.noise_{j}.value_{i % 7}" for j in range(width // 2)],
+        "required": [f"field_{j}" for j in range(0, width, 3)],
+    }
+
+
+def build_slotted(i: int, width: int) -> TransformPlan:
+    parts = plan_parts(i, width)
+    return TransformPlan(
+        mappings=[Mapping(from_path=f, to_key=t) for f, t in parts["mappings"]],
+        drops=parts["drops"],
+        required=parts["required"],
+    )
+
+
+def build_lists(i: int, width: int) -> ListPlan:
+    parts = plan_parts(i, width)
+    return ListPlan(
+        mappings=[ListMapping(from_path=f, to_key=t) for f, t in parts["mappings"]],
+        drops=parts["drops"],
+        required=parts["required"],
+    )
+
+
+def retained_kib(build: Callable[[int, int], Any], count: int, width: int) -> tuple[float, list[Any]]:
+    tracemalloc.start()
+    plans = [build(i, width) for i in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 1024, plans
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Memory and pickle size of cached plans.")
+    parser.add_argument("--plans", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, build in (("list-backed", build_lists), ("slotted", build_slotted)):
+        kib, plans = retained_kib(build, args.plans, args.width)
+        pickled = len(pickle.dumps(plans[0], protocol=pickle.HIGHEST_PROTOCOL))
+        print(f"{name:<12} retained={kib:9.1f} KiB for {args.plans} plans  pickle={pickled} bytes/plan")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any
+
+from omni_api.planner import SourceIndex, _flatten_paths, _normalize, _tokenize
+
+
+def linear_candidates(target_key: str, source_paths: list[str]) -> list[str]:
+    # Pre-index planner behaviour: four scans over every source path per target.
+    exact = [path for path in source_paths if path == target_key]
+    if exact:
+        return exact
+    target_norm = _normalize(target_key)
+    direct = [p for p in source_paths if "." not in p and _normalize(p) == target_norm]
+    if direct:
+        return direct
+    target_tokens = set(_tokenize(target_key))
+    tokens = [
+        p for p in source_paths
+        if "." not in p and target_tokens and target_tokens.issubset(set(_tokenize(p)))
+    ]
+    if tokens:
+        return tokens
+    return [p for p in source_paths if "." in p and _normalize(p.rsplit(".", 1)[1]) == target_norm]
+
+
+def make_case(leaves: int, targets: int) -> tuple[list[str], list[str]]:
+    source: dict[str, Any] = {}
+    for i in range(leaves):
+        group = source.setdefault(f"group_{i % 50}", {})
+        group[f"attr_{i}"] = i
+    paths = [path for path, _ in _flatten_paths(source)]
+    keys = [f"attr_{i * (leaves // targets)}" for i in range(targets)]
+    return paths, keys
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Planner candidate lookup: linear scan vs SourceIndex.")
+    parser.add_argument("--targets", type=int, default=300)
+    args = parser.parse_args()
+
+    for leaves in (500, 1000, 2000, 5000):
+        paths, keys = make_case(leaves, args.targets)
+
+        start = time.perf_counter()
+        for key in keys:
+            linear_candidates(key, paths)
+        linear = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = SourceIndex(paths)
+        for key in keys:
+            index.candidates(key)
+        indexed = time.perf_counter() - start
+
+        print(
+            f"leaves={leaves:<5} targets={args.targets:<4} linear={linear * 1e3:9.2f}ms "
+            f"index={indexed * 1e3:7.2f}ms speedup={linear / indexed:7.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Any
+
+from omni_api.planner import build_plan, replan, shape_diff
+
+
+def make_case(width: int, targets: int) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+    source: dict[str, Any] = {f"field_{i}": i for i in range(width)}
+    source["address"] = {f"line_{i}": i for i in range(width // 10)}
+    schema = {
+        "type": "object",
+        "properties": {f"field_{i * (width // targets)}": {} for i in range(targets)},
+    }
+    schema["properties"]["postal_code"] = {}
+    # Typical producer drift: one new field, one new nested field, one field gone.
+    drifted = dict(source, tracking_id="t-1")
+    drifted["address"] = dict(source["address"], postal_code="00000")
+    del drifted["field_1"]
+    return source, drifted, schema
+
+
+def best(fn: Any, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Full build_plan vs incremental replan after a small shape drift.")
+    parser.add_argument("--targets", type=int, default=50)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    for width in (500, 2000, 10000):
+        source, drifted, schema = make_case(width, args.targets)
+        previous = build_plan(source, schema)
+        added, removed = shape_diff(previous, drifted)
+        assert replan(previous, drifted, schema, added=added, removed=removed) == build_plan(drifted, schema)
+
+        full = best(lambda: build_plan(drifted, schema), args.number)
+        incremental = best(lambda: replan(previous, drifted, schema, added=added, removed=removed), args.number)
+        with_diff = best(lambda: replan(previous, drifted, schema, added=added, removed=removed), args.number)
+        with_diff += best(lambda: shape_diff(previous, drifted), args.number)
+        print(
+            f"width={width:<6} build_plan={full * 1e3:8.3f} ms  replan={incremental * 1e3:7.3f} ms "
+            f"({full / incremental:6.1f}x)  shape_diff+replan={with_diff * 1e3:7.3f} ms ({full / with_diff:5.1f}x)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
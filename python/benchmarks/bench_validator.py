@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Any
+
+from omni_api import compile_schema
+from omni_api.validator import validate_payload
+
+PY_TYPES: dict[str, Any] = {
+    "string": str,
+    "number": (int, float),
+    "integer": int,
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+    "null": type(None),
+}
+
+
+def naive_validate(payload: dict[str, Any], schema: dict[str, Any]) -> list[str]:
+    # Re-reads the schema dict on every call, as a generic interpreter would.
+    properties = schema["properties"]
+    errors = [f"unknown key {key}" for key in payload if key not in properties]
+    errors += [f"missing {key}" for key in schema.get("required", []) if key not in payload]
+    for key, value in payload.items():
+        spec = properties.get(key, {})
+        declared = spec.get("type")
+        if declared is None:
+            continue
+        kinds = [declared] if isinstance(declared, str) else declared
+        ok = False
+        for kind in kinds:
+            expected = PY_TYPES.get(kind)
+            if expected is None or (isinstance(value, expected) and not (isinstance(value, bool) and kind != "boolean")):
+                ok = True
+                break
+        if not ok:
+            errors.append(f"{key}: expected {declared}")
+    return errors
+
+
+def make_case(width: int) -> tuple[dict[str, Any], dict[str, Any]]:
+    kinds = ["string", "integer", "number", "boolean", ["string", "null"]]
+    samples = {"string": "x", "integer": 7, "number": 1.5, "boolean": True}
+    properties: dict[str, Any] = {}
+    payload: dict[str, Any] = {}
+    for i in range(width):
+        kind = kinds[i % len(kinds)]
+        properties[f"field_{i}"] = {"type": kind}
+        payload[f"field_{i}"] = samples[kind] if isinstance(kind, str) else None
+    schema = {"type": "object", "properties": properties, "required": list(properties)[: width // 4]}
+    return payload, schema
+
+
+def best(fn: Any, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compiled type-checking validator vs per-call interpretation.")
+    parser.add_argument("--width", type=int, nargs="*", default=[10, 50, 200])
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    for width in args.width:
+        payload, schema = make_case(width)
+        compiled = compile_schema(schema)
+        required = compiled.required
+        assert naive_validate(payload, schema) == []
+        validate_payload(payload, compiled, required)
+
+        naive = best(lambda: naive_validate(payload, schema), args.number)
+        fast = best(lambda: validate_payload(payload, compiled, required), args.number)
+        raw = best(lambda: validate_payload(payload, schema, required), args.number)
+        print(
+            f"width={width:<4} naive={naive * 1e6:8.2f} us  compiled={fast * 1e6:8.2f} us  "
+            f"dict schema={raw * 1e6:8.2f} us  speedup={naive / fast:5.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
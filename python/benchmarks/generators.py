@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import dataclass
+from typing import Any
+
+SEED = 20240601
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    source: dict[str, Any]
+    schema: dict[str, Any]
+
+
+def _schema(keys: list[str], required: int = 0, kind: str = "string") -> dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": {key: {"type": kind} for key in keys},
+        "required": keys[:required],
+    }
+
+
+def wide(width: int = 2000, targets: int = 200) -> Case:
+    source = {f"field_{i}": f"value_{i}" for i in range(width)}
+    keys = [f"field_{i * (width // targets)}" for i in range(targets)]
+    return Case("wide", source, _schema(keys, required=10))
+
+
+def deep(depth: int = 30, fanout: int = 5) -> Case:
+    source: dict[str, Any] = {}
+    node = source
+    for level in range(depth):
+        for i in range(fanout):
+            node[f"leaf_{level}_{i}"] = level * fanout + i
+        node = node.setdefault(f"level_{level}", {})
+    keys = [f"leaf_{level}_0" for level in range(depth)]
+    return Case("deep", source, _schema(keys, required=5, kind="integer"))
+
+
+def many_targets(targets: int = 500, width: int = 300) -> Case:
+    rng = random.Random(SEED)
+    source = {f"src_attr_{i}": i for i in range(width)}
+    keys = [f"attr_{rng.randrange(width * 2)}_{i}" for i in range(targets)]
+    return Case("many_targets", source, _schema(keys, kind="integer"))
+
+
+def ambiguous_leaf(groups: int = 200, targets: int = 50) -> Case:
+    source = {
+        f"group_{g}": {f"attr_{t}": f"{g}-{t}" for t in range(targets)} for g in range(groups)
+    }
+    keys = [f"attr_{t}" for t in range(targets)]
+    return Case("ambiguous_leaf", source, _schema(keys))
+
+
+def array_items(items: int = 10000) -> Case:
+    source = {
+        "order_id": "o-1",
+        "items": [
+            {"sku": f"sku-{i}", "qty": i % 7, "price": {"amount": i / 10}, "note": None}
+            for i in range(items)
+        ],
+    }
+    item = _schema(["sku", "qty", "amount"], required=1)
+    item["properties"].update(qty={"type": "integer"}, amount={"type": "number"})
+    schema = {
+        "type": "object",
+        "properties": {"order_id": {"type": "string"}, "items": {"type": "array", "items": item}},
+        "required": ["order_id"],
+    }
+    return Case("array_items", source, schema)
+
+
+def large_llm_text(prose_words: int = 20000) -> str:
+    rng = random.Random(SEED)
+    words = ["model", "output", "{return x;}", "note:", "the", "payload", "braces", "\"quoted\""]
+    prose = " ".join(rng.choice(words) for _ in range(prose_words))
+    payload = json.dumps({"name": "Jane", "items": [{"sku": i} for i in range(200)]})
+    return f"Thinking...\n{prose}\nFinal answer:\n```json\n{payload}\n```\n{prose}"
+
+
+def plan_cases() -> list[Case]:
+    return [wide(), deep(), many_targets(), ambiguous_leaf(), array_items()]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable
+
+from omni_api import PlanCache, apply_plan, compile_plan, compile_schema, transform
+from omni_api.api import _plan_cache_key
+from omni_api.jsonscan import IncrementalJsonScanner
+from omni_api.llm import _extract_json_object
+from omni_api.planner import build_plan
+from omni_api.validator import validate_payload
+
+from . import generators
+
+Result = dict[str, Any]
+
+
+def measure(fn: Callable[[], Any], min_time: float, repeat: int) -> tuple[float, float]:
+    timer = timeit.Timer(fn)
+    single = max(timer.timeit(number=1), 1e-7)
+    number = max(1, int(min_time / single))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1024
+
+
+def _scan(text: str) -> dict[str, Any] | None:
+    return IncrementalJsonScanner().feed(text)
+
+
+def stages_for(case: generators.Case) -> dict[str, Callable[[], Any]]:
+    source, schema = case.source, case.schema
+    compiled_schema = compile_schema(schema)
+    plan = build_plan(source, compiled_schema)
+    compiled = compile_plan(plan, compiled_schema)
+    payload, _ = compiled(source)
+    cache = PlanCache()
+    cache.put(_plan_cache_key(source, compiled_schema), compiled)
+    return {
+        "build_plan": lambda: build_plan(source, compiled_schema),
+        "apply_plan": lambda: apply_plan(source, compiled_schema, plan),
+        "compiled_plan": lambda: compiled(source),
+        "validate_payload": lambda: validate_payload(payload, compiled_schema, plan.required),
+        "plan_cache_hit": lambda: cache.get(_plan_cache_key(source, compiled_schema)),
+        "transform": lambda: transform(source, compiled_schema, plan_cache=cache),
+        # The documented entry point: a plain dict schema, compiled behind the scenes.
+        "transform_dict_schema": lambda: transform(source, schema, plan_cache=cache),
+        "transform_counts": lambda: transform(source, compiled_schema, plan_cache=cache, report="counts"),
+        "transform_no_report": lambda: transform(source, compiled_schema, plan_cache=cache, report="none"),
+    }
+
+
+def run_suite(min_time: float, repeat: int, only: set[str] | None = None) -> list[Result]:
+    jobs: list[tuple[str, str, Callable[[], Any]]] = []
+    for case in generators.plan_cases():
+        for stage, fn in stages_for(case).items():
+            jobs.append((case.name, stage, fn))
+    text = generators.large_llm_text()
+    jobs.append(("large_llm_text", "extract_json_object", lambda: _extract_json_object(text)))
+    jobs.append(("large_llm_text", "incremental_scanner", lambda: _scan(text)))
+
+    results: list[Result] = []
+    for case_name, stage, fn in jobs:
+        if only and stage not in only and case_name not in only:
+            continue
+        seconds, peak_kib = measure(fn, min_time, repeat)
+        result = {
+            "case": case_name,
+            "stage": stage,
+            "us_per_op": round(seconds * 1e6, 3),
+            "ops_per_sec": round(1 / seconds, 1),
+            "peak_kib": round(peak_kib, 1),
+        }
+        results.append(result)
+        print(
+            f"{case_name:<16} {stage:<20} {result['us_per_op']:>12.2f} us/op "
+            f"{result['ops_per_sec']:>12.1f} ops/s {result['peak_kib']:>10.1f} KiB peak",
+            flush=True,
+        )
+    return results
+
+
+def compare(results: list[Result], baseline: list[Result], threshold: float) -> list[str]:
+    previous = {(r["case"], r["stage"]): r for r in baseline}
+    regressions: list[str] = []
+    for result in results:
+        before = previous.get((result["case"], result["stage"]))
+        if before is None:
+            continue
+        for metric in ("us_per_op", "peak_kib"):
+            if before[metric] > 0 and result[metric] > before[metric] * (1 + threshold):
+                regressions.append(
+                    f"{result['case']}/{result['stage']} {metric}: "
+                    f"{before[metric]} -> {result[metric]} (+{result[metric] / before[metric] - 1:.0%})"
+                )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="omni_api per-stage benchmark suite")
+    parser.add_argument("--out", help="write JSON results to this path")
+    parser.add_argument("--compare", metavar="BASELINE", help="fail if results regress against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown ratio (default: 0.25)")
+    parser.add_argument("--quick", action="store_true", help="shorter timing runs for smoke checks")
+    parser.add_argument("--only", nargs="*", help="restrict to these case or stage names")
+    args = parser.parse_args(argv)
+
+    min_time, repeat = (0.02, 1) if args.quick else (0.2, 5)
+    results = run_suite(min_time, repeat, set(args.only) if args.only else None)
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "seed": generators.SEED,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
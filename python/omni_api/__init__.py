@@ -1,15 +1,99 @@
+from typing import TYPE_CHECKING, Any
+
 from .adapters import to_ollama_payload
-from .api import transform
-from .errors import TransformSchemaError, TransformValidationError
-from .plan_types import Mapping, TransformPlan, TransformReport, TransformResult
+from .api import transform, transform_many
+from .columnar import transform_columnar
+from .errors import TransformPlanError, TransformSchemaError, TransformValidationError
+from .executor import CompiledPlan, apply_plan, compile_plan
+from .fanout import transform_fanout
+from .llm_cache import LLMCacheStats, LLMResponseCache
+from .metrics import MetricsCollector, TransformObserver, register_observer, unregister_observer
+from .plan_cache import PlanCache, PlanCacheStats, default_plan_cache
+from .plan_store import PlanStore, dump_plan, load_plan
+from .plan_types import (
+    ColumnarResult,
+    Mapping,
+    RecordError,
+    ReportCounts,
+    TransformPlan,
+    TransformReport,
+    TransformResult,
+)
+from .planner import PlannerOptions
+from .providers import LLMProvider, available_providers, register_provider, unregister_provider
+from .registry import SchemaRegistry, default_schema_registry
+from .schema import CompiledSchema, compile_schema
+from .singleflight import SingleFlight, SingleFlightStats, default_singleflight
+
+if TYPE_CHECKING:
+    from .async_api import AsyncOllamaClient, transform_async, transform_many_async
+
+# asyncio, ssl and the HTTP client stack are only imported on first use.
+_LAZY = {
+    "AsyncOllamaClient": ".async_api",
+    "transform_async": ".async_api",
+    "transform_many_async": ".async_api",
+}
 
 __all__ = [
+    "AsyncOllamaClient",
+    "ColumnarResult",
+    "CompiledPlan",
+    "CompiledSchema",
+    "LLMCacheStats",
+    "LLMProvider",
+    "LLMResponseCache",
     "Mapping",
+    "MetricsCollector",
+    "PlanCache",
+    "PlanCacheStats",
+    "PlanStore",
+    "PlannerOptions",
+    "RecordError",
+    "ReportCounts",
+    "SchemaRegistry",
+    "SingleFlight",
+    "SingleFlightStats",
+    "TransformObserver",
     "TransformPlan",
+    "TransformPlanError",
     "TransformReport",
     "TransformResult",
     "TransformSchemaError",
     "TransformValidationError",
+    "apply_plan",
+    "available_providers",
+    "compile_plan",
+    "compile_schema",
+    "default_plan_cache",
+    "default_schema_registry",
+    "default_singleflight",
+    "dump_plan",
+    "load_plan",
+    "register_observer",
+    "register_provider",
     "to_ollama_payload",
     "transform",
+    "transform_async",
+    "transform_columnar",
+    "transform_fanout",
+    "transform_many",
+    "transform_many_async",
+    "unregister_observer",
+    "unregister_provider",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(__all__)
@@ -1,151 +1,360 @@
-import json
-import re
-from urllib import error, request
-from typing import Any
+from dataclasses import replace
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable, Iterable, Iterator
 
 from .errors import TransformSchemaError, TransformValidationError
-from .executor import apply_plan
-from .plan_types import TransformPlan, TransformReport, TransformResult
-from .planner import build_plan
+from .executor import CompiledPlan, compile_plan
+from .llm_cache import LLMResponseCache
+from .metrics import Probe, make_probe
+from .plan_cache import PlanCache, default_plan_cache, shape_fingerprint
+from .plan_types import RecordError, TransformPlan, TransformResult
+from .planner import PlannerOptions, build_plan
+from .providers import get_provider
+from .registry import SchemaRegistry, default_schema_registry
+from .schema import CompiledSchema, SchemaLike, as_compiled
 from .validator import validate_payload
 
+LLM_MODES = ("payload", "plan")
+REPORT_MODES = ("full", "counts", "none")
 
-REQUIRED_SCHEMA_KEYS = {"type", "properties", "required"}
 
+def _plan_cache_key(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    variant: tuple[str, ...] = (),
+    options: PlannerOptions | None = None,
+) -> tuple[Any, ...]:
+    if options is None:
+        return (shape_fingerprint(source_payload), schema.content_hash, *variant)
+    fingerprint = shape_fingerprint(source_payload, options.max_depth, options.max_nodes)
+    return (fingerprint, schema.content_hash, *variant)
 
-def _validate_schema_subset(target_schema: dict[str, Any]) -> None:
-    if target_schema.get("type") != "object":
-        raise TransformSchemaError("Only object root schema is supported in MVP")
-
-    properties = target_schema.get("properties")
-    if not isinstance(properties, dict):
-        raise TransformSchemaError("Schema must define object properties as a dict")
-
-    unknown = set(target_schema.keys()) - REQUIRED_SCHEMA_KEYS
-    if unknown:
-        raise TransformSchemaError(f"Unsupported top-level schema keys: {sorted(unknown)}")
 
+def _cached_plan(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    plan_cache: PlanCache | None,
+    make_plan: Callable[[dict[str, Any], CompiledSchema], TransformPlan] = build_plan,
+    variant: tuple[str, ...] = (),
+    probe: Probe | None = None,
+    options: PlannerOptions | None = None,
+) -> CompiledPlan:
+    start = perf_counter() if probe is not None else 0.0
+    if plan_cache is None:
+        compiled = compile_plan(make_plan(source_payload, schema), schema)
+    else:
+        key = _plan_cache_key(source_payload, schema, variant, options)
+        compiled = plan_cache.get(key)
+        if probe is not None:
+            probe.event("plan_cache.hit" if compiled is not None else "plan_cache.miss")
+        if compiled is None:
+            compiled = _stored_plan(source_payload, schema, plan_cache, variant, probe)
+            if compiled is None:
+                compiled = compile_plan(make_plan(source_payload, schema), schema)
+            plan_cache.put(key, compiled)
+    if probe is not None:
+        probe.stage("plan", start)
+    return compiled
 
-def _extract_json_object(text: str) -> dict[str, Any]:
-    candidates: list[str] = []
 
-    # Prefer fenced code blocks first.
-    for match in re.finditer(r"```(?:json)?\s*(\{.*?\})\s*```", text, flags=re.DOTALL | re.IGNORECASE):
-        candidates.append(match.group(1).strip())
+def _stored_plan(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    plan_cache: PlanCache,
+    variant: tuple[str, ...],
+    probe: Probe | None,
+) -> CompiledPlan | None:
+    store = plan_cache.store
+    if store is None:
+        return None
+    compiled = store.get(source_payload, schema, variant)
+    if probe is not None:
+        probe.event("plan_store.hit" if compiled is not None else "plan_store.miss")
+    if compiled is None and store.strict:
+        raise TransformValidationError(
+            f"No pinned plan in {store.root} for this source shape and schema {schema.content_hash[:12]}"
+        )
+    return compiled
 
-    # Fallback: scan for balanced braces and collect substrings.
-    stack: list[int] = []
-    for i, ch in enumerate(text):
-        if ch == "{":
-            stack.append(i)
-        elif ch == "}" and stack:
-            start = stack.pop()
-            if not stack:  # only capture outermost balanced spans
-                candidates.append(text[start : i + 1].strip())
 
-    for raw in candidates:
-        try:
-            parsed = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        if isinstance(parsed, dict):
-            return parsed
-
-    # Final fallback: try from first '{' to last '}'.
-    first = text.find("{")
-    last = text.rfind("}")
-    if first != -1 and last != -1 and first < last:
-        try:
-            parsed = json.loads(text[first : last + 1])
-            if isinstance(parsed, dict):
-                return parsed
-        except json.JSONDecodeError:
-            pass
-
-    raise TransformValidationError(f"Failed to parse LLM JSON payload: {text}")
-
-
-def _build_alignment_prompt(source_payload: dict[str, Any], target_schema: dict[str, Any]) -> str:
-    return (
-        "You are a payload alignment engine.\n"
-        "Given source_payload and target_schema, return ONLY ONE JSON object aligned to target_schema.\n"
-        "Rules:\n"
-        "- Output must be a single JSON object, no markdown, no fences, no prose.\n"
-        "- Include only keys defined in target_schema.properties.\n"
-        "- Fill required fields; map/rename as needed from source_payload.\n"
-        "- Exclude unknown fields.\n\n"
-        f"source_payload:\n{json.dumps(source_payload, ensure_ascii=True)}\n\n"
-        f"target_schema:\n{json.dumps(target_schema, ensure_ascii=True)}\n"
+def _planner(
+    options: PlannerOptions | None,
+) -> tuple[Callable[[dict[str, Any], CompiledSchema], TransformPlan], tuple[str, ...]]:
+    if options is None:
+        return build_plan, ()
+    make_plan = partial(
+        build_plan,
+        max_depth=options.max_depth,
+        max_nodes=options.max_nodes,
+        drops=options.drops,
     )
+    return make_plan, options.variant
 
 
-def _ollama_generate(
+def _run_plan(
     source_payload: dict[str, Any],
-    target_schema: dict[str, Any],
-    model: str,
-    base_url: str,
-    timeout: float = 60.0,
-) -> dict[str, Any]:
-    prompt = _build_alignment_prompt(source_payload, target_schema)
-    body = json.dumps({"model": model, "prompt": prompt, "stream": False}).encode("utf-8")
-    req = request.Request(
-        f"{base_url.rstrip('/')}/api/generate",
-        data=body,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
+    schema: CompiledSchema,
+    compiled: CompiledPlan,
+    probe: Probe | None = None,
+    report: str = "full",
+    coerce: bool = False,
+) -> TransformResult:
+    if probe is None:
+        payload, details = compiled(source_payload, report)
+        # validate_payload raises on missing required fields, so the compiled
+        # report's empty missing_required is already final.
+        validate_payload(payload, schema, compiled.plan.required, coerce=coerce)
+        return TransformResult(payload=payload, plan=compiled.plan, report=details)
+
+    start = perf_counter()
+    payload, details = compiled(source_payload, report)
+    probe.stage("apply", start)
+    start = perf_counter()
+    validate_payload(payload, schema, compiled.plan.required, coerce=coerce)
+    probe.stage("validate", start)
+    return TransformResult(payload=payload, plan=compiled.plan, report=details)
+
+
+def _observe_start(probe: Probe, source_payload: dict[str, Any]) -> None:
+    probe.event("payload.source_keys", len(source_payload))
+
+
+def _observe_error(probe: Probe, exc: Exception) -> None:
+    probe.event("errors.validation" if isinstance(exc, TransformValidationError) else "errors.other")
+
+
+def _observe_finish(probe: Probe, result: TransformResult) -> TransformResult:
+    probe.event("payload.output_keys", len(result.payload))
+    probe.stage("total", probe.started)
+    if probe.timings is None or result.report is None:
+        return result
+    return replace(result, report=replace(result.report, timings=dict(probe.timings)))
+
+
+def _check_errors_mode(errors: str) -> None:
+    if errors not in ("raise", "collect"):
+        raise ValueError(f"errors must be 'raise' or 'collect', got {errors!r}")
+
+
+def _lookup_schema(
+    target_schema: SchemaLike | None,
+    route: str | None,
+    registry: SchemaRegistry | None,
+) -> CompiledSchema:
+    if route is None:
+        if target_schema is None:
+            raise TypeError("either target_schema or route is required")
+        return as_compiled(target_schema, validate=True)
+    if target_schema is not None:
+        raise TypeError("pass either target_schema or route, not both")
+    return (registry if registry is not None else default_schema_registry).get(route)
 
+
+def _resolve_schema(
+    target_schema: SchemaLike | None,
+    probe: Probe | None,
+    route: str | None = None,
+    registry: SchemaRegistry | None = None,
+) -> CompiledSchema:
+    if probe is None:
+        return _lookup_schema(target_schema, route, registry)
+    start = perf_counter()
     try:
-        with request.urlopen(req, timeout=timeout) as resp:
-            payload = json.loads(resp.read().decode("utf-8"))
-    except error.HTTPError as exc:
-        body = exc.read().decode("utf-8", errors="replace")
-        raise TransformValidationError(
-            f"Ollama HTTP error {exc.code}: {body}"
-        ) from exc
-    except error.URLError as exc:
-        raise TransformValidationError(f"Ollama connection failed: {exc}") from exc
+        schema = _lookup_schema(target_schema, route, registry)
+    except TransformSchemaError:
+        probe.event("errors.schema")
+        raise
+    probe.stage("schema", start)
+    return schema
+
+
+def _check_report_mode(report: str, timings: bool = False) -> None:
+    if report not in REPORT_MODES:
+        raise ValueError(f"report must be one of {REPORT_MODES}, got {report!r}")
+    if timings and report == "none":
+        # Timings are returned on the report; there is nowhere to put them.
+        raise ValueError("timings=True requires a report; use report='counts' or 'full'")
+
+
+def _check_llm_mode(llm_mode: str) -> None:
+    if llm_mode not in LLM_MODES:
+        raise ValueError(f"llm_mode must be one of {LLM_MODES}, got {llm_mode!r}")
+
+
+def _transform_validated(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    *,
+    llm_provider: str | None,
+    llm_model: str | None,
+    llm_base_url: str | None,
+    plan_cache: PlanCache | None,
+    llm_cache: LLMResponseCache | None = None,
+    llm_mode: str = "payload",
+    llm_stream: bool = False,
+    planner_options: PlannerOptions | None = None,
+    report: str = "full",
+    coerce: bool = False,
+    probe: Probe | None = None,
+) -> TransformResult:
+    if llm_provider is not None:
+        # The LLM stack and the provider's transport are only imported here.
+        from .llm import _transform_llm
 
-    if not isinstance(payload, dict) or "response" not in payload:
-        raise TransformValidationError(f"Unexpected Ollama response shape: {payload}")
+        return _transform_llm(
+            source_payload,
+            schema,
+            get_provider(llm_provider),
+            llm_model=llm_model,
+            llm_base_url=llm_base_url,
+            plan_cache=plan_cache,
+            llm_cache=llm_cache,
+            llm_mode=llm_mode,
+            llm_stream=llm_stream,
+            report=report,
+            coerce=coerce,
+            probe=probe,
+        )
 
-    return _extract_json_object(str(payload["response"]))
+    make_plan, variant = _planner(planner_options)
+    compiled = _cached_plan(source_payload, schema, plan_cache, make_plan, variant, probe, planner_options)
+    return _run_plan(source_payload, schema, compiled, probe, report, coerce)
 
 
 def transform(
     source_payload: dict[str, Any],
-    target_schema: dict[str, Any],
+    target_schema: SchemaLike | None = None,
     *,
+    route: str | None = None,
+    registry: SchemaRegistry | None = None,
     llm_provider: str | None = None,
     llm_model: str | None = None,
-    llm_base_url: str = "http://127.0.0.1:11434",
+    llm_base_url: str | None = None,
+    llm_cache: LLMResponseCache | None = None,
+    llm_mode: str = "payload",
+    llm_stream: bool = False,
+    planner_options: PlannerOptions | None = None,
+    report: str = "full",
+    coerce: bool = False,
+    plan_cache: PlanCache | None = default_plan_cache,
+    timings: bool = False,
 ) -> TransformResult:
-    _validate_schema_subset(target_schema)
-
-    if llm_provider == "ollama":
-        model = llm_model or "llama3.1:latest"
-        payload = _ollama_generate(source_payload, target_schema, model=model, base_url=llm_base_url)
-        missing_required = validate_payload(
-            payload,
-            target_schema,
-            [key for key in target_schema.get("required", []) if isinstance(key, str)],
-        )
-        report = TransformReport(
-            mapped=sorted(payload.keys()),
-            dropped=[],
-            missing_required=missing_required,
-            warnings=["aligned via ollama llm"],
+    _check_llm_mode(llm_mode)
+    _check_report_mode(report, timings)
+    probe = make_probe(timings)
+    schema = _resolve_schema(target_schema, probe, route, registry)
+    if probe is not None:
+        _observe_start(probe, source_payload)
+    try:
+        result = _transform_validated(
+            source_payload,
+            schema,
+            llm_provider=llm_provider,
+            llm_model=llm_model,
+            llm_base_url=llm_base_url,
+            plan_cache=plan_cache,
+            llm_cache=llm_cache,
+            llm_mode=llm_mode,
+            llm_stream=llm_stream,
+            planner_options=planner_options,
+            report=report,
+            coerce=coerce,
+            probe=probe,
         )
-        return TransformResult(payload=payload, plan=TransformPlan(), report=report)
+    except Exception as exc:
+        if probe is not None:
+            _observe_error(probe, exc)
+        raise
+    return result if probe is None else _observe_finish(probe, result)
 
-    plan = build_plan(source_payload, target_schema)
-    payload, report = apply_plan(source_payload, target_schema, plan)
-    missing_required = validate_payload(payload, target_schema, plan.required)
 
-    final_report = TransformReport(
-        mapped=report.mapped,
-        dropped=report.dropped,
-        missing_required=missing_required,
-        warnings=report.warnings,
+def transform_many(
+    records: Iterable[dict[str, Any]],
+    target_schema: SchemaLike | None = None,
+    *,
+    route: str | None = None,
+    registry: SchemaRegistry | None = None,
+    errors: str = "raise",
+    llm_provider: str | None = None,
+    llm_model: str | None = None,
+    llm_base_url: str | None = None,
+    llm_cache: LLMResponseCache | None = None,
+    llm_mode: str = "payload",
+    llm_stream: bool = False,
+    planner_options: PlannerOptions | None = None,
+    report: str = "full",
+    coerce: bool = False,
+    plan_cache: PlanCache | None = default_plan_cache,
+    timings: bool = False,
+) -> Iterator[TransformResult | RecordError]:
+    schema = _resolve_schema(target_schema, make_probe(), route, registry)
+    _check_errors_mode(errors)
+    _check_llm_mode(llm_mode)
+    _check_report_mode(report, timings)
+
+    # Plans are always reused within a batch, even when the shared cache is opted out.
+    cache = plan_cache if plan_cache is not None else PlanCache()
+    return _iter_transform(
+        records,
+        schema,
+        collect_errors=errors == "collect",
+        llm_provider=llm_provider,
+        llm_model=llm_model,
+        llm_base_url=llm_base_url,
+        plan_cache=cache,
+        llm_cache=llm_cache,
+        llm_mode=llm_mode,
+        llm_stream=llm_stream,
+        planner_options=planner_options,
+        report=report,
+        coerce=coerce,
+        timings=timings,
     )
-    return TransformResult(payload=payload, plan=plan, report=final_report)
+
+
+def _iter_transform(
+    records: Iterable[dict[str, Any]],
+    schema: CompiledSchema,
+    *,
+    collect_errors: bool,
+    llm_provider: str | None,
+    llm_model: str | None,
+    llm_base_url: str | None,
+    plan_cache: PlanCache,
+    llm_cache: LLMResponseCache | None,
+    llm_mode: str,
+    llm_stream: bool,
+    planner_options: PlannerOptions | None,
+    report: str,
+    coerce: bool,
+    timings: bool = False,
+) -> Iterator[TransformResult | RecordError]:
+    for index, record in enumerate(records):
+        probe = make_probe(timings)
+        if probe is not None:
+            _observe_start(probe, record)
+        try:
+            result = _transform_validated(
+                record,
+                schema,
+                llm_provider=llm_provider,
+                llm_model=llm_model,
+                llm_base_url=llm_base_url,
+                plan_cache=plan_cache,
+                llm_cache=llm_cache,
+                llm_mode=llm_mode,
+                llm_stream=llm_stream,
+                planner_options=planner_options,
+                report=report,
+                coerce=coerce,
+                probe=probe,
+            )
+        except TransformValidationError as exc:
+            if probe is not None:
+                _observe_error(probe, exc)
+            if not collect_errors:
+                raise
+            yield RecordError(index=index, source_payload=record, error=exc)
+        else:
+            yield result if probe is None else _observe_finish(probe, result)
@@ -0,0 +1,576 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import ssl
+from collections import deque
+from time import perf_counter
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+from urllib.parse import urlsplit
+
+from .api import (
+    _check_errors_mode,
+    _check_llm_mode,
+    _check_report_mode,
+    _observe_error,
+    _observe_finish,
+    _observe_start,
+    _plan_cache_key,
+    _resolve_schema,
+    _run_plan,
+    _stored_plan,
+    _transform_validated,
+)
+from .errors import TransformValidationError
+from .executor import compile_plan
+from .jsonscan import IncrementalJsonScanner
+from .llm import (
+    _build_alignment_prompt,
+    _build_plan_prompt,
+    _extract_json_object,
+    _llm_plan_warning,
+    _llm_result,
+    _plan_from_llm,
+)
+from .llm_cache import LLMResponseCache, llm_cache_key
+from .metrics import Probe, make_probe
+from .plan_cache import PlanCache, default_plan_cache
+from .plan_types import RecordError, TransformResult
+from .planner import PlannerOptions, _flatten_paths
+from .providers import LLMProvider, get_provider
+from .providers.ollama import DEFAULT_BASE_URL, _decode_json, _stream_fragment
+from .registry import SchemaRegistry
+from .schema import CompiledSchema, SchemaLike
+from .singleflight import default_singleflight
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+_Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+_T = TypeVar("_T")
+
+
+class _RetryableError(Exception):
+    pass
+
+
+class AsyncOllamaClient:
+    """Keep-alive HTTP/1.1 client for Ollama with bounded concurrency and retries."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        *,
+        max_in_flight: int = 4,
+        timeout: float = 60.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+    ) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported Ollama base URL: {base_url}")
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._host = parts.hostname or "127.0.0.1"
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self._prefix = parts.path.rstrip("/")
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._idle: deque[_Connection] = deque()
+        self.connections_opened = 0
+
+    async def __aenter__(self) -> AsyncOllamaClient:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        while self._idle:
+            _, writer = self._idle.popleft()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def generate(self, model: str, prompt: str) -> str:
+        body = json.dumps({"model": model, "prompt": prompt, "stream": False}).encode("utf-8")
+        payload = await self.post_json("/api/generate", body)
+        if not isinstance(payload, dict) or "response" not in payload:
+            raise TransformValidationError(f"Unexpected Ollama response shape: {payload}")
+        return str(payload["response"])
+
+    async def generate_object(self, model: str, prompt: str) -> dict[str, Any]:
+        """Stream a generation and return its first complete JSON object, closing early."""
+        body = json.dumps({"model": model, "prompt": prompt, "stream": True}).encode("utf-8")
+        return await self._with_retries(lambda: self._stream_object("/api/generate", body))
+
+    async def post_json(self, path: str, body: bytes) -> Any:
+        data = await self._with_retries(lambda: self._request(path, body))
+        return _decode_json(data)
+
+    async def _with_retries(self, attempt_request: Callable[[], Awaitable[_T]]) -> _T:
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                try:
+                    return await asyncio.wait_for(attempt_request(), timeout=self.timeout)
+                except (_RetryableError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+                    if attempt >= self.retries:
+                        if isinstance(exc, _RetryableError):
+                            raise TransformValidationError(str(exc)) from exc
+                        raise TransformValidationError(f"Ollama connection failed: {exc!r}") from exc
+                    await asyncio.sleep(self.backoff * (2**attempt))
+                    attempt += 1
+
+    async def _connect(self) -> _Connection:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        self.connections_opened += 1
+        return await asyncio.open_connection(self._host, self._port, ssl=self._ssl)
+
+    async def _send(self, path: str, body: bytes) -> tuple[_Connection, int, dict[str, str]]:
+        reader, writer = await self._connect()
+        try:
+            head = (
+                f"POST {self._prefix}{path} HTTP/1.1\r\n"
+                f"Host: {self._host}:{self._port}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: keep-alive\r\n\r\n"
+            )
+            writer.write(head.encode("ascii") + body)
+            await writer.drain()
+            status, headers = await _read_head(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return (reader, writer), status, headers
+
+    def _release(self, connection: _Connection, headers: dict[str, str]) -> None:
+        reusable = "content-length" in headers or "transfer-encoding" in headers
+        if not reusable or headers.get("connection", "").lower() == "close":
+            connection[1].close()
+        else:
+            self._idle.append(connection)
+
+    async def _read_all(self, connection: _Connection, headers: dict[str, str]) -> bytes:
+        try:
+            data = b"".join([piece async for piece in _iter_body(connection[0], headers)])
+        except BaseException:
+            connection[1].close()
+            raise
+        self._release(connection, headers)
+        return data
+
+    async def _request(self, path: str, body: bytes) -> bytes:
+        connection, status, headers = await self._send(path, body)
+        data = await self._read_all(connection, headers)
+        _raise_for_status(status, data)
+        return data
+
+    async def _stream_object(self, path: str, body: bytes) -> dict[str, Any]:
+        connection, status, headers = await self._send(path, body)
+        if status >= 400:
+            _raise_for_status(status, await self._read_all(connection, headers))
+
+        scanner = IncrementalJsonScanner()
+        fragments: list[str] = []
+        pending = b""
+        try:
+            async for piece in _iter_body(connection[0], headers):
+                *lines, pending = (pending + piece).split(b"\n")
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    text, _ = _stream_fragment(line)
+                    fragments.append(text)
+                    if scanner.feed(text) is not None:
+                        # The rest of the stream is abandoned, so the
+                        # connection cannot be reused.
+                        connection[1].close()
+                        return scanner.result
+        except BaseException:
+            connection[1].close()
+            raise
+
+        self._release(connection, headers)
+        if pending.strip():
+            fragments.append(_stream_fragment(pending)[0])
+        return _extract_json_object("".join(fragments))
+
+
+def _raise_for_status(status: int, data: bytes) -> None:
+    if status < 400:
+        return
+    message = f"Ollama HTTP error {status}: {data.decode('utf-8', errors='replace')}"
+    if status in RETRYABLE_STATUS:
+        raise _RetryableError(message)
+    raise TransformValidationError(message)
+
+
+async def _read_head(reader: asyncio.StreamReader) -> tuple[int, dict[str, str]]:
+    status_line = await reader.readuntil(b"\r\n")
+    parts = status_line.decode("latin-1").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ConnectionError(f"Malformed HTTP status line: {status_line!r}")
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return int(parts[1]), headers
+
+
+async def _iter_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> AsyncIterator[bytes]:
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining > 0:
+            piece = await reader.read(min(remaining, 65536))
+            if not piece:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(piece)
+            yield piece
+    else:
+        while piece := await reader.read(65536):
+            yield piece
+
+
+def _provider_client(llm_provider: str, base_url: str | None, max_in_flight: int = 4) -> Any:
+    provider: LLMProvider = get_provider(llm_provider)
+    return provider.async_client(base_url or provider.default_base_url, max_in_flight=max_in_flight)
+
+
+async def _generate_async(
+    client: Any,
+    prompt: str,
+    model: str,
+    stream: bool,
+    probe: Probe | None = None,
+) -> dict[str, Any]:
+    start = perf_counter() if probe is not None else 0.0
+    try:
+        if stream:
+            return await client.generate_object(model, prompt)
+        return _extract_json_object(await client.generate(model, prompt))
+    finally:
+        if probe is not None:
+            probe.stage("llm", start)
+
+
+async def _generate_cached_async(
+    client: Any,
+    provider: LLMProvider,
+    prompt: str,
+    model: str,
+    base_url: str,
+    llm_cache: LLMResponseCache | None,
+    stream: bool = False,
+    probe: Probe | None = None,
+) -> tuple[dict[str, Any], bool]:
+    key = llm_cache_key(provider.name, base_url, model, prompt)
+    if llm_cache is not None:
+        payload = llm_cache.get(key)
+        if probe is not None:
+            probe.event("llm_cache.hit" if payload is not None else "llm_cache.miss")
+        if payload is not None:
+            return payload, True
+    payload, shared = await default_singleflight.do_async(
+        key, lambda: _generate_async(client, prompt, model, stream, probe)
+    )
+    if shared:
+        if probe is not None:
+            probe.event("llm.coalesced")
+    elif llm_cache is not None:
+        llm_cache.put(key, payload)
+    return payload, False
+
+
+async def _transform_validated_async(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    *,
+    llm_provider: str | None,
+    llm_model: str | None,
+    client: Any,
+    plan_cache: PlanCache | None,
+    llm_base_url: str | None = None,
+    llm_cache: LLMResponseCache | None = None,
+    llm_mode: str = "payload",
+    llm_stream: bool = False,
+    planner_options: PlannerOptions | None = None,
+    report: str = "full",
+    coerce: bool = False,
+    probe: Probe | None = None,
+) -> TransformResult:
+    if llm_provider is None:
+        return _transform_validated(
+            source_payload,
+            schema,
+            llm_provider=llm_provider,
+            llm_model=llm_model,
+            llm_base_url="",
+            plan_cache=plan_cache,
+            planner_options=planner_options,
+            report=report,
+            coerce=coerce,
+            probe=probe,
+        )
+    assert client is not None
+    provider = get_provider(llm_provider)
+    model = llm_model or provider.default_model
+    # A caller-supplied client is keyed by the base URL it was asked for.
+    base_url = llm_base_url or provider.default_base_url
+
+    if llm_mode == "plan":
+        start = perf_counter() if probe is not None else 0.0
+        key = _plan_cache_key(source_payload, schema, (provider.name, model))
+        compiled = plan_cache.get(key) if plan_cache is not None else None
+        if probe is not None and plan_cache is not None:
+            probe.event("plan_cache.hit" if compiled is not None else "plan_cache.miss")
+        if compiled is None and plan_cache is not None:
+            compiled = _stored_plan(source_payload, schema, plan_cache, (provider.name, model), probe)
+            if compiled is not None:
+                plan_cache.put(key, compiled)
+        if compiled is None:
+            source_paths = [path for path, _ in _flatten_paths(source_payload)]
+            prompt = _build_plan_prompt(source_paths, dict(schema.source))
+            raw, cache_hit = await _generate_cached_async(
+                client, provider, prompt, model, base_url, llm_cache, llm_stream, probe
+            )
+            plan = _plan_from_llm(raw, source_paths, schema, _llm_plan_warning(provider, model, cache_hit))
+            compiled = compile_plan(plan, schema)
+            if plan_cache is not None:
+                plan_cache.put(key, compiled)
+        if probe is not None:
+            probe.stage("plan", start)
+        return _run_plan(source_payload, schema, compiled, probe, report, coerce)
+
+    prompt = _build_alignment_prompt(source_payload, dict(schema.source))
+    payload, cache_hit = await _generate_cached_async(
+        client, provider, prompt, model, base_url, llm_cache, llm_stream, probe
+    )
+    return _llm_result(payload, schema, provider, cache_hit, probe, report, coerce)
+
+
+async def _observed_async(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    probe: Probe | None,
+    **options: Any,
+) -> TransformResult:
+    if probe is None:
+        return await _transform_validated_async(source_payload, schema, **options)
+    _observe_start(probe, source_payload)
+    try:
+        result = await _transform_validated_async(source_payload, schema, probe=probe, **options)
+    except Exception as exc:
+        _observe_error(probe, exc)
+        raise
+    return _observe_finish(probe, result)
+
+
+async def transform_async(
+    source_payload: dict[str, Any],
+    target_schema: SchemaLike | None = None,
+    *,
+    route: str | None = None,
+    registry: SchemaRegistry | None = None,
+    llm_provider: str | None = None,
+    llm_model: str | None = None,
+    llm_base_url: str | None = None,
+    client: Any = None,
+    llm_cache: LLMResponseCache | None = None,
+    llm_mode: str = "payload",
+    llm_stream: bool = False,
+    planner_options: PlannerOptions | None = None,
+    report: str = "full",
+    coerce: bool = False,
+    plan_cache: PlanCache | None = default_plan_cache,
+    timings: bool = False,
+) -> TransformResult:
+    probe = make_probe(timings)
+    schema = _resolve_schema(target_schema, probe, route, registry)
+    _check_llm_mode(llm_mode)
+    _check_report_mode(report, timings)
+    if llm_provider is not None and client is None:
+        async with _provider_client(llm_provider, llm_base_url) as owned:
+            return await _observed_async(
+                source_payload,
+                schema,
+                probe,
+                llm_provider=llm_provider,
+                llm_model=llm_model,
+                llm_base_url=llm_base_url,
+                client=owned,
+                plan_cache=plan_cache,
+                llm_cache=llm_cache,
+                llm_mode=llm_mode,
+                llm_stream=llm_stream,
+                planner_options=planner_options,
+                report=report,
+                coerce=coerce,
+            )
+    return await _observed_async(
+        source_payload,
+        schema,
+        probe,
+        llm_provider=llm_provider,
+        llm_model=llm_model,
+        llm_base_url=llm_base_url,
+        client=client,
+        plan_cache=plan_cache,
+        llm_cache=llm_cache,
+        llm_mode=llm_mode,
+        llm_stream=llm_stream,
+        planner_options=planner_options,
+        report=report,
+        coerce=coerce,
+    )
+
+
+def transform_many_async(
+    records: Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]],
+    target_schema: SchemaLike | None = None,
+    *,
+    route: str | None = None,
+    registry: SchemaRegistry | None = None,
+    errors: str = "raise",
+    llm_provider: str | None = None,
+    llm_model: str | None = None,
+    llm_base_url: str | None = None,
+    max_in_flight: int = 4,
+    client: Any = None,
+    llm_cache: LLMResponseCache | None = None,
+    llm_mode: str = "payload",
+    llm_stream: bool = False,
+    planner_options: PlannerOptions | None = None,
+    report: str = "full",
+    coerce: bool = False,
+    plan_cache: PlanCache | None = default_plan_cache,
+    timings: bool = False,
+) -> AsyncIterator[TransformResult | RecordError]:
+    schema = _resolve_schema(target_schema, make_probe(), route, registry)
+    _check_errors_mode(errors)
+    _check_llm_mode(llm_mode)
+    _check_report_mode(report, timings)
+    if max_in_flight < 1:
+        raise ValueError("max_in_flight must be >= 1")
+
+    return _iter_transform_async(
+        records,
+        schema,
+        collect_errors=errors == "collect",
+        llm_provider=llm_provider,
+        llm_model=llm_model,
+        llm_base_url=llm_base_url,
+        max_in_flight=max_in_flight,
+        client=client,
+        plan_cache=plan_cache if plan_cache is not None else PlanCache(),
+        llm_cache=llm_cache,
+        llm_mode=llm_mode,
+        llm_stream=llm_stream,
+        planner_options=planner_options,
+        report=report,
+        coerce=coerce,
+        timings=timings,
+    )
+
+
+async def _iter_transform_async(
+    records: Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]],
+    schema: CompiledSchema,
+    *,
+    collect_errors: bool,
+    llm_provider: str | None,
+    llm_model: str | None,
+    llm_base_url: str | None,
+    max_in_flight: int,
+    client: Any,
+    plan_cache: PlanCache,
+    llm_cache: LLMResponseCache | None,
+    llm_mode: str,
+    llm_stream: bool,
+    planner_options: PlannerOptions | None,
+    report: str,
+    coerce: bool,
+    timings: bool = False,
+) -> AsyncIterator[TransformResult | RecordError]:
+    owned = None
+    if llm_provider is not None and client is None:
+        owned = client = _provider_client(llm_provider, llm_base_url, max_in_flight)
+    pending: deque[tuple[int, dict[str, Any], asyncio.Task[TransformResult]]] = deque()
+
+    async def drain_one() -> TransformResult | RecordError:
+        index, record, task = pending.popleft()
+        try:
+            return await task
+        except TransformValidationError as exc:
+            if not collect_errors:
+                raise
+            return RecordError(index=index, source_payload=record, error=exc)
+
+    try:
+        async for index, record in _aenumerate(records):
+            task = asyncio.ensure_future(
+                _observed_async(
+                    record,
+                    schema,
+                    make_probe(timings),
+                    llm_provider=llm_provider,
+                    llm_model=llm_model,
+                    llm_base_url=llm_base_url,
+                    client=client,
+                    plan_cache=plan_cache,
+                    llm_cache=llm_cache,
+                    llm_mode=llm_mode,
+                    llm_stream=llm_stream,
+                    planner_options=planner_options,
+                    report=report,
+                    coerce=coerce,
+                )
+            )
+            pending.append((index, record, task))
+            # Results are yielded in input order; the window bounds memory and
+            # the client's semaphore bounds requests actually in flight.
+            if len(pending) >= max_in_flight:
+                yield await drain_one()
+        while pending:
+            yield await drain_one()
+    finally:
+        for _, _, task in pending:
+            task.cancel()
+        if owned is not None:
+            await owned.aclose()
+
+
+async def _aenumerate(
+    records: Iterable[dict[str, Any]] | AsyncIterable[dict[str, Any]],
+) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+    index = 0
+    if isinstance(records, AsyncIterable):
+        async for record in records:
+            yield index, record
+            index += 1
+    else:
+        for record in records:
+            yield index, record
+            index += 1
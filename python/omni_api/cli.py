@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import islice
+from typing import IO, Iterable, Iterator, Union
+
+from .api import _transform_validated
+from .errors import TransformPlanError, TransformSchemaError, TransformValidationError
+from .plan_cache import PlanCache
+from .plan_store import PlanStore
+from .registry import DEFAULT_SCHEMA_DIR, SchemaRegistry
+from .schema import CompiledSchema, compile_schema
+
+DEFAULT_CHUNK_SIZE = 500
+
+# Input lines stay undecoded bytes until a worker parses them, so one invalid
+# UTF-8 byte fails that record rather than the whole run.
+Line = tuple[str, int, Union[bytes, str]]
+ChunkResult = tuple[list[str], list[str]]
+
+_worker_schema: CompiledSchema | None = None
+_worker_plan_cache: PlanCache | None = None
+
+
+def _init_worker(
+    schema: CompiledSchema,
+    plan_store: str | PlanStore | None = None,
+    strict: bool = False,
+) -> None:
+    global _worker_schema, _worker_plan_cache
+    _worker_schema = schema
+    store = PlanStore(plan_store, strict=strict) if isinstance(plan_store, str) else plan_store
+    _worker_plan_cache = PlanCache(store=store)
+
+
+def _error_line(source: str, line_no: int, exc: Exception) -> str:
+    return json.dumps(
+        {"source": source, "line": line_no, "type": type(exc).__name__, "error": str(exc)}
+    )
+
+
+def _process_chunk(chunk: list[Line]) -> ChunkResult:
+    assert _worker_schema is not None
+    results: list[str] = []
+    errors: list[str] = []
+    for source, line_no, text in chunk:
+        try:
+            record = json.loads(text)
+            if not isinstance(record, dict):
+                raise TransformValidationError("Input record must be a JSON object")
+            result = _transform_validated(
+                record,
+                _worker_schema,
+                llm_provider=None,
+                llm_model=None,
+                llm_base_url="",
+                plan_cache=_worker_plan_cache,
+                report="none",
+            )
+        except (json.JSONDecodeError, UnicodeDecodeError, TransformValidationError) as exc:
+            errors.append(_error_line(source, line_no, exc))
+            continue
+        results.append(json.dumps(result.payload))
+    return results, errors
+
+
+def _read_lines(streams: Iterable[tuple[str, IO[bytes]]]) -> Iterator[Line]:
+    for name, stream in streams:
+        for line_no, text in enumerate(stream, start=1):
+            if text.strip():
+                yield name, line_no, text
+
+
+def _chunks(lines: Iterator[Line], size: int) -> Iterator[list[Line]]:
+    while chunk := list(islice(lines, size)):
+        yield chunk
+
+
+def _run_serial(chunks: Iterator[list[Line]]) -> Iterator[ChunkResult]:
+    for chunk in chunks:
+        yield _process_chunk(chunk)
+
+
+def _run_pool(
+    chunks: Iterator[list[Line]],
+    workers: int,
+    schema: CompiledSchema,
+    plan_store: str | None = None,
+    strict: bool = False,
+) -> Iterator[ChunkResult]:
+    # Keep a bounded window of chunks in flight and yield them in submission
+    # order, so output order is stable and memory does not grow with input size.
+    window = workers * 2
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(schema, plan_store, strict),
+    ) as pool:
+        pending: deque[Future[ChunkResult]] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_process_chunk, chunk))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="omni-api",
+        description="Transform newline-delimited JSON records against a target schema.",
+    )
+    parser.add_argument("inputs", nargs="*", help="NDJSON input files ('-' or none for stdin)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("-s", "--schema", help="target JSON schema file")
+    target.add_argument("--route", help="target schema route 'provider/endpoint' in --schemas")
+    parser.add_argument(
+        "--schemas",
+        default=DEFAULT_SCHEMA_DIR,
+        help=f"schema registry root for --route (default: {DEFAULT_SCHEMA_DIR})",
+    )
+    parser.add_argument("-o", "--output", default="-", help="NDJSON output for payloads (default: stdout)")
+    parser.add_argument("-e", "--errors", default="-", help="NDJSON output for errors (default: stderr)")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="worker processes (default: 1)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"records per worker task (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument("--plan-store", metavar="DIR", help="load pinned plans from this PlanStore directory")
+    parser.add_argument(
+        "--strict-plans",
+        action="store_true",
+        help="fail records whose shape has no pinned plan instead of planning them",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+    if args.strict_plans and not args.plan_store:
+        parser.error("--strict-plans requires --plan-store")
+
+    store: PlanStore | None = None
+    try:
+        if args.route is not None:
+            schema = SchemaRegistry(args.schemas, reload_interval=None).get(args.route)
+        else:
+            with open(args.schema, encoding="utf-8") as handle:
+                schema = compile_schema(json.load(handle))
+        # Opened here so a broken store is reported before any worker starts.
+        if args.plan_store is not None:
+            store = PlanStore(args.plan_store, strict=args.strict_plans)
+    except (OSError, TransformSchemaError, TransformPlanError) as exc:
+        print(f"omni-api: {exc}", file=sys.stderr)
+        return 2
+    except json.JSONDecodeError as exc:
+        print(f"omni-api: {args.schema}: invalid JSON: {exc}", file=sys.stderr)
+        return 2
+
+    with ExitStack() as stack:
+        streams: list[tuple[str, IO[bytes]]] = []
+        try:
+            for path in args.inputs or ["-"]:
+                if path == "-":
+                    streams.append(("<stdin>", getattr(sys.stdin, "buffer", sys.stdin)))
+                else:
+                    streams.append((path, stack.enter_context(open(path, "rb"))))
+            out = sys.stdout if args.output == "-" else stack.enter_context(
+                open(args.output, "w", encoding="utf-8")
+            )
+            err = sys.stderr if args.errors == "-" else stack.enter_context(
+                open(args.errors, "w", encoding="utf-8")
+            )
+        except OSError as exc:
+            print(f"omni-api: {exc}", file=sys.stderr)
+            return 2
+
+        chunks = _chunks(_read_lines(streams), args.chunk_size)
+        if args.workers == 1:
+            _init_worker(schema, store)
+            results = _run_serial(chunks)
+        else:
+            results = _run_pool(chunks, args.workers, schema, args.plan_store, args.strict_plans)
+
+        failed = 0
+        for payloads, errors in results:
+            for line in payloads:
+                out.write(line + "\n")
+            for line in errors:
+                err.write(line + "\n")
+            failed += len(errors)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
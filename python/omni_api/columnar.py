@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import copy
+from typing import Any, Sequence, Union
+
+from .api import _cached_plan, _check_errors_mode, _planner, _resolve_schema
+from .errors import TransformValidationError
+from .executor import _MISSING, CompiledPlan
+from .metrics import make_probe
+from .plan_cache import PlanCache, default_plan_cache
+from .plan_types import ColumnarResult, TransformReport
+from .planner import PlannerOptions
+from .registry import SchemaRegistry
+from .schema import SchemaLike
+
+Records = Union[Sequence[dict[str, Any]], dict[str, Sequence[Any]]]
+
+
+def _descend(values: list[Any], parts: Sequence[str]) -> list[Any]:
+    # One comprehension per path segment: the per-cell work is a dict lookup.
+    for part in parts:
+        values = [
+            value.get(part, _MISSING) if isinstance(value, dict) else _MISSING for value in values
+        ]
+    return values
+
+
+def _row_column(records: Sequence[dict[str, Any]], parts: tuple[str, ...]) -> list[Any]:
+    first, rest = parts[0], parts[1:]
+    return _descend([record.get(first, _MISSING) for record in records], rest)
+
+
+def _column_column(columns: dict[str, Sequence[Any]], parts: tuple[str, ...], rows: int) -> list[Any]:
+    # Columns may be keyed by full dotted paths or by a prefix holding dicts.
+    for split in range(len(parts), 0, -1):
+        column = columns.get(".".join(parts[:split]))
+        if column is not None:
+            return _descend(list(column), parts[split:])
+    return [_MISSING] * rows
+
+
+def _nest(flat: dict[str, Any]) -> dict[str, Any]:
+    nested: dict[str, Any] = {}
+    for path, value in flat.items():
+        node = nested
+        *parents, leaf = path.split(".")
+        for part in parents:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                child = node[part] = {}
+            node = child
+        node[leaf] = value
+    return nested
+
+
+def _fill(value: Any, count: int) -> list[Any]:
+    if isinstance(value, (dict, list)):
+        return [copy.deepcopy(value) for _ in range(count)]
+    return [value] * count
+
+
+def _to_numpy(columns: dict[str, list[Any]]) -> dict[str, Any]:
+    try:
+        import numpy as np
+    except ImportError as exc:
+        raise ImportError(
+            "as_numpy=True requires NumPy (pip install 'omni-api-transformer[numpy]')"
+        ) from exc
+    return {key: np.asarray(values) for key, values in columns.items()}
+
+
+def transform_columnar(
+    records: Records,
+    target_schema: SchemaLike | None = None,
+    *,
+    route: str | None = None,
+    registry: SchemaRegistry | None = None,
+    errors: str = "raise",
+    as_numpy: bool = False,
+    plan_cache: PlanCache | None = default_plan_cache,
+    planner_options: PlannerOptions | None = None,
+    coerce: bool = False,
+) -> ColumnarResult:
+    schema = _resolve_schema(target_schema, make_probe(), route, registry)
+    _check_errors_mode(errors)
+
+    if isinstance(records, dict):
+        lengths = {len(column) for column in records.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"All columns must have the same length, got {sorted(lengths)}")
+        rows = lengths.pop() if lengths else 0
+        sample = _nest({path: column[0] for path, column in records.items()}) if rows else {}
+    else:
+        rows = len(records)
+        sample = records[0] if rows else {}
+
+    # Batches are assumed homogeneous: the first row's shape selects the plan,
+    # and cells that do not resolve under it are reported as missing.
+    make_plan, variant = _planner(planner_options)
+    compiled: CompiledPlan = _cached_plan(sample, schema, plan_cache, make_plan, variant, options=planner_options)
+    defaults = compiled.defaults
+
+    columns: dict[str, list[Any]] = {}
+    missing: dict[str, list[int]] = {}
+    # Wildcard and each mappings gather the column at the path's head, then
+    # expand each cell.
+    for to_key, parts, expand in compiled.columns():
+        if to_key in columns:
+            continue
+        if not parts:
+            values = [_MISSING] * rows
+        elif isinstance(records, dict):
+            values = _column_column(records, parts, rows)
+        else:
+            values = _row_column(records, parts)
+        if expand is not None:
+            values = [expand(value) for value in values]
+        holes = [index for index, value in enumerate(values) if value is _MISSING]
+        if holes:
+            fallback = defaults.get(to_key)
+            for index in holes:
+                values[index] = copy.deepcopy(fallback)
+            if to_key not in defaults:
+                missing[to_key] = holes
+        columns[to_key] = values
+    for key, value in defaults.items():
+        if key not in columns:
+            columns[key] = _fill(value, rows)
+
+    invalid: dict[str, list[int]] = {}
+    mismatched: list[str] = []
+    validator = schema.validator
+    for to_key, values in columns.items():
+        # Unresolved cells are skipped like keys absent from a record.
+        bad, problem = validator.check_column(to_key, values, missing.get(to_key, ()), coerce)
+        if bad:
+            invalid[to_key] = bad
+            mismatched.append(f"{problem} in {len(bad)} of {rows} rows")
+
+    warnings = list(compiled.plan.warnings)
+    for to_key, holes in missing.items():
+        warnings.append(f"Missing source for target '{to_key}' in {len(holes)} of {rows} rows")
+    warnings += [f"Type mismatch: {problem}" for problem in mismatched]
+
+    missing_required = sorted(
+        key for key in compiled.plan.required if key in missing or (rows and key not in columns)
+    )
+    if missing_required and errors == "raise":
+        raise TransformValidationError(f"Missing required fields: {missing_required}")
+    if mismatched and errors == "raise":
+        raise TransformValidationError(f"Type mismatch: {mismatched}")
+
+    ordered = {key: columns[key] for key in schema.properties if key in columns}
+    report = TransformReport(
+        mapped=sorted(key for key in ordered if len(missing.get(key, ())) < rows),
+        dropped=sorted(compiled.plan.drops),
+        missing_required=missing_required,
+        warnings=warnings,
+    )
+    return ColumnarResult(
+        columns=_to_numpy(ordered) if as_numpy else ordered,
+        rows=rows,
+        plan=compiled.plan,
+        report=report,
+        missing=missing,
+        invalid=invalid,
+    )
@@ -4,3 +4,7 @@ class TransformSchemaError(ValueError):
 
 class TransformValidationError(ValueError):
     """Raised when transformed payload fails required validation checks."""
+
+
+class TransformPlanError(ValueError):
+    """Raised when a serialized transform plan cannot be loaded."""
@@ -1,26 +1,51 @@
 from __future__ import annotations
 
-from typing import Any
+import copy
+from functools import partial
+from typing import Any, Callable
 
-from .plan_types import TransformPlan, TransformReport
+from .plan_types import WILDCARD, Mapping, ReportCounts, TransformPlan, TransformReport
+from .schema import CompiledSchema, SchemaLike, as_compiled
 
+_MISSING = object()
 
-def _get_by_path(payload: dict[str, Any], path: str) -> Any:
+
+def _lookup(payload: Any, path: tuple[str, ...]) -> Any:
     current: Any = payload
-    for part in path.split("."):
+    for position, part in enumerate(path):
+        if part == WILDCARD:
+            # Elements the rest of the path does not resolve in become None,
+            # so the output stays aligned with the source list.
+            if not isinstance(current, list):
+                return _MISSING
+            rest = path[position + 1 :]
+            values = [_lookup(item, rest) for item in current]
+            return [None if value is _MISSING else value for value in values]
         if not isinstance(current, dict) or part not in current:
-            raise KeyError(path)
+            return _MISSING
         current = current[part]
     return current
 
 
+def _item_schema(schema: CompiledSchema, mapping: Mapping) -> SchemaLike:
+    item_schema = schema.item_schemas.get(mapping.to_key)
+    if item_schema is not None:
+        return item_schema
+    # Hand-written plans may target a property the schema does not describe
+    # as array-of-object; the sub-plan's own keys are allowed then.
+    assert mapping.items is not None
+    keys = [m.to_key for m in mapping.items.mappings] + [d["key"] for d in mapping.items.defaults]
+    return {"type": "object", "properties": {key: {} for key in keys}, "required": []}
+
+
 def apply_plan(
     source_payload: dict[str, Any],
-    target_schema: dict[str, Any],
+    target_schema: SchemaLike,
     plan: TransformPlan,
-) -> tuple[dict[str, Any], TransformReport]:
-    properties = target_schema.get("properties", {})
-    allowed_keys = set(properties.keys())
+    report: str = "full",
+) -> tuple[dict[str, Any], TransformReport | ReportCounts | None]:
+    schema = as_compiled(target_schema)
+    allowed_keys = schema.allowed
 
     payload: dict[str, Any] = {}
     mapped: list[str] = []
@@ -29,9 +54,10 @@ def apply_plan(
     for mapping in plan.mappings:
         if mapping.to_key not in allowed_keys:
             continue
-        try:
-            value = _get_by_path(source_payload, mapping.from_path)
-        except KeyError:
+        value = _lookup(source_payload, mapping.path)
+        if mapping.items is not None and value is not _MISSING:
+            value = _apply_each(value, _item_schema(schema, mapping), mapping.items)
+        if value is _MISSING:
             warnings.append(
                 f"Missing source path '{mapping.from_path}' for target '{mapping.to_key}'"
             )
@@ -39,12 +65,224 @@ def apply_plan(
         payload[mapping.to_key] = value
         mapped.append(mapping.to_key)
 
+    for key, value in _defaults(plan, allowed_keys):
+        if key not in payload:
+            payload[key] = copy.deepcopy(value)
+
+    if report == "none":
+        return payload, None
+    if report == "counts":
+        return payload, ReportCounts(
+            mapped=len(set(mapped)), dropped=len(plan.drops), warnings=len(warnings)
+        )
+
     dropped = list(plan.drops)
 
-    report = TransformReport(
+    full = TransformReport(
         mapped=sorted(set(mapped)),
         dropped=sorted(dropped),
         missing_required=[],
         warnings=warnings,
     )
-    return payload, report
+    return payload, full
+
+
+def _apply_each(value: Any, item_schema: SchemaLike, items: TransformPlan) -> Any:
+    if not isinstance(value, list):
+        return _MISSING
+    return [
+        apply_plan(item, item_schema, items, report="none")[0]
+        for item in value
+        if isinstance(item, dict)
+    ]
+
+
+def _defaults(plan: TransformPlan, allowed_keys: frozenset[str]) -> list[tuple[str, Any]]:
+    return [
+        (default["key"], default.get("value"))
+        for default in plan.defaults
+        if default.get("key") in allowed_keys
+    ]
+
+
+class CompiledPlan:
+    """Plan specialized against a schema; behaves like ``apply_plan`` with the plan bound."""
+
+    __slots__ = ("plan", "_getters", "_arrays", "_defaults", "_mapped", "_dropped", "_warnings")
+
+    def __init__(self, plan: TransformPlan, target_schema: SchemaLike) -> None:
+        schema = as_compiled(target_schema)
+        allowed_keys = schema.allowed
+        self.plan = plan
+        mappings = [mapping for mapping in plan.mappings if mapping.to_key in allowed_keys]
+        self._getters: tuple[tuple[str, tuple[str, ...], str], ...] = tuple(
+            (mapping.to_key, mapping.path, mapping.from_path)
+            for mapping in mappings
+            if mapping.items is None and WILDCARD not in mapping.path
+        )
+        # Wildcard and each mappings: the path is split at the first "*" and
+        # each sub-plan is compiled once for all elements.
+        self._arrays: tuple[tuple[str, tuple[str, ...], tuple[str, ...], str, CompiledPlan | None], ...] = tuple(
+            (
+                mapping.to_key,
+                *_split_wildcard(mapping.path),
+                mapping.from_path,
+                None if mapping.items is None else CompiledPlan(mapping.items, _item_schema(schema, mapping)),
+            )
+            for mapping in mappings
+            if mapping.items is not None or WILDCARD in mapping.path
+        )
+        self._defaults = tuple(_defaults(plan, allowed_keys))
+        self._mapped = sorted({mapping.to_key for mapping in mappings})
+        self._dropped = sorted(plan.drops)
+        self._warnings = list(plan.warnings)
+
+    def __call__(
+        self,
+        source_payload: dict[str, Any],
+        report: str = "full",
+        resolved: dict[tuple[str, ...], Any] | None = None,
+    ) -> tuple[dict[str, Any], TransformReport | ReportCounts | None]:
+        payload: dict[str, Any] = {}
+        missing: list[tuple[str, str]] | None = None
+
+        if resolved is None:
+            for to_key, parts, from_path in self._getters:
+                current: Any = source_payload
+                for part in parts:
+                    if not isinstance(current, dict) or part not in current:
+                        break
+                    current = current[part]
+                else:
+                    payload[to_key] = current
+                    continue
+                if missing is None:
+                    missing = []
+                missing.append((from_path, to_key))
+        else:
+            # Lookups shared with other plans run against the same source.
+            for to_key, parts, from_path in self._getters:
+                value = resolved.get(parts, _MISSING)
+                if value is _MISSING and parts not in resolved:
+                    value = resolved[parts] = _lookup(source_payload, parts)
+                if value is not _MISSING:
+                    payload[to_key] = value
+                    continue
+                if missing is None:
+                    missing = []
+                missing.append((from_path, to_key))
+
+        if self._arrays:
+            for to_key, head, tail, from_path, sub in self._arrays:
+                value = _expand(_lookup(source_payload, head), tail, sub)
+                if value is not _MISSING:
+                    payload[to_key] = value
+                    continue
+                if missing is None:
+                    missing = []
+                missing.append((from_path, to_key))
+
+        if report != "full":
+            mapped_count = len(payload)
+            for key, value in self._defaults:
+                if key not in payload:
+                    payload[key] = copy.deepcopy(value)
+            if report == "none":
+                return payload, None
+            return payload, ReportCounts(
+                mapped=mapped_count,
+                dropped=len(self._dropped),
+                warnings=len(self._warnings) + (len(missing) if missing else 0),
+            )
+
+        if missing is None:
+            mapped = self._mapped.copy()
+            warnings = self._warnings.copy()
+        else:
+            mapped = sorted(set(payload))
+            warnings = self._warnings + [
+                f"Missing source path '{from_path}' for target '{to_key}'"
+                for from_path, to_key in missing
+            ]
+
+        for key, value in self._defaults:
+            if key not in payload:
+                payload[key] = copy.deepcopy(value)
+
+        full = TransformReport(
+            mapped=mapped,
+            dropped=self._dropped.copy(),
+            missing_required=[],
+            warnings=warnings,
+        )
+        return payload, full
+
+    @property
+    def defaults(self) -> dict[str, Any]:
+        """Schema defaults filled in for target keys left unmapped."""
+        return dict(self._defaults)
+
+    def columns(self) -> list[tuple[str, tuple[str, ...], Callable[[Any], Any] | None]]:
+        """``(to_key, head, expand)`` per mapping, for running the plan column-wise.
+
+        ``head`` is the source path to look up; ``expand``, when set, maps the
+        value found there to the target value (wildcard tails and ``each``
+        sub-plans). Unresolved cells stay the ``_MISSING`` sentinel.
+        """
+        columns: list[tuple[str, tuple[str, ...], Callable[[Any], Any] | None]] = [
+            (to_key, parts, None) for to_key, parts, _ in self._getters
+        ]
+        columns += [
+            (to_key, head, partial(_expand, tail=tail, sub=sub))
+            for to_key, head, tail, _, sub in self._arrays
+        ]
+        return columns
+
+    def _each(self, items: Any) -> Any:
+        # Per-element loop of a sub-plan: no report, non-dict elements skipped.
+        if not isinstance(items, list):
+            return _MISSING
+        getters, arrays, defaults = self._getters, self._arrays, self._defaults
+        output: list[dict[str, Any]] = []
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            payload: dict[str, Any] = {}
+            for to_key, parts, _ in getters:
+                current: Any = item
+                for part in parts:
+                    if not isinstance(current, dict) or part not in current:
+                        break
+                    current = current[part]
+                else:
+                    payload[to_key] = current
+            for to_key, head, tail, _, sub in arrays:
+                value = _expand(_lookup(item, head), tail, sub)
+                if value is not _MISSING:
+                    payload[to_key] = value
+            for key, value in defaults:
+                if key not in payload:
+                    payload[key] = copy.deepcopy(value)
+            output.append(payload)
+        return output
+
+
+def _split_wildcard(path: tuple[str, ...]) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    if WILDCARD not in path:
+        return path, ()
+    position = path.index(WILDCARD)
+    return path[:position], path[position:]
+
+
+def _expand(value: Any, tail: tuple[str, ...], sub: CompiledPlan | None) -> Any:
+    if value is _MISSING:
+        return _MISSING
+    if tail:
+        value = _lookup(value, tail)
+    if sub is not None and value is not _MISSING:
+        value = sub._each(value)
+    return value
+
+
+def compile_plan(plan: TransformPlan, target_schema: SchemaLike) -> CompiledPlan:
+    return CompiledPlan(plan, target_schema)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from typing import Any, Union
+
+from .api import _check_errors_mode, _check_report_mode, _lookup_schema, _stored_plan
+from .errors import TransformValidationError
+from .executor import CompiledPlan, compile_plan
+from .plan_cache import PlanCache, default_plan_cache, shape_fingerprint
+from .plan_types import RecordError, TransformResult
+from .planner import PlannerOptions, build_plans
+from .registry import SchemaRegistry
+from .schema import CompiledSchema, SchemaLike
+from .validator import validate_payload
+
+Target = Union[SchemaLike, str]
+
+
+def _resolve_targets(
+    targets: dict[str, Target],
+    registry: SchemaRegistry | None,
+) -> dict[str, CompiledSchema]:
+    # Strings name registry routes; anything else is a schema.
+    return {
+        name: _lookup_schema(None, target, registry)
+        if isinstance(target, str)
+        else _lookup_schema(target, None, registry)
+        for name, target in targets.items()
+    }
+
+
+def _fanout_plans(
+    source_payload: dict[str, Any],
+    schemas: dict[str, CompiledSchema],
+    plan_cache: PlanCache | None,
+    options: PlannerOptions,
+    variant: tuple[str, ...],
+) -> dict[str, CompiledPlan]:
+    by_hash = {schema.content_hash: schema for schema in schemas.values()}
+    compiled: dict[str, CompiledPlan] = {}
+    fingerprint = None
+    if plan_cache is not None:
+        fingerprint = shape_fingerprint(source_payload, options.max_depth, options.max_nodes)
+        for content_hash, schema in by_hash.items():
+            key = (fingerprint, content_hash, *variant)
+            cached = plan_cache.get(key)
+            if cached is None:
+                cached = _stored_plan(source_payload, schema, plan_cache, variant, None)
+                if cached is None:
+                    continue
+                plan_cache.put(key, cached)
+            compiled[content_hash] = cached
+
+    # Every target still without a plan is planned against one shared scan.
+    pending = [schema for content_hash, schema in by_hash.items() if content_hash not in compiled]
+    if pending:
+        plans = build_plans(
+            source_payload,
+            pending,
+            max_depth=options.max_depth,
+            max_nodes=options.max_nodes,
+            drops=options.drops,
+        )
+        for schema, plan in zip(pending, plans):
+            compiled[schema.content_hash] = compile_plan(plan, schema)
+            if plan_cache is not None:
+                plan_cache.put((fingerprint, schema.content_hash, *variant), compiled[schema.content_hash])
+
+    return {name: compiled[schema.content_hash] for name, schema in schemas.items()}
+
+
+def transform_fanout(
+    source_payload: dict[str, Any],
+    targets: dict[str, Target],
+    *,
+    registry: SchemaRegistry | None = None,
+    errors: str = "raise",
+    report: str = "full",
+    coerce: bool = False,
+    plan_cache: PlanCache | None = default_plan_cache,
+    planner_options: PlannerOptions | None = None,
+) -> dict[str, TransformResult | RecordError]:
+    _check_errors_mode(errors)
+    _check_report_mode(report)
+    schemas = _resolve_targets(targets, registry)
+    options = planner_options if planner_options is not None else PlannerOptions()
+    variant = planner_options.variant if planner_options is not None else ()
+    compiled = _fanout_plans(source_payload, schemas, plan_cache, options, variant)
+
+    resolved: dict[tuple[str, ...], Any] = {}
+    results: dict[str, TransformResult | RecordError] = {}
+    for index, (name, schema) in enumerate(schemas.items()):
+        plan = compiled[name]
+        payload, details = plan(source_payload, report, resolved)
+        try:
+            validate_payload(payload, schema, plan.plan.required, coerce=coerce)
+        except TransformValidationError as exc:
+            if errors == "raise":
+                raise
+            results[name] = RecordError(index=index, source_payload=source_payload, error=exc)
+            continue
+        results[name] = TransformResult(payload=payload, plan=plan.plan, report=details)
+    return results
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+_OBJECT_TOKENS = re.compile(r'[{}"\\]')
+_STRING_TOKENS = re.compile(r'["\\]')
+
+
+class IncrementalJsonScanner:
+    """Finds the first top-level JSON object in text that arrives in pieces.
+
+    Each character is inspected once; ``json.loads`` only runs on balanced,
+    string-aware ``{...}`` spans, and text outside such spans is discarded.
+    """
+
+    __slots__ = ("_parts", "_depth", "_in_string", "_escape", "result")
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.result: dict[str, Any] | None = None
+
+    def feed(self, text: str) -> dict[str, Any] | None:
+        if self.result is not None:
+            return self.result
+
+        pos = 0
+        end = len(text)
+        while pos < end:
+            if self._depth == 0:
+                start = text.find("{", pos)
+                if start == -1:
+                    return None
+                self._depth = 1
+                self._parts = []
+                pos = start + 1
+                span_start = start
+            else:
+                span_start = pos
+
+            while pos < end:
+                if self._escape:
+                    self._escape = False
+                    pos += 1
+                    continue
+                match = (_STRING_TOKENS if self._in_string else _OBJECT_TOKENS).search(text, pos)
+                if match is None:
+                    pos = end
+                    break
+                token = match.group()
+                pos = match.end()
+                if token == "\\":
+                    self._escape = self._in_string
+                elif token == '"':
+                    self._in_string = not self._in_string
+                elif token == "{":
+                    self._depth += 1
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        break
+
+            self._parts.append(text[span_start:pos])
+            if self._depth == 0:
+                candidate = "".join(self._parts)
+                self._parts = []
+                try:
+                    parsed = json.loads(candidate)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(parsed, dict):
+                    self.result = parsed
+                    return parsed
+        return None
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import json
+import re
+from functools import partial
+from time import perf_counter
+from typing import Any, Callable
+
+from .api import _cached_plan, _run_plan
+from .errors import TransformValidationError
+from .llm_cache import LLMResponseCache, llm_cache_key
+from .metrics import Probe
+from .plan_cache import PlanCache
+from .plan_types import Mapping, ReportCounts, TransformPlan, TransformReport, TransformResult
+from .planner import _flatten_paths
+from .providers import LLMProvider
+from .schema import CompiledSchema
+from .singleflight import default_singleflight
+from .validator import validate_payload
+
+
+def _extract_json_object(text: str) -> dict[str, Any]:
+    candidates: list[str] = []
+
+    # Prefer fenced code blocks first.
+    for match in re.finditer(r"```(?:json)?\s*(\{.*?\})\s*```", text, flags=re.DOTALL | re.IGNORECASE):
+        candidates.append(match.group(1).strip())
+
+    # Fallback: scan for balanced braces and collect substrings.
+    stack: list[int] = []
+    for i, ch in enumerate(text):
+        if ch == "{":
+            stack.append(i)
+        elif ch == "}" and stack:
+            start = stack.pop()
+            if not stack:  # only capture outermost balanced spans
+                candidates.append(text[start : i + 1].strip())
+
+    for raw in candidates:
+        try:
+            parsed = json.loads(raw)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+
+    # Final fallback: try from first '{' to last '}'.
+    first = text.find("{")
+    last = text.rfind("}")
+    if first != -1 and last != -1 and first < last:
+        try:
+            parsed = json.loads(text[first : last + 1])
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+
+    raise TransformValidationError(f"Failed to parse LLM JSON payload: {text}")
+
+
+def _build_alignment_prompt(source_payload: dict[str, Any], target_schema: dict[str, Any]) -> str:
+    return (
+        "You are a payload alignment engine.\n"
+        "Given source_payload and target_schema, return ONLY ONE JSON object aligned to target_schema.\n"
+        "Rules:\n"
+        "- Output must be a single JSON object, no markdown, no fences, no prose.\n"
+        "- Include only keys defined in target_schema.properties.\n"
+        "- Fill required fields; map/rename as needed from source_payload.\n"
+        "- Exclude unknown fields.\n\n"
+        f"source_payload:\n{json.dumps(source_payload, ensure_ascii=True)}\n\n"
+        f"target_schema:\n{json.dumps(target_schema, ensure_ascii=True)}\n"
+    )
+
+
+def _llm_result(
+    payload: dict[str, Any],
+    schema: CompiledSchema,
+    provider: LLMProvider,
+    cache_hit: bool = False,
+    probe: Probe | None = None,
+    report: str = "full",
+    coerce: bool = False,
+) -> TransformResult:
+    start = perf_counter() if probe is not None else 0.0
+    missing_required = validate_payload(payload, schema, schema.required, coerce=coerce)
+    if probe is not None:
+        probe.stage("validate", start)
+    details: TransformReport | ReportCounts | None = None
+    if report == "full":
+        details = TransformReport(
+            mapped=sorted(payload.keys()),
+            dropped=[],
+            missing_required=missing_required,
+            warnings=[f"aligned via {provider.name} llm (cache hit)" if cache_hit else f"aligned via {provider.name} llm"],
+        )
+    elif report == "counts":
+        details = ReportCounts(mapped=len(payload), warnings=1)
+    return TransformResult(payload=payload, plan=TransformPlan(), report=details)
+
+
+def _generate_cached(
+    provider: LLMProvider,
+    prompt: str,
+    model: str,
+    base_url: str,
+    llm_cache: LLMResponseCache | None,
+    stream: bool = False,
+    probe: Probe | None = None,
+) -> tuple[dict[str, Any], bool]:
+    generate = provider.generate_stream if stream else provider.generate
+    if probe is not None:
+        generate = _timed_llm(generate, probe)
+
+    key = llm_cache_key(provider.name, base_url, model, prompt)
+    if llm_cache is not None:
+        payload = llm_cache.get(key)
+        if probe is not None:
+            probe.event("llm_cache.hit" if payload is not None else "llm_cache.miss")
+        if payload is not None:
+            return payload, True
+    # Identical prompts already in flight on other threads share one call.
+    payload, shared = default_singleflight.do(key, lambda: generate(prompt, model=model, base_url=base_url))
+    if shared:
+        if probe is not None:
+            probe.event("llm.coalesced")
+    elif llm_cache is not None:
+        llm_cache.put(key, payload)
+    return payload, False
+
+
+def _timed_llm(
+    generate: Callable[..., dict[str, Any]],
+    probe: Probe,
+) -> Callable[..., dict[str, Any]]:
+    def timed(prompt: str, model: str, base_url: str) -> dict[str, Any]:
+        start = perf_counter()
+        try:
+            return generate(prompt, model=model, base_url=base_url)
+        finally:
+            probe.stage("llm", start)
+
+    return timed
+
+
+def _build_plan_prompt(source_paths: list[str], target_schema: dict[str, Any]) -> str:
+    return (
+        "You are a payload mapping planner.\n"
+        "Given the dotted leaf paths of a source payload and a target_schema, return ONLY ONE JSON object "
+        "describing how to build the target payload.\n"
+        'Format: {"mappings": [{"from_path": "<source path>", "to_key": "<target key>"}], '
+        '"defaults": [{"key": "<target key>", "value": <constant>}]}\n'
+        "Rules:\n"
+        "- Output must be a single JSON object, no markdown, no fences, no prose.\n"
+        "- from_path must be copied exactly from source_paths.\n"
+        "- to_key and default keys must be keys of target_schema.properties.\n"
+        "- Map each target key at most once; use defaults only when no source path fits.\n\n"
+        f"source_paths:\n{json.dumps(source_paths, ensure_ascii=True)}\n\n"
+        f"target_schema:\n{json.dumps(target_schema, ensure_ascii=True)}\n"
+    )
+
+
+def _plan_from_llm(
+    raw: dict[str, Any],
+    source_paths: list[str],
+    schema: CompiledSchema,
+    warning: str,
+) -> TransformPlan:
+    raw_mappings = raw.get("mappings")
+    raw_defaults = raw.get("defaults") or []
+    if not isinstance(raw_mappings, list) or not isinstance(raw_defaults, list):
+        raise TransformValidationError(f"LLM plan must contain 'mappings' and 'defaults' lists: {raw}")
+
+    known_paths = set(source_paths)
+    mappings: list[Mapping] = []
+    defaults: list[dict[str, Any]] = []
+    warnings = [warning]
+    targets: set[str] = set()
+
+    for entry in raw_mappings:
+        from_path = _plan_field(entry, "from_path")
+        to_key = _plan_field(entry, "to_key")
+        if from_path not in known_paths or to_key not in schema.allowed or to_key in targets:
+            warnings.append(f"Rejected LLM mapping: {entry}")
+            continue
+        mappings.append(Mapping(from_path=from_path, to_key=to_key))
+        targets.add(to_key)
+
+    for entry in raw_defaults:
+        key = _plan_field(entry, "key")
+        if key not in schema.allowed or key in targets or "value" not in entry:
+            warnings.append(f"Rejected LLM default: {entry}")
+            continue
+        defaults.append({"key": key, "value": entry["value"]})
+        targets.add(key)
+
+    mapped_from = {mapping.from_path for mapping in mappings}
+    return TransformPlan(
+        mappings=mappings,
+        defaults=defaults,
+        drops=sorted(path for path in source_paths if path not in mapped_from),
+        required=list(schema.required),
+        warnings=warnings,
+    )
+
+
+def _plan_field(entry: Any, field: str) -> str | None:
+    # Only strings can name a path or key; None leaves the entry to be rejected.
+    value = entry.get(field) if isinstance(entry, dict) else None
+    if value is not None and not isinstance(value, str):
+        raise TransformValidationError(f"LLM plan field {field!r} must be a string: {entry}")
+    return value
+
+
+def _llm_plan_warning(provider: LLMProvider, model: str, cache_hit: bool) -> str:
+    label = f"{model}, cache hit" if cache_hit else model
+    return f"planned via {provider.name} llm ({label})"
+
+
+def _build_llm_plan(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    *,
+    provider: LLMProvider,
+    model: str,
+    base_url: str,
+    llm_cache: LLMResponseCache | None,
+    stream: bool,
+    probe: Probe | None = None,
+) -> TransformPlan:
+    source_paths = [path for path, _ in _flatten_paths(source_payload)]
+    prompt = _build_plan_prompt(source_paths, dict(schema.source))
+    raw, cache_hit = _generate_cached(provider, prompt, model, base_url, llm_cache, stream, probe)
+    return _plan_from_llm(raw, source_paths, schema, _llm_plan_warning(provider, model, cache_hit))
+
+
+def _transform_llm(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    provider: LLMProvider,
+    *,
+    llm_model: str | None,
+    llm_base_url: str | None,
+    plan_cache: PlanCache | None,
+    llm_cache: LLMResponseCache | None,
+    llm_mode: str,
+    llm_stream: bool,
+    report: str,
+    coerce: bool,
+    probe: Probe | None,
+) -> TransformResult:
+    model = llm_model or provider.default_model
+    base_url = llm_base_url or provider.default_base_url
+    if llm_mode == "plan":
+        make_plan = partial(
+            _build_llm_plan,
+            provider=provider,
+            model=model,
+            base_url=base_url,
+            llm_cache=llm_cache,
+            stream=llm_stream,
+            probe=probe,
+        )
+        compiled = _cached_plan(source_payload, schema, plan_cache, make_plan, (provider.name, model), probe)
+        return _run_plan(source_payload, schema, compiled, probe, report, coerce)
+
+    prompt = _build_alignment_prompt(source_payload, dict(schema.source))
+    payload, cache_hit = _generate_cached(provider, prompt, model, base_url, llm_cache, llm_stream, probe)
+    return _llm_result(payload, schema, provider, cache_hit, probe, report, coerce)
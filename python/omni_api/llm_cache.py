@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from os import PathLike
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    import sqlite3
+
+DEFAULT_MAXSIZE = 1024
+
+
+def llm_cache_key(provider: str, base_url: str, model: str, prompt: str) -> str:
+    # The same model name on two providers or endpoints may answer differently.
+    text = "\0".join((provider, base_url, model, prompt))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class LLMCacheStats:
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    maxsize: int
+
+
+class LLMResponseCache:
+    """LRU + TTL cache of aligned LLM payloads, optionally backed by a sqlite file."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MAXSIZE,
+        *,
+        ttl: float | None = None,
+        path: str | PathLike[str] | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        # Values are kept as JSON text so every hit hands out a fresh dict.
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = Lock()
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            import sqlite3
+
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses "
+                "(key TEXT PRIMARY KEY, created REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and self._clock() - created > self.ttl
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return json.loads(entry[1])
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT created, payload FROM llm_responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and not self._expired(row[0]):
+                    self._store(key, (row[0], row[1]))
+                    self._disk_hits += 1
+                    return json.loads(row[1])
+
+            self._misses += 1
+            return None
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        entry = (self._clock(), json.dumps(payload, separators=(",", ":")))
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, created, payload) VALUES (?, ?, ?)",
+                    (key, entry[0], entry[1]),
+                )
+
+    def _store(self, key: str, entry: tuple[float, str]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_responses")
+            self._hits = 0
+            self._disk_hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> LLMCacheStats:
+        with self._lock:
+            return LLMCacheStats(
+                hits=self._hits,
+                disk_hits=self._disk_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
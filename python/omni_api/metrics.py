@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from threading import Lock
+from time import perf_counter
+from typing import Any
+
+STAGES = ("schema", "plan", "llm", "apply", "validate", "total")
+
+
+class TransformObserver:
+    """Base class for pipeline observers; override the hooks you need.
+
+    ``on_stage`` receives stage names from ``STAGES`` with their duration in
+    seconds. ``llm`` is nested inside ``plan`` when ``llm_mode="plan"``.
+    ``on_event`` receives counters such as ``plan_cache.hit``,
+    ``llm_cache.miss``, ``payload.source_keys`` or ``errors.validation``.
+    """
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        pass
+
+    def on_event(self, name: str, value: int = 1) -> None:
+        pass
+
+
+class MetricsCollector(TransformObserver):
+    """Thread-safe observer that aggregates stage durations and event counters."""
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.stage_seconds: dict[str, float] = {}
+        self.stage_counts: dict[str, int] = {}
+        self.events: dict[str, int] = {}
+
+    def on_stage(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+            self.stage_counts[stage] = self.stage_counts.get(stage, 0) + 1
+
+    def on_event(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.events[name] = self.events.get(name, 0) + value
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "stage_seconds": dict(self.stage_seconds),
+                "stage_counts": dict(self.stage_counts),
+                "events": dict(self.events),
+            }
+
+
+_observers: tuple[TransformObserver, ...] = ()
+_observers_lock = Lock()
+
+
+def register_observer(observer: TransformObserver) -> None:
+    global _observers
+    with _observers_lock:
+        if observer not in _observers:
+            _observers = (*_observers, observer)
+
+
+def unregister_observer(observer: TransformObserver) -> None:
+    global _observers
+    with _observers_lock:
+        _observers = tuple(o for o in _observers if o is not observer)
+
+
+class Probe:
+    __slots__ = ("_observers", "timings", "started")
+
+    def __init__(self, observers: tuple[TransformObserver, ...], timings: bool) -> None:
+        self._observers = observers
+        self.timings: dict[str, float] | None = {} if timings else None
+        self.started = perf_counter()
+
+    def stage(self, name: str, start: float) -> None:
+        seconds = perf_counter() - start
+        if self.timings is not None:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+        for observer in self._observers:
+            observer.on_stage(name, seconds)
+
+    def event(self, name: str, value: int = 1) -> None:
+        for observer in self._observers:
+            observer.on_event(name, value)
+
+
+def make_probe(timings: bool = False) -> Probe | None:
+    # The uninstrumented path only pays for this check.
+    observers = _observers
+    if not observers and not timings:
+        return None
+    return Probe(observers, timings)
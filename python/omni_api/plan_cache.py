@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from itertools import compress
+from threading import Lock
+from typing import Any, Hashable
+
+from .executor import CompiledPlan
+from .plan_store import PlanStore
+from .schema import SchemaLike, as_compiled
+
+DEFAULT_MAXSIZE = 1024
+
+
+def shape_fingerprint(
+    payload: dict[str, Any],
+    max_depth: int | None = None,
+    max_nodes: int | None = None,
+) -> tuple[Any, ...]:
+    """Key tree of ``payload`` as far as the planner looks at it; leaf values are ignored.
+
+    Objects are visited breadth-first in insertion order, with the planner's
+    ``max_depth``/``max_nodes`` limits, so payloads that plan alike share a
+    fingerprint and deep payloads cannot hit the recursion limit. Array
+    elements only count through the first one when it is an object, since
+    array-of-object targets are planned from it.
+
+    The result is flat: one ``keys`` tuple per object, or ``(keys, kinds)``
+    when it holds objects or arrays. It is on every cached call's path, so
+    plain JSON objects are read with ``tuple``/``map`` rather than a loop
+    over their keys.
+    """
+    parts: list[Any] = []
+    # (node, depth, scan): element sub-plans start a fresh scan with its own budget.
+    queue: deque[tuple[dict[str, Any], int, int]] = deque([(payload, 1, 0)])
+    budgets: list[int | None] = [max_nodes]
+    while queue:
+        node, depth, scan = queue.popleft()
+        budget = budgets[scan]
+        if budget is None and len(node) > _SMALL_NODE:
+            types = set(map(type, node.values()))
+            if types <= _LEAF_TYPES:
+                parts.append(tuple(node))
+                continue
+            if types <= _JSON_TYPES:
+                values = tuple(node.values())
+                kinds = tuple(map(_KINDS.get, map(type, values)))
+                kinds_list = list(kinds)
+                for i in compress(range(len(kinds)), kinds):
+                    value = values[i]
+                    if kinds[i] == _OBJECT:
+                        if max_depth is None or depth < max_depth:
+                            queue.append((value, depth + 1, scan))
+                    elif value and isinstance(value[0], dict):
+                        budgets.append(max_nodes)
+                        queue.append((value[0], 1, len(budgets) - 1))
+                    else:
+                        kinds_list[i] = None
+                parts.append((tuple(node), tuple(kinds_list)))
+                continue
+        if budget is not None and budget <= 0:
+            if node:
+                parts.append(_TRUNCATED)
+            continue
+        parts.append(_bounded_shape(node, depth, scan, budgets, queue, max_depth, max_nodes))
+    return tuple(parts)
+
+
+def _bounded_shape(
+    node: dict[str, Any],
+    depth: int,
+    scan: int,
+    budgets: list[int | None],
+    queue: deque[tuple[dict[str, Any], int, int]],
+    max_depth: int | None,
+    max_nodes: int | None,
+) -> tuple[Any, ...]:
+    # Key-by-key variant for node budgets and dict/list subclasses.
+    budget = budgets[scan]
+    keys: list[Any] = []
+    kinds: list[int | None] = []
+    for key, value in node.items():
+        if budget is not None:
+            if budget <= 0:
+                keys.append(_TRUNCATED)
+                kinds.append(None)
+                break
+            budget -= 1
+        keys.append(key)
+        if isinstance(value, dict):
+            kinds.append(_OBJECT)
+            if max_depth is None or depth < max_depth:
+                queue.append((value, depth + 1, scan))
+        elif isinstance(value, list) and value and isinstance(value[0], dict):
+            kinds.append(_ITEMS)
+            budgets.append(max_nodes)
+            queue.append((value[0], 1, len(budgets) - 1))
+        else:
+            kinds.append(None)
+    budgets[scan] = budget
+    if not any(kinds):
+        return tuple(keys)
+    return (tuple(keys), tuple(kinds))
+
+
+# Below this many keys the per-key loop is cheaper than the map/set pipeline.
+_SMALL_NODE = 16
+_OBJECT = 1
+_ITEMS = 2
+_KINDS: dict[type, int] = {dict: _OBJECT, list: _ITEMS}
+_LEAF_TYPES = frozenset({str, int, float, bool, type(None)})
+_JSON_TYPES = _LEAF_TYPES | {dict, list}
+_TRUNCATED = None  # never a JSON key
+
+
+@dataclass(frozen=True)
+class PlanCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class PlanCache:
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, *, store: PlanStore | None = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        # Consulted on misses before planning; see PlanStore.
+        self.store = store
+        self._entries: OrderedDict[Hashable, CompiledPlan] = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CompiledPlan | None:
+        with self._lock:
+            plan = self._entries.get(key)
+            if plan is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return plan
+
+    def put(self, key: Hashable, plan: CompiledPlan) -> None:
+        with self._lock:
+            self._entries[key] = plan
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> PlanCacheStats:
+        with self._lock:
+            return PlanCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+                maxsize=self.maxsize,
+            )
+
+
+default_plan_cache = PlanCache()
+
+
+def plan_cache_key(source_payload: dict[str, Any], target_schema: SchemaLike) -> tuple[Any, ...]:
+    return (shape_fingerprint(source_payload), as_compiled(target_schema).content_hash)
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from os import PathLike
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from .errors import TransformPlanError, TransformSchemaError
+from .executor import CompiledPlan, compile_plan
+from .plan_types import Mapping, TransformPlan
+from .planner import build_plan
+from .schema import CompiledSchema, SchemaLike, as_compiled
+
+PLAN_VERSIONS = ("1",)
+SCHEMA_FILE = "schema.json"
+
+
+def plan_to_dict(plan: TransformPlan) -> dict[str, Any]:
+    return {
+        "version": plan.version,
+        "mappings": [_mapping_to_dict(m) for m in plan.mappings],
+        "defaults": [dict(default) for default in plan.defaults],
+        "drops": list(plan.drops),
+        "required": list(plan.required),
+        "warnings": list(plan.warnings),
+        "ambiguous": {key: list(group) for key, group in plan.ambiguous},
+    }
+
+
+def _mapping_to_dict(mapping: Mapping) -> dict[str, Any]:
+    entry: dict[str, Any] = {"from_path": mapping.from_path, "to_key": mapping.to_key, "op": mapping.op}
+    if mapping.items is not None:
+        entry["items"] = plan_to_dict(mapping.items)
+    return entry
+
+
+def _mapping_from_dict(entry: dict[str, Any]) -> Mapping:
+    items = entry.get("items")
+    return Mapping(
+        from_path=entry["from_path"],
+        to_key=entry["to_key"],
+        op=entry.get("op", "copy"),
+        items=None if items is None else plan_from_dict(items),
+    )
+
+
+def plan_from_dict(data: Any) -> TransformPlan:
+    if not isinstance(data, dict):
+        raise TransformPlanError(f"Plan must be a JSON object, got {type(data).__name__}")
+    version = data.get("version")
+    if version not in PLAN_VERSIONS:
+        raise TransformPlanError(f"Unsupported plan version {version!r}; expected one of {PLAN_VERSIONS}")
+    try:
+        mappings = [_mapping_from_dict(m) for m in data.get("mappings", [])]
+        defaults = [{"key": d["key"], "value": d.get("value")} for d in data.get("defaults", [])]
+        ambiguous = {key: list(group) for key, group in data.get("ambiguous", {}).items()}
+    except TransformPlanError:
+        raise
+    except (KeyError, TypeError, AttributeError, ValueError) as exc:
+        raise TransformPlanError(f"Malformed plan entry: {exc!r}") from exc
+    return TransformPlan(
+        version=version,
+        mappings=mappings,
+        defaults=defaults,
+        drops=list(data.get("drops", [])),
+        required=list(data.get("required", [])),
+        warnings=list(data.get("warnings", [])),
+        ambiguous=ambiguous,
+    )
+
+
+def dump_plan(plan: TransformPlan) -> str:
+    return json.dumps(plan_to_dict(plan), indent=2, sort_keys=True)
+
+
+def load_plan(text: str) -> TransformPlan:
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as exc:
+        raise TransformPlanError(f"Plan is not valid JSON: {exc}") from exc
+    return plan_from_dict(data)
+
+
+def canonical_shape(payload: dict[str, Any]) -> list[Any]:
+    # Unlike shape_fingerprint this sorts keys, so a pinned plan matches the
+    # same key tree regardless of the order a producer emits keys in. A list
+    # whose first element is an object contributes that element's key tree,
+    # since array-of-object targets are planned from it.
+    return [[key, _value_shape(value)] for key, value in sorted(payload.items())]
+
+
+def _value_shape(value: Any) -> Any:
+    if isinstance(value, dict):
+        return canonical_shape(value)
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return {"items": canonical_shape(value[0])}
+    return None
+
+
+def shape_digest(payload: dict[str, Any], variant: tuple[str, ...] = ()) -> str:
+    text = json.dumps([canonical_shape(payload), list(variant)], separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _read_object(path: Path) -> dict[str, Any]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        raise TransformPlanError(f"{path}: not valid JSON: {exc}") from exc
+    if not isinstance(data, dict):
+        raise TransformPlanError(f"{path}: expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    import tempfile
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+class PlanStore:
+    """Directory of pinned plans, compiled in memory when the store is opened.
+
+    Layout: ``<root>/<schema content hash>/schema.json`` plus one
+    ``<shape digest>.json`` file per pinned (source shape, variant).
+    """
+
+    def __init__(self, root: str | PathLike[str], *, strict: bool = False) -> None:
+        self.root = Path(root)
+        self.strict = strict
+        self._plans: dict[tuple[str, str], CompiledPlan] = {}
+        self._lock = Lock()
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._plans)
+
+    def reload(self) -> int:
+        plans: dict[tuple[str, str], CompiledPlan] = {}
+        if self.root.is_dir():
+            for schema_file in sorted(self.root.glob(f"*/{SCHEMA_FILE}")):
+                try:
+                    schema = as_compiled(_read_object(schema_file), validate=True)
+                except TransformSchemaError as exc:
+                    raise TransformPlanError(f"{schema_file}: {exc}") from exc
+                for plan_file in sorted(schema_file.parent.glob("*.json")):
+                    if plan_file.name == SCHEMA_FILE:
+                        continue
+                    entry = _read_object(plan_file)
+                    try:
+                        plan = plan_from_dict(entry.get("plan"))
+                    except TransformPlanError as exc:
+                        raise TransformPlanError(f"{plan_file}: {exc}") from exc
+                    plans[(schema.content_hash, plan_file.stem)] = compile_plan(plan, schema)
+        with self._lock:
+            self._plans = plans
+        return len(plans)
+
+    def get(
+        self,
+        source_payload: dict[str, Any],
+        schema: CompiledSchema,
+        variant: tuple[str, ...] = (),
+    ) -> CompiledPlan | None:
+        if not self._plans:
+            return None
+        return self._plans.get((schema.content_hash, shape_digest(source_payload, variant)))
+
+    def save(
+        self,
+        source_payload: dict[str, Any],
+        target_schema: SchemaLike,
+        plan: TransformPlan | None = None,
+        variant: tuple[str, ...] = (),
+    ) -> Path:
+        schema = as_compiled(target_schema, validate=True)
+        if plan is None:
+            plan = build_plan(source_payload, schema)
+        digest = shape_digest(source_payload, variant)
+        directory = self.root / schema.content_hash
+        schema_path = directory / SCHEMA_FILE
+        if not schema_path.exists():
+            # Unsorted: property order is part of the schema's content hash.
+            _write_atomic(schema_path, json.dumps(dict(schema.source), indent=2))
+        entry = {
+            "shape": canonical_shape(source_payload),
+            "variant": list(variant),
+            "plan": plan_to_dict(plan),
+        }
+        path = directory / f"{digest}.json"
+        _write_atomic(path, json.dumps(entry, indent=2, sort_keys=True))
+        with self._lock:
+            self._plans = {**self._plans, (schema.content_hash, digest): compile_plan(plan, schema)}
+        return path
@@ -1,22 +1,128 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
 from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass(frozen=True)
+MAPPING_OPS = ("copy", "each")
+WILDCARD = "*"
+
+
+@dataclass(frozen=True, slots=True)
 class Mapping:
+    """``copy`` moves one value; ``each`` runs ``items`` over every element of a list.
+
+    A ``*`` segment in ``from_path`` fans out over a list, e.g. ``items.*.sku``.
+    """
+
     from_path: str
     to_key: str
     op: str = "copy"
+    items: TransformPlan | None = None
+    # Interned, pre-split from_path; derived, so excluded from eq/hash/repr.
+    path: tuple[str, ...] = field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        if self.op not in MAPPING_OPS:
+            raise ValueError(f"op must be one of {MAPPING_OPS}, got {self.op!r}")
+        if (self.op == "each") != (self.items is not None):
+            raise ValueError("items is required for op='each' and only allowed there")
+        object.__setattr__(self, "from_path", sys.intern(self.from_path))
+        object.__setattr__(self, "to_key", sys.intern(self.to_key))
+        object.__setattr__(self, "path", tuple(sys.intern(part) for part in self.from_path.split(".")))
 
-@dataclass(frozen=True)
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (Mapping, _mapping_args(self))
+
+
+def _mapping_args(mapping: Mapping) -> tuple[Any, ...]:
+    if mapping.items is None:
+        return (mapping.from_path, mapping.to_key, mapping.op)
+    return (mapping.from_path, mapping.to_key, mapping.op, mapping.items)
+
+
+@dataclass(frozen=True, slots=True)
 class TransformPlan:
+    """Immutable plan; list arguments are stored as tuples.
+
+    Hashing uses ``content_hash`` (sha256 of the canonical JSON form), since
+    default values may be unhashable. ``ambiguous`` holds, per target key
+    with an ambiguity warning, the sorted candidate paths it chose from.
+    """
+
     version: str = "1"
-    mappings: list[Mapping] = field(default_factory=list)
-    defaults: list[dict[str, Any]] = field(default_factory=list)
-    drops: list[str] = field(default_factory=list)
-    required: list[str] = field(default_factory=list)
-    warnings: list[str] = field(default_factory=list)
+    mappings: tuple[Mapping, ...] = ()
+    defaults: tuple[dict[str, Any], ...] = ()
+    drops: tuple[str, ...] = ()
+    required: tuple[str, ...] = ()
+    warnings: tuple[str, ...] = ()
+    ambiguous: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    _hash: str | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "mappings", tuple(self.mappings))
+        object.__setattr__(self, "defaults", tuple(dict(default) for default in self.defaults))
+        # Paths and keys repeat across the plans of one schema; interning
+        # lets cached plans share them.
+        object.__setattr__(self, "drops", tuple(sys.intern(path) for path in self.drops))
+        object.__setattr__(self, "required", tuple(sys.intern(key) for key in self.required))
+        object.__setattr__(self, "warnings", tuple(self.warnings))
+        pairs = self.ambiguous.items() if isinstance(self.ambiguous, dict) else self.ambiguous
+        object.__setattr__(self, "ambiguous", tuple((key, tuple(group)) for key, group in pairs))
+
+    @property
+    def content_hash(self) -> str:
+        if self._hash is None:
+            canonical = [
+                self.version,
+                [
+                    [m.from_path, m.to_key, m.op]
+                    if m.items is None
+                    else [m.from_path, m.to_key, m.op, m.items.content_hash]
+                    for m in self.mappings
+                ],
+                list(self.defaults),
+                self.drops,
+                self.required,
+                self.warnings,
+                self.ambiguous,
+            ]
+            encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=str)
+            object.__setattr__(self, "_hash", hashlib.sha256(encoded.encode("utf-8")).hexdigest())
+        return self._hash
+
+    def __hash__(self) -> int:
+        return hash(self.content_hash)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        mappings = tuple(_mapping_args(m) for m in self.mappings)
+        return (
+            _restore_plan,
+            (self.version, mappings, self.defaults, self.drops, self.required, self.warnings, self.ambiguous),
+        )
+
+
+def _restore_plan(
+    version: str,
+    mappings: tuple[tuple[Any, ...], ...],
+    defaults: tuple[dict[str, Any], ...],
+    drops: tuple[str, ...],
+    required: tuple[str, ...],
+    warnings: tuple[str, ...],
+    ambiguous: tuple[tuple[str, tuple[str, ...]], ...] = (),
+) -> TransformPlan:
+    return TransformPlan(
+        version=version,
+        mappings=tuple(Mapping(*mapping) for mapping in mappings),
+        defaults=defaults,
+        drops=drops,
+        required=required,
+        warnings=warnings,
+        ambiguous=ambiguous,
+    )
 
 
 @dataclass(frozen=True)
@@ -25,10 +131,37 @@ class TransformReport:
     dropped: list[str] = field(default_factory=list)
     missing_required: list[str] = field(default_factory=list)
     warnings: list[str] = field(default_factory=list)
+    timings: dict[str, float] | None = None
+
+
+@dataclass(frozen=True)
+class ReportCounts:
+    mapped: int = 0
+    dropped: int = 0
+    missing_required: int = 0
+    warnings: int = 0
+    timings: dict[str, float] | None = None
 
 
 @dataclass(frozen=True)
 class TransformResult:
     payload: dict[str, Any]
     plan: TransformPlan
+    report: TransformReport | ReportCounts | None
+
+
+@dataclass(frozen=True)
+class RecordError:
+    index: int
+    source_payload: dict[str, Any]
+    error: Exception
+
+
+@dataclass(frozen=True)
+class ColumnarResult:
+    columns: dict[str, Any]
+    rows: int
+    plan: TransformPlan
     report: TransformReport
+    missing: dict[str, list[int]] = field(default_factory=dict)
+    invalid: dict[str, list[int]] = field(default_factory=dict)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import re
-from typing import Any
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Sequence
 
 from .plan_types import Mapping, TransformPlan
+from .schema import CompiledSchema, SchemaLike, as_compiled
 
 
 def _normalize(value: str) -> str:
@@ -15,88 +19,554 @@ def _tokenize(value: str) -> list[str]:
     return [token for token in tokens if token]
 
 
+DROPS_MODES = ("full", "summary")
+
+
+@dataclass(frozen=True)
+class PlannerOptions:
+    """Traversal limits for ``build_plan``; ``None`` means unbounded."""
+
+    max_depth: int | None = None
+    max_nodes: int | None = None
+    drops: str = "full"
+
+    def __post_init__(self) -> None:
+        if self.drops not in DROPS_MODES:
+            raise ValueError(f"drops must be one of {DROPS_MODES}, got {self.drops!r}")
+        if self.max_depth is not None and self.max_depth < 1:
+            raise ValueError("max_depth must be >= 1")
+        if self.max_nodes is not None and self.max_nodes < 1:
+            raise ValueError("max_nodes must be >= 1")
+
+    @property
+    def variant(self) -> tuple[str, ...]:
+        # Plans built under different limits must not share a cache entry.
+        return ("planner", f"{self.max_depth}/{self.max_nodes}/{self.drops}")
+
+
+def _sorted_items(node: dict[str, Any]) -> Iterator[tuple[str, Any]]:
+    return iter([(key, node[key]) for key in sorted(node.keys())])
+
+
 def _flatten_paths(payload: dict[str, Any], prefix: str = "") -> list[tuple[str, Any]]:
+    # Iterative depth-first walk in sorted key order, so deep payloads cannot
+    # hit the recursion limit.
     paths: list[tuple[str, Any]] = []
-    for key in sorted(payload.keys()):
-        path = f"{prefix}.{key}" if prefix else key
-        value = payload[key]
-        if isinstance(value, dict):
-            paths.extend(_flatten_paths(value, path))
-        else:
+    stack: list[tuple[str, Iterator[tuple[str, Any]]]] = [(prefix, _sorted_items(payload))]
+    while stack:
+        base, items = stack[-1]
+        for key, value in items:
+            path = f"{base}.{key}" if base else key
+            if isinstance(value, dict):
+                stack.append((path, _sorted_items(value)))
+                break
             paths.append((path, value))
+        else:
+            stack.pop()
     return paths
 
 
-def _best_candidates(target_key: str, source_paths: list[str]) -> tuple[list[str], list[str]]:
-    exact = [path for path in source_paths if path == target_key]
-    if exact:
-        return exact, []
+class SourceIndex:
+    """Lookup tables over flattened source paths, one per matching rule in ``build_plan``."""
+
+    __slots__ = ("_exact", "_direct_norm", "_direct_tokens", "_token_postings", "_leaf_norm")
+
+    def __init__(self, source_paths: Iterable[str] = ()) -> None:
+        self._exact: set[str] = set()
+        self._direct_norm: dict[str, list[str]] = {}
+        self._direct_tokens: dict[str, frozenset[str]] = {}
+        self._token_postings: dict[str, list[str]] = {}
+        self._leaf_norm: dict[str, list[str]] = {}
+        for path in source_paths:
+            self.add(path)
 
-    target_norm = _normalize(target_key)
-    normalized_direct = [
-        path for path in source_paths if "." not in path and _normalize(path) == target_norm
-    ]
-    if normalized_direct:
-        return normalized_direct, []
+    def __contains__(self, path: object) -> bool:
+        return path in self._exact
 
-    target_tokens = set(_tokenize(target_key))
-    token_direct = []
-    for path in source_paths:
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, path: str) -> None:
+        if path in self._exact:
+            return
         if "." in path:
-            continue
-        source_tokens = set(_tokenize(path))
-        if target_tokens and target_tokens.issubset(source_tokens):
-            token_direct.append(path)
-    if token_direct:
-        return token_direct, []
+            self.add_nested(path, _normalize(path.rsplit(".", 1)[1]))
+            return
+        self._exact.add(path)
+
+        self._direct_norm.setdefault(_normalize(path), []).append(path)
+        tokens = frozenset(_tokenize(path))
+        self._direct_tokens[path] = tokens
+        for token in tokens:
+            self._token_postings.setdefault(token, []).append(path)
+
+    def add_nested(self, path: str, leaf_norm: str) -> None:
+        if path in self._exact:
+            return
+        self._exact.add(path)
+        self._leaf_norm.setdefault(leaf_norm, []).append(path)
+
+    def candidates(self, target_key: str) -> tuple[list[str], list[str]]:
+        if target_key in self._exact:
+            return [target_key], []
+
+        target_norm = _normalize(target_key)
+        normalized_direct = self._direct_norm.get(target_norm)
+        if normalized_direct:
+            return list(normalized_direct), []
+
+        target_tokens = set(_tokenize(target_key))
+        if target_tokens:
+            postings = [self._token_postings.get(token, ()) for token in target_tokens]
+            shortest = min(postings, key=len)
+            token_direct = [
+                path for path in shortest if target_tokens.issubset(self._direct_tokens[path])
+            ]
+            if token_direct:
+                return token_direct, []
 
-    nested_leaf = [
-        path
-        for path in source_paths
-        if "." in path and _normalize(path.rsplit(".", 1)[1]) == target_norm
-    ]
-    if nested_leaf:
-        return nested_leaf, nested_leaf
+        nested_leaf = self._leaf_norm.get(target_norm)
+        if nested_leaf:
+            return list(nested_leaf), list(nested_leaf)
 
-    return [], []
+        return [], []
 
 
 def _tie_break(candidates: list[str]) -> str:
     return sorted(candidates, key=lambda p: (len(p), p))[0]
 
 
-def build_plan(source_payload: dict[str, Any], target_schema: dict[str, Any]) -> TransformPlan:
-    flattened = _flatten_paths(source_payload)
-    source_paths = [path for path, _ in flattened]
+class _Walk:
+    """Bounded breadth-first walk over the nested part of a source payload."""
 
+    __slots__ = ("leaves", "counts", "truncated_depth", "truncated_nodes", "visited")
+
+    def __init__(self) -> None:
+        self.leaves: list[str] = []
+        self.counts: dict[str, int] = {}
+        self.truncated_depth = False
+        self.truncated_nodes = False
+        self.visited = 0
+
+
+def _walk_nested(
+    roots: list[tuple[str, dict[str, Any]]],
+    index: SourceIndex,
+    *,
+    wanted_leaves: frozenset[str],
+    wanted_paths: frozenset[str],
+    keep_all: bool,
+    max_depth: int | None,
+    max_nodes: int | None,
+    visited: int,
+) -> _Walk:
+    walk = _Walk()
+    walk.visited = visited
+    queue: deque[tuple[str, str, dict[str, Any], int]] = deque(
+        (root, root, node, 2) for root, node in roots
+    )
+    while queue:
+        root, base, node, depth = queue.popleft()
+        for key, value in node.items():
+            if max_nodes is not None and walk.visited >= max_nodes:
+                walk.truncated_nodes = True
+                return walk
+            walk.visited += 1
+            path = f"{base}.{key}"
+            if isinstance(value, dict):
+                if max_depth is None or depth < max_depth:
+                    queue.append((root, path, value, depth + 1))
+                    continue
+                # Subtrees past the depth cap are treated as opaque leaves.
+                walk.truncated_depth = True
+            leaf_norm = _normalize(key)
+            if leaf_norm in wanted_leaves or path in wanted_paths:
+                index.add_nested(path, leaf_norm)
+            if keep_all:
+                walk.leaves.append(path)
+            else:
+                walk.counts[root] = walk.counts.get(root, 0) + 1
+    return walk
+
+
+class SourceScan:
+    """A source payload indexed once; plans for several target schemas can share it."""
+
+    __slots__ = (
+        "source",
+        "index",
+        "options",
+        "top_leaves",
+        "roots",
+        "walk",
+        "truncated_depth",
+        "truncated_nodes",
+    )
+
+    def __init__(
+        self,
+        source_payload: dict[str, Any],
+        schemas: Sequence[CompiledSchema],
+        options: PlannerOptions,
+    ) -> None:
+        max_depth, max_nodes = options.max_depth, options.max_nodes
+        self.source = source_payload
+        self.index = SourceIndex()
+        self.options = options
+        self.top_leaves: list[str] = []
+        self.roots: list[tuple[str, dict[str, Any]]] = []
+        self.truncated_depth = False
+
+        # Direct and token rules only ever match top-level keys, so nested leaves
+        # matter only for targets those rules leave unresolved (or dotted targets,
+        # which can match a nested path exactly).
+        visited = 0
+        for key, value in source_payload.items():
+            if max_nodes is not None and visited >= max_nodes:
+                break
+            visited += 1
+            if isinstance(value, dict):
+                if max_depth is None or max_depth > 1:
+                    self.roots.append((key, value))
+                    continue
+                self.truncated_depth = True
+            self.top_leaves.append(key)
+            self.index.add(key)
+        self.truncated_nodes = visited < len(source_payload)
+
+        unresolved = {
+            key
+            for schema in schemas
+            for key in schema.properties
+            if "." in key or not self.index.candidates(key)[0]
+        }
+        keep_all = options.drops == "full"
+        self.walk = _Walk()
+        if self.roots and (unresolved or keep_all):
+            self.walk = _walk_nested(
+                self.roots,
+                self.index,
+                wanted_leaves=frozenset(_normalize(key) for key in unresolved),
+                wanted_paths=frozenset(key for key in unresolved if "." in key),
+                keep_all=keep_all,
+                max_depth=max_depth,
+                max_nodes=max_nodes,
+                visited=visited,
+            )
+
+    def plan(self, schema: CompiledSchema) -> TransformPlan:
+        index, walk, options = self.index, self.walk, self.options
+        mappings: list[Mapping] = []
+        warnings: list[str] = []
+        ambiguous: list[tuple[str, tuple[str, ...]]] = []
+        mapped_from: set[str] = set()
+
+        for target_key in schema.properties:
+            candidates, ambiguous_group = index.candidates(target_key)
+            if not candidates:
+                continue
+
+            chosen = _tie_break(candidates)
+            mappings.append(_mapping(self.source, schema, target_key, chosen, options))
+            mapped_from.add(chosen)
+
+            if len(ambiguous_group) > 1:
+                group = tuple(sorted(ambiguous_group))
+                warnings.append(_ambiguous_warning(target_key, group, chosen))
+                ambiguous.append((target_key, group))
+
+        if self.truncated_nodes or walk.truncated_nodes:
+            warnings.append(f"Source traversal stopped at max_nodes={options.max_nodes}")
+        if self.truncated_depth or walk.truncated_depth:
+            warnings.append(f"Source traversal truncated at max_depth={options.max_depth}")
+
+        if options.drops == "full":
+            drop_list = sorted(
+                path for path in (*self.top_leaves, *walk.leaves) if path not in mapped_from
+            )
+        else:
+            drop_list, summary = _summarize_drops(self.top_leaves, self.roots, walk, mapped_from)
+            warnings.append(summary)
+
+        return TransformPlan(
+            mappings=mappings,
+            defaults=[],
+            drops=drop_list,
+            required=list(schema.required),
+            warnings=warnings,
+            ambiguous=ambiguous,
+        )
+
+
+def _mapping(
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    target_key: str,
+    chosen: str,
+    options: PlannerOptions,
+) -> Mapping:
+    item_schema = schema.item_schemas.get(target_key)
+    sample = None if item_schema is None else _first_item(source_payload, chosen)
+    if sample is None:
+        return Mapping(from_path=chosen, to_key=target_key)
+    items = SourceScan(sample, [item_schema], options).plan(item_schema)
+    return Mapping(from_path=chosen, to_key=target_key, op="each", items=items)
+
+
+_AMBIGUOUS = "Ambiguous mapping for '"
+
+
+def _ambiguous_warning(target_key: str, group: tuple[str, ...], chosen: str) -> str:
+    return f"{_AMBIGUOUS}{target_key}': candidates={list(group)}; chose '{chosen}'"
+
+
+def _first_item(source_payload: dict[str, Any], path: str) -> dict[str, Any] | None:
+    # The first element stands in for the whole list when planning an
+    # array-of-object target; the sub-plan then runs over every element.
+    value: Any = source_payload
+    for part in path.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return value[0]
+    return None
+
+
+def build_plan(
+    source_payload: dict[str, Any],
+    target_schema: SchemaLike,
+    *,
+    max_depth: int | None = None,
+    max_nodes: int | None = None,
+    drops: str = "full",
+) -> TransformPlan:
+    options = PlannerOptions(max_depth=max_depth, max_nodes=max_nodes, drops=drops)
+    schema = as_compiled(target_schema)
+    return SourceScan(source_payload, [schema], options).plan(schema)
+
+
+def build_plans(
+    source_payload: dict[str, Any],
+    target_schemas: Sequence[SchemaLike],
+    *,
+    max_depth: int | None = None,
+    max_nodes: int | None = None,
+    drops: str = "full",
+) -> list[TransformPlan]:
+    options = PlannerOptions(max_depth=max_depth, max_nodes=max_nodes, drops=drops)
+    schemas = [as_compiled(schema) for schema in target_schemas]
+    if drops != "full":
+        # A summary reports what this schema's own scan left untraversed, and
+        # whether nested levels are walked at all depends on its unresolved
+        # keys, so a shared scan would summarize the union of all schemas.
+        return [SourceScan(source_payload, [schema], options).plan(schema) for schema in schemas]
+    scan = SourceScan(source_payload, schemas, options)
+    return [scan.plan(schema) for schema in schemas]
+
+
+def shape_diff(previous: TransformPlan, source_payload: dict[str, Any]) -> tuple[list[str], list[str]]:
+    """Leaf paths ``source_payload`` adds to, and removes from, the source ``previous`` was planned for.
+
+    The previous source's paths are read back from the plan's mappings and
+    drops, so the plan must list every dropped path (``drops="full"``).
+    """
+    before = {mapping.from_path for mapping in previous.mappings}.union(previous.drops)
+    after = {path for path, _ in _flatten_paths(source_payload)}
+    return sorted(after - before), sorted(before - after)
+
+
+def replan(
+    previous: TransformPlan,
+    source_payload: dict[str, Any],
+    target_schema: SchemaLike,
+    *,
+    added: Iterable[str] = (),
+    removed: Iterable[str] = (),
+    max_depth: int | None = None,
+    max_nodes: int | None = None,
+    drops: str = "full",
+) -> TransformPlan:
+    """Update ``previous`` for a source whose leaf paths changed by ``added`` and ``removed``.
+
+    Only target keys a changed path can match are resolved again, so the work
+    follows the size of the diff rather than the width of the payload. The
+    result equals ``build_plan(source_payload, target_schema)``. Traversal
+    limits, summarized drops, plans with other warnings or defaults, and a
+    removed mapping whose fallback candidates the plan does not record are
+    planned from scratch instead.
+    """
+    options = PlannerOptions(max_depth=max_depth, max_nodes=max_nodes, drops=drops)
+    schema = as_compiled(target_schema)
+    plan = None
+    if options == PlannerOptions() and not previous.defaults:
+        plan = _replan(previous, source_payload, schema, set(added), set(removed), options)
+    if plan is None:
+        plan = SourceScan(source_payload, [schema], options).plan(schema)
+    return plan
+
+
+class _Changed:
+    """A changed leaf path with the parts ``SourceIndex`` matches on."""
+
+    __slots__ = ("path", "is_added", "nested", "norm", "tokens")
+
+    def __init__(self, path: str, is_added: bool) -> None:
+        self.path = path
+        self.is_added = is_added
+        self.nested = "." in path
+        self.norm = _normalize(path.rsplit(".", 1)[1] if self.nested else path)
+        self.tokens = frozenset() if self.nested else frozenset(_tokenize(path))
+
+
+def _match_level(changed: _Changed, target_key: str, target_norm: str, target_tokens: frozenset[str]) -> int:
+    # The SourceIndex.candidates rule that would list this path for target_key:
+    # 1 exact, 2 normalized top-level key, 3 token subset, 4 nested leaf, 0 none.
+    if changed.path == target_key:
+        return 1
+    if changed.nested:
+        return 4 if changed.norm == target_norm else 0
+    if changed.norm == target_norm:
+        return 2
+    if target_tokens and target_tokens <= changed.tokens:
+        return 3
+    return 0
+
+
+def _replan(
+    previous: TransformPlan,
+    source_payload: dict[str, Any],
+    schema: CompiledSchema,
+    added: set[str],
+    removed: set[str],
+    options: PlannerOptions,
+) -> TransformPlan | None:
+    # Any warning besides one per recorded ambiguity (traversal limits, LLM
+    # notes, plans from older files) means planning from scratch.
+    groups = dict(previous.ambiguous)
+    if len(previous.warnings) != len(groups):
+        return None
+    if not all(warning.startswith(_AMBIGUOUS) for warning in previous.warnings):
+        return None
+
+    added, removed = added - removed, removed - added
+    changed = [_Changed(path, True) for path in sorted(added)]
+    changed += [_Changed(path, False) for path in sorted(removed)]
+    old = {mapping.to_key: mapping for mapping in previous.mappings}
     mappings: list[Mapping] = []
     warnings: list[str] = []
-    mapped_from: set[str] = set()
+    ambiguous: list[tuple[str, tuple[str, ...]]] = []
 
-    properties = target_schema.get("properties", {})
-    for target_key in properties.keys():
-        candidates, ambiguous_group = _best_candidates(target_key, source_paths)
-        if not candidates:
+    for target_key in schema.properties:
+        mapping = old.get(target_key)
+        target_norm, target_tokens = _normalize(target_key), frozenset(_tokenize(target_key))
+        matches = [
+            (level, item)
+            for item in changed
+            if (level := _match_level(item, target_key, target_norm, target_tokens))
+        ]
+        if not matches:
+            if mapping is not None:
+                if target_key in schema.item_schemas:
+                    # Element shapes are not part of the diff; re-sample them.
+                    mapping = _mapping(source_payload, schema, target_key, mapping.from_path, options)
+                mappings.append(mapping)
+            if target_key in groups and mapping is not None:
+                warnings.append(_ambiguous_warning(target_key, groups[target_key], mapping.from_path))
+                ambiguous.append((target_key, groups[target_key]))
             continue
 
+        resolved = _resolve_changed(
+            target_key, target_norm, target_tokens, mapping, groups.get(target_key), matches, removed
+        )
+        if resolved is None:
+            return None
+        candidates, group = resolved
+        if not candidates:
+            continue
         chosen = _tie_break(candidates)
-        mappings.append(Mapping(from_path=chosen, to_key=target_key))
-        mapped_from.add(chosen)
-
-        if len(ambiguous_group) > 1:
-            warnings.append(
-                f"Ambiguous mapping for '{target_key}': candidates={sorted(ambiguous_group)}; chose '{chosen}'"
-            )
+        mappings.append(_mapping(source_payload, schema, target_key, chosen, options))
+        if len(group) > 1:
+            warnings.append(_ambiguous_warning(target_key, tuple(group), chosen))
+            ambiguous.append((target_key, tuple(group)))
 
-    drops = sorted(path for path in source_paths if path not in mapped_from)
-
-    required_raw = target_schema.get("required", [])
-    required = [key for key in required_raw if isinstance(key, str)]
+    before = {mapping.from_path for mapping in previous.mappings}
+    after = {mapping.from_path for mapping in mappings}
+    drop_list = list(previous.drops)
+    for path in sorted(removed | (after - before)):
+        at = bisect_left(drop_list, path)
+        if at < len(drop_list) and drop_list[at] == path:
+            del drop_list[at]
+    for path in (added - after) | (before - after - removed):
+        insort(drop_list, path)
 
     return TransformPlan(
         mappings=mappings,
         defaults=[],
-        drops=drops,
-        required=required,
+        drops=drop_list,
+        required=list(schema.required),
         warnings=warnings,
+        ambiguous=ambiguous,
     )
+
+
+def _resolve_changed(
+    target_key: str,
+    target_norm: str,
+    target_tokens: frozenset[str],
+    mapping: Mapping | None,
+    ambiguous_group: tuple[str, ...] | None,
+    matches: list[tuple[int, _Changed]],
+    removed: set[str],
+) -> tuple[list[str], list[str]] | None:
+    # Rules are tried in order, so every rule before the one that produced the
+    # previous choice had no candidates; only added paths can fill them now.
+    level = 5
+    if mapping is not None:
+        level = _match_level(_Changed(mapping.from_path, False), target_key, target_norm, target_tokens)
+        if not level:
+            return None
+    added_by_level: dict[int, list[str]] = {}
+    for match_level, item in matches:
+        if item.is_added:
+            added_by_level.setdefault(match_level, []).append(item.path)
+    first_added = min(added_by_level, default=5)
+    if first_added < level:
+        candidates = added_by_level[first_added]
+        return candidates, candidates if first_added == 4 else []
+    if mapping is None:
+        return [], []
+
+    # Nested-leaf candidates are all recorded on the plan's ``ambiguous`` (or
+    # are just the previous choice). For the other rules only the tie-break winner
+    # is known, so losing it means planning from scratch.
+    chosen = mapping.from_path
+    extra = added_by_level.get(level, [])
+    if level == 4:
+        group = {chosen} if ambiguous_group is None else set(ambiguous_group)
+        group = (group - removed).union(extra)
+        return sorted(group), sorted(group)
+    if chosen not in removed:
+        return [chosen, *extra], []
+    return None
+
+
+def _summarize_drops(
+    top_leaves: list[str],
+    roots: list[tuple[str, dict[str, Any]]],
+    walk: _Walk,
+    mapped_from: set[str],
+) -> tuple[list[str], str]:
+    # Each nested mapping removes one counted leaf from its root's total.
+    counts = dict(walk.counts)
+    for path in mapped_from:
+        root = path.split(".", 1)[0]
+        if "." in path and root in counts:
+            counts[root] -= 1
+    for key in top_leaves:
+        if key not in mapped_from:
+            counts[key] = 1
+    unexplored = sorted(root for root, _ in roots if root not in walk.counts)
+    prefixes = sorted(root for root, count in counts.items() if count > 0)
+    summary = f"Dropped {sum(counts[p] for p in prefixes)} source paths under {prefixes}"
+    if unexplored:
+        summary += f"; not traversed: {unexplored}"
+    return sorted({*prefixes, *unexplored}), summary
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import importlib
+from abc import ABC, abstractmethod
+from threading import Lock
+from typing import Any, Union
+
+ENTRY_POINT_GROUP = "omni_api.providers"
+
+
+class LLMProvider(ABC):
+    """Base class for LLM backends selected with ``llm_provider=<name>``.
+
+    ``generate`` (required) and ``generate_stream`` block and return the
+    first JSON object in the model's reply. ``async_client`` returns an async
+    context manager exposing ``generate(model, prompt) -> str``,
+    ``generate_object(model, prompt) -> dict`` and ``aclose()``; providers
+    without one only serve the blocking API.
+    """
+
+    name = ""
+    default_model = ""
+    default_base_url = ""
+
+    @abstractmethod
+    def generate(self, prompt: str, model: str, base_url: str) -> dict[str, Any]:
+        ...
+
+    def generate_stream(self, prompt: str, model: str, base_url: str) -> dict[str, Any]:
+        return self.generate(prompt, model=model, base_url=base_url)
+
+    def async_client(self, base_url: str, *, max_in_flight: int = 4) -> Any:
+        raise NotImplementedError(f"LLM provider {self.name!r} has no asyncio client")
+
+
+# A provider is registered as an instance, or as a "module:attr" reference to
+# an instance or class that is imported the first time the name is requested.
+ProviderLike = Union[LLMProvider, str]
+
+_BUILTIN: dict[str, ProviderLike] = {"ollama": "omni_api.providers.ollama:OllamaProvider"}
+
+_providers: dict[str, ProviderLike] = dict(_BUILTIN)
+_providers_lock = Lock()
+_entry_points_loaded = False
+
+
+def register_provider(name: str, provider: ProviderLike | type[LLMProvider]) -> None:
+    if isinstance(provider, type):
+        provider = _instantiate(provider, provider.__qualname__)
+    elif not isinstance(provider, (LLMProvider, str)):
+        raise TypeError(f"{provider!r} is not an LLMProvider")
+    with _providers_lock:
+        _providers[name] = provider
+
+
+def unregister_provider(name: str) -> None:
+    with _providers_lock:
+        _providers.pop(name, None)
+
+
+def get_provider(name: str) -> LLMProvider:
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            _load_entry_points()
+            provider = _providers.get(name)
+        if provider is None:
+            raise ValueError(f"Unknown llm_provider {name!r}; available: {sorted(_providers)}")
+    if not isinstance(provider, str):
+        return provider
+    # Imported without the lock: plugin modules commonly call
+    # register_provider() while they are being imported.
+    resolved = _resolve(provider)
+    with _providers_lock:
+        current = _providers.get(name)
+        if current == provider:
+            _providers[name] = resolved
+            return resolved
+    # Re-registered (possibly by the import itself) in the meantime.
+    return get_provider(name)
+
+
+def available_providers() -> list[str]:
+    with _providers_lock:
+        _load_entry_points()
+        return sorted(_providers)
+
+
+def _load_entry_points() -> None:
+    # Installed plugins are only looked up once a name is not already known,
+    # so the built-ins never pay for reading package metadata.
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        _providers.setdefault(entry_point.name, entry_point.value)
+
+
+def _resolve(reference: str) -> LLMProvider:
+    module_name, _, attr = reference.partition(":")
+    target: Any = importlib.import_module(module_name)
+    for part in filter(None, attr.split(".")):
+        target = getattr(target, part)
+    if isinstance(target, type):
+        return _instantiate(target, reference)
+    if not isinstance(target, LLMProvider):
+        raise TypeError(f"{reference} is not an LLMProvider")
+    return target
+
+
+def _instantiate(cls: type, label: str) -> LLMProvider:
+    if not issubclass(cls, LLMProvider):
+        raise TypeError(f"{label} is not an LLMProvider")
+    # Checked here so a registered class fails now, not on its first request.
+    if cls.__abstractmethods__:
+        raise TypeError(f"LLM provider {label} does not implement {sorted(cls.__abstractmethods__)}")
+    return cls()
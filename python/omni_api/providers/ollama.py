@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+from urllib import error, request
+
+from ..errors import TransformValidationError
+from ..jsonscan import IncrementalJsonScanner
+from ..llm import _extract_json_object
+from . import LLMProvider
+
+if TYPE_CHECKING:
+    from ..async_api import AsyncOllamaClient
+
+DEFAULT_MODEL = "llama3.1:latest"
+DEFAULT_BASE_URL = "http://127.0.0.1:11434"
+
+
+class OllamaProvider(LLMProvider):
+    name = "ollama"
+    default_model = DEFAULT_MODEL
+    default_base_url = DEFAULT_BASE_URL
+
+    # Module-level functions are looked up per call so tests can patch them.
+    def generate(self, prompt: str, model: str, base_url: str) -> dict[str, Any]:
+        return _generate(prompt, model=model, base_url=base_url)
+
+    def generate_stream(self, prompt: str, model: str, base_url: str) -> dict[str, Any]:
+        return _generate_stream(prompt, model=model, base_url=base_url)
+
+    def async_client(self, base_url: str, *, max_in_flight: int = 4) -> AsyncOllamaClient:
+        from ..async_api import AsyncOllamaClient
+
+        return AsyncOllamaClient(base_url, max_in_flight=max_in_flight)
+
+
+def _request(base_url: str, model: str, prompt: str, stream: bool) -> request.Request:
+    body = json.dumps({"model": model, "prompt": prompt, "stream": stream}).encode("utf-8")
+    return request.Request(
+        f"{base_url.rstrip('/')}/api/generate",
+        data=body,
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+
+
+def _generate(
+    prompt: str,
+    model: str,
+    base_url: str,
+    timeout: float = 60.0,
+) -> dict[str, Any]:
+    req = _request(base_url, model, prompt, stream=False)
+
+    try:
+        with request.urlopen(req, timeout=timeout) as resp:
+            data = resp.read()
+    except error.HTTPError as exc:
+        body = exc.read().decode("utf-8", errors="replace")
+        raise TransformValidationError(
+            f"Ollama HTTP error {exc.code}: {body}"
+        ) from exc
+    except error.URLError as exc:
+        raise TransformValidationError(f"Ollama connection failed: {exc}") from exc
+
+    payload = _decode_json(data)
+    if not isinstance(payload, dict) or "response" not in payload:
+        raise TransformValidationError(f"Unexpected Ollama response shape: {payload}")
+
+    return _extract_json_object(str(payload["response"]))
+
+
+def _decode_json(data: bytes) -> Any:
+    try:
+        return json.loads(data.decode("utf-8"))
+    except ValueError as exc:
+        text = data.decode("utf-8", errors="replace")
+        raise TransformValidationError(f"Ollama returned invalid JSON ({exc}): {text!r}") from exc
+
+
+def _stream_fragment(line: bytes) -> tuple[str, bool]:
+    chunk = _decode_json(line)
+    if not isinstance(chunk, dict):
+        raise TransformValidationError(f"Unexpected Ollama stream chunk: {chunk}")
+    if "error" in chunk:
+        raise TransformValidationError(f"Ollama stream error: {chunk['error']}")
+    return str(chunk.get("response", "")), bool(chunk.get("done"))
+
+
+def _generate_stream(
+    prompt: str,
+    model: str,
+    base_url: str,
+    timeout: float = 60.0,
+) -> dict[str, Any]:
+    req = _request(base_url, model, prompt, stream=True)
+    scanner = IncrementalJsonScanner()
+    fragments: list[str] = []
+
+    try:
+        with request.urlopen(req, timeout=timeout) as resp:
+            for line in resp:
+                if not line.strip():
+                    continue
+                text, done = _stream_fragment(line)
+                fragments.append(text)
+                # Leaving the with-block closes the connection, which stops
+                # generation as soon as the first complete object has arrived.
+                if scanner.feed(text) is not None:
+                    return scanner.result
+                if done:
+                    break
+    except error.HTTPError as exc:
+        body = exc.read().decode("utf-8", errors="replace")
+        raise TransformValidationError(
+            f"Ollama HTTP error {exc.code}: {body}"
+        ) from exc
+    except error.URLError as exc:
+        raise TransformValidationError(f"Ollama connection failed: {exc}") from exc
+
+    return _extract_json_object("".join(fragments))
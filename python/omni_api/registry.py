@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from os import PathLike
+from pathlib import Path
+from threading import Lock
+from typing import Callable
+
+from .errors import TransformSchemaError
+from .schema import CompiledSchema, compile_schema
+
+DEFAULT_SCHEMA_DIR = "schemas"
+DEFAULT_RELOAD_INTERVAL = 1.0
+
+
+@dataclass(frozen=True)
+class _Entry:
+    schema: CompiledSchema
+    mtime_ns: int
+    size: int
+    checked: float
+
+
+class SchemaRegistry:
+    """Lazily compiled view of a ``<root>/<provider>/<endpoint>.json`` schema tree.
+
+    Nothing is read until a route is first requested. After that a route's file
+    is re-stat'ed at most every ``reload_interval`` seconds and only re-parsed
+    when its mtime or size changed; ``reload_interval=None`` disables reloading.
+    """
+
+    def __init__(
+        self,
+        root: str | PathLike[str] = DEFAULT_SCHEMA_DIR,
+        *,
+        reload_interval: float | None = DEFAULT_RELOAD_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.root = Path(root)
+        self.reload_interval = reload_interval
+        self._clock = clock
+        self._entries: dict[str, _Entry] = {}
+        self._lock = Lock()
+        self._loads = 0
+
+    @property
+    def loads(self) -> int:
+        return self._loads
+
+    def __contains__(self, route: str) -> bool:
+        try:
+            return self._path(route).is_file()
+        except TransformSchemaError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def routes(self) -> list[str]:
+        if not self.root.is_dir():
+            return []
+        return sorted(
+            f"{provider.name}/{endpoint.stem}"
+            for provider in self.root.iterdir()
+            if provider.is_dir()
+            for endpoint in provider.glob("*.json")
+        )
+
+    def _path(self, route: str) -> Path:
+        provider, sep, endpoint = route.partition("/")
+        if not sep or not provider or not endpoint or "/" in endpoint or ".." in (provider, endpoint):
+            raise TransformSchemaError(f"Schema route must look like 'provider/endpoint', got {route!r}")
+        return self.root / provider / f"{endpoint}.json"
+
+    def get(self, route: str) -> CompiledSchema:
+        entry = self._entries.get(route)
+        if entry is not None:
+            if self.reload_interval is None or self._clock() - entry.checked < self.reload_interval:
+                return entry.schema
+        return self._load(route, entry)
+
+    def _load(self, route: str, entry: _Entry | None) -> CompiledSchema:
+        path = self._path(route)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(route, None)
+            raise TransformSchemaError(f"Unknown schema route {route!r} (no {path})") from None
+
+        now = self._clock()
+        if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+            schema = entry.schema
+        else:
+            try:
+                raw = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError as exc:
+                raise TransformSchemaError(f"Schema {path} is not valid JSON: {exc}") from exc
+            if not isinstance(raw, dict):
+                raise TransformSchemaError(f"Schema {path} must be a JSON object")
+            schema = compile_schema(raw)
+        with self._lock:
+            if entry is None or schema is not entry.schema:
+                self._loads += 1
+            self._entries[route] = _Entry(schema, stat.st_mtime_ns, stat.st_size, now)
+        return schema
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+default_schema_registry = SchemaRegistry(os.environ.get("OMNI_API_SCHEMA_DIR", DEFAULT_SCHEMA_DIR))
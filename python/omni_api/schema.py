@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import cached_property
+from threading import Lock
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping, Union
+
+from .errors import TransformSchemaError
+
+if TYPE_CHECKING:
+    from .validator import PayloadValidator
+
+REQUIRED_SCHEMA_KEYS = {"type", "properties", "required"}
+
+
+def validate_schema_subset(target_schema: dict[str, Any]) -> None:
+    if target_schema.get("type") != "object":
+        raise TransformSchemaError("Only object root schema is supported in MVP")
+
+    properties = target_schema.get("properties")
+    if not isinstance(properties, dict):
+        raise TransformSchemaError("Schema must define object properties as a dict")
+
+    unknown = set(target_schema.keys()) - REQUIRED_SCHEMA_KEYS
+    if unknown:
+        raise TransformSchemaError(f"Unsupported top-level schema keys: {sorted(unknown)}")
+
+
+def schema_fingerprint(target_schema: dict[str, Any]) -> str:
+    encoded = json.dumps(_canonical(target_schema), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _canonical(spec: Any) -> Any:
+    # Keys are sorted except under "properties", whose order is the output key
+    # order; it is kept as a list of pairs, down into array item schemas.
+    if not isinstance(spec, dict):
+        return spec
+    canonical = dict(spec)
+    if isinstance(spec.get("items"), dict):
+        canonical["items"] = _canonical(spec["items"])
+    properties = spec.get("properties")
+    if isinstance(properties, dict):
+        canonical["properties"] = [[key, _canonical(value)] for key, value in properties.items()]
+    return canonical
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledSchema:
+    """Target schema unpacked once; equality and hashing use the content hash.
+
+    ``source`` is a read-only view of the schema dict's top level only; the
+    nested dicts it holds are shared with the compiled state and must not be
+    mutated. The content hash keeps ``properties`` order, since output keys
+    follow it.
+    """
+
+    properties: tuple[str, ...]
+    allowed: frozenset[str]
+    required: tuple[str, ...]
+    source: Mapping[str, Any] = field(repr=False)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.source, MappingProxyType):
+            object.__setattr__(self, "source", MappingProxyType(self.source))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Mapping proxies do not pickle; the CLI ships compiled schemas to workers.
+        return (CompiledSchema, (self.properties, self.allowed, self.required, dict(self.source)))
+
+    @cached_property
+    def content_hash(self) -> str:
+        return schema_fingerprint(dict(self.source))
+
+    @cached_property
+    def validator(self) -> PayloadValidator:
+        from .validator import PayloadValidator
+
+        return PayloadValidator(self)
+
+    @cached_property
+    def item_schemas(self) -> dict[str, CompiledSchema]:
+        # Array-of-object properties, keyed by property name.
+        items: dict[str, CompiledSchema] = {}
+        for key, spec in self.source.get("properties", {}).items():
+            if not isinstance(spec, dict) or spec.get("type") != "array":
+                continue
+            item = spec.get("items")
+            if isinstance(item, dict) and isinstance(item.get("properties"), dict):
+                items[key] = _compile(item)
+        return items
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompiledSchema):
+            return NotImplemented
+        return self is other or self.content_hash == other.content_hash
+
+    def __hash__(self) -> int:
+        return hash(self.content_hash)
+
+
+SchemaLike = Union[dict[str, Any], CompiledSchema]
+
+
+def _compile(target_schema: dict[str, Any]) -> CompiledSchema:
+    properties = tuple(target_schema.get("properties", {}).keys())
+    return CompiledSchema(
+        properties=properties,
+        allowed=frozenset(properties),
+        required=tuple(key for key in target_schema.get("required", []) if isinstance(key, str)),
+        source=target_schema,
+    )
+
+
+def compile_schema(target_schema: SchemaLike) -> CompiledSchema:
+    if isinstance(target_schema, CompiledSchema):
+        return target_schema
+    validate_schema_subset(target_schema)
+    return _compile(copy.deepcopy(target_schema))
+
+
+def as_compiled(target_schema: SchemaLike, *, validate: bool = False) -> CompiledSchema:
+    # Per-call path for raw dicts. Planner, executor and validator keep
+    # accepting unvalidated dicts as they always have.
+    if isinstance(target_schema, CompiledSchema):
+        return target_schema
+    if validate:
+        validate_schema_subset(target_schema)
+    return _cached_compile(target_schema)
+
+
+# Raw dict schemas are compiled once and reused, so transform(payload, dict)
+# does not rehash the schema and rebuild its validator on every call. The
+# identity table skips hashing when the caller passes the same dict object;
+# its entry is only trusted while the dict still equals the compiled copy.
+_CACHE_SIZE = 128
+_by_identity: OrderedDict[int, tuple[dict[str, Any], CompiledSchema]] = OrderedDict()
+_by_hash: OrderedDict[str, CompiledSchema] = OrderedDict()
+_cache_lock = Lock()
+
+
+def _cached_compile(target_schema: dict[str, Any]) -> CompiledSchema:
+    key = id(target_schema)
+    with _cache_lock:
+        entry = _by_identity.get(key)
+    if entry is not None and entry[0] is target_schema and _unchanged(entry[1], target_schema):
+        return entry[1]
+
+    digest = schema_fingerprint(target_schema)
+    with _cache_lock:
+        compiled = _by_hash.get(digest)
+        if compiled is not None:
+            _by_hash.move_to_end(digest)
+    if compiled is None:
+        # Copied because the cached schema outlives the caller's dict.
+        compiled = _compile(copy.deepcopy(target_schema))
+    with _cache_lock:
+        _by_hash[digest] = compiled
+        _by_identity[key] = (target_schema, compiled)
+        for table in (_by_hash, _by_identity):
+            if len(table) > _CACHE_SIZE:
+                table.popitem(last=False)
+    return compiled
+
+
+def _unchanged(compiled: CompiledSchema, target_schema: dict[str, Any]) -> bool:
+    # Dict equality ignores key order, which the property order depends on.
+    properties = target_schema.get("properties")
+    return (
+        isinstance(properties, dict)
+        and tuple(properties) == compiled.properties
+        and compiled.source == target_schema
+    )
@@ -0,0 +1,451 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable
+
+from .api import REPORT_MODES, _check_report_mode
+from .async_api import _provider_client, transform_async, transform_many_async
+from .errors import TransformPlanError, TransformSchemaError, TransformValidationError
+from .llm_cache import LLMResponseCache
+from .plan_cache import PlanCache, default_plan_cache
+from .plan_store import PlanStore
+from .plan_types import RecordError, TransformResult
+from .providers import available_providers
+from .registry import DEFAULT_SCHEMA_DIR, SchemaRegistry
+from .schema import CompiledSchema
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 128
+DEFAULT_KEEP_ALIVE = 15.0
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+_Job = tuple[Callable[[], Awaitable[Any]], "asyncio.Future[Any]"]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class TransformServer:
+    """Keep-alive HTTP/1.1 transform service over a ``SchemaRegistry``.
+
+    Requests are queued for ``workers`` tasks; once ``queue_size`` requests are
+    waiting, new ones are answered with 503 and ``Retry-After`` instead of
+    piling up. The plan cache, LLM cache and Ollama client are shared by all
+    requests for the life of the server.
+    """
+
+    def __init__(
+        self,
+        registry: SchemaRegistry,
+        *,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        keep_alive: float = DEFAULT_KEEP_ALIVE,
+        plan_cache: PlanCache | None = default_plan_cache,
+        llm_provider: str | None = None,
+        llm_model: str | None = None,
+        llm_base_url: str | None = None,
+        llm_cache: LLMResponseCache | None = None,
+        report: str = "full",
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be >= 1")
+        _check_report_mode(report)
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.queue_size = queue_size
+        self.keep_alive = keep_alive
+        self.plan_cache = plan_cache
+        self.llm_provider = llm_provider
+        self.llm_model = llm_model
+        self.llm_base_url = llm_base_url
+        self.llm_cache = llm_cache
+        self.report = report
+        self.served = 0
+        self.rejected = 0
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._server: asyncio.Server | None = None
+        self._client: Any = None
+
+    async def __aenter__(self) -> TransformServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(self.queue_size)
+        if self.llm_provider is not None:
+            self._client = _provider_client(self.llm_provider, self.llm_base_url, self.workers)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Port 0 binds an ephemeral port; report the real one.
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        await self._server.serve_forever()
+
+    async def aclose(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "served": self.served,
+            "rejected": self.rejected,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "workers": self.workers,
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            run, future = await self._queue.get()
+            try:
+                if not future.cancelled():
+                    future.set_result(await run())
+            except Exception as exc:
+                if not future.cancelled():
+                    future.set_exception(exc)
+            finally:
+                self._queue.task_done()
+
+    async def _submit(self, run: Callable[[], Awaitable[Any]]) -> Any:
+        assert self._queue is not None
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((run, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise HTTPError(503, "Server is at capacity; retry later") from None
+        return await future
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(_read_request_head(reader), self.keep_alive)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except (asyncio.LimitOverrunError, ValueError):
+                    await _write_response(writer, 400, {"error": "Malformed request"}, keep_alive=False)
+                    return
+                method, target, version, headers = head
+                keep_alive = _wants_keep_alive(version, headers)
+                try:
+                    body = await _read_body(reader, headers)
+                    status, response = 200, await self._dispatch(method, target, body)
+                except HTTPError as exc:
+                    status, response = exc.status, {"error": str(exc)}
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    raise
+                except Exception as exc:
+                    status, response = 500, {"error": f"{type(exc).__name__}: {exc}"}
+                extra = {"Retry-After": "1"} if status == 503 else None
+                await _write_response(writer, status, response, keep_alive=keep_alive, headers=extra)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> dict[str, Any]:
+        path = target.split("?", 1)[0]
+        if path == "/healthz":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return {"status": "ok", **self.stats()}
+        if path not in ("/transform", "/transform/batch"):
+            raise HTTPError(404, f"No such endpoint {path!r}")
+        if method != "POST":
+            raise HTTPError(405, "Use POST")
+
+        request = _parse_json(body)
+        route = request.get("route")
+        if not isinstance(route, str):
+            raise HTTPError(400, "Request needs a 'route' string ('provider/endpoint')")
+        report = request.get("report", self.report)
+        if report not in REPORT_MODES:
+            raise HTTPError(400, f"report must be one of {REPORT_MODES}")
+        schema = self._schema(route)
+
+        if path == "/transform":
+            payload = request.get("payload")
+            if not isinstance(payload, dict):
+                raise HTTPError(400, "Request needs a 'payload' object")
+            try:
+                result = await self._submit(lambda: self._transform_one(payload, schema, report))
+            except TransformValidationError as exc:
+                raise HTTPError(422, str(exc)) from exc
+            self.served += 1
+            return _result_json(result)
+
+        records = request.get("records")
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            raise HTTPError(400, "Request needs a 'records' list of objects")
+        results = await self._submit(lambda: self._transform_batch(records, schema, report))
+        self.served += 1
+        return {
+            "results": [_result_json(result) for result in results],
+            "errors": sum(isinstance(result, RecordError) for result in results),
+        }
+
+    def _schema(self, route: str) -> CompiledSchema:
+        try:
+            return self.registry.get(route)
+        except TransformSchemaError as exc:
+            raise HTTPError(404 if route not in self.registry else 500, str(exc)) from exc
+
+    async def _transform_one(self, payload: dict[str, Any], schema: CompiledSchema, report: str) -> TransformResult:
+        return await transform_async(
+            payload,
+            schema,
+            llm_provider=self.llm_provider,
+            llm_model=self.llm_model,
+            client=self._client,
+            llm_cache=self.llm_cache,
+            plan_cache=self.plan_cache,
+            report=report,
+        )
+
+    async def _transform_batch(
+        self,
+        records: list[dict[str, Any]],
+        schema: CompiledSchema,
+        report: str,
+    ) -> list[TransformResult | RecordError]:
+        results = transform_many_async(
+            records,
+            schema,
+            errors="collect",
+            llm_provider=self.llm_provider,
+            llm_model=self.llm_model,
+            client=self._client,
+            llm_cache=self.llm_cache,
+            plan_cache=self.plan_cache,
+            report=report,
+        )
+        return [result async for result in results]
+
+
+async def _read_request_head(reader: asyncio.StreamReader) -> tuple[str, str, str, dict[str, str]]:
+    request_line = await reader.readuntil(b"\r\n")
+    parts = request_line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ValueError(f"Malformed request line: {request_line!r}")
+    headers: dict[str, str] = {}
+    while True:
+        line = await reader.readuntil(b"\r\n")
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return parts[0].upper(), parts[1], parts[2], headers
+
+
+async def _read_chunk_size(reader: asyncio.StreamReader) -> int:
+    try:
+        size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+    except (asyncio.LimitOverrunError, ValueError):
+        raise HTTPError(400, "Invalid chunk size") from None
+    if size < 0:
+        raise HTTPError(400, "Invalid chunk size")
+    return size
+
+
+async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        pieces: list[bytes] = []
+        total = 0
+        while True:
+            size = await _read_chunk_size(reader)
+            if size == 0:
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(pieces)
+            total += size
+            if total > MAX_BODY_BYTES:
+                raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+            pieces.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    try:
+        length = int(headers.get("content-length", "0") or 0)
+    except ValueError:
+        raise HTTPError(400, "Invalid Content-Length") from None
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, f"Request body exceeds {MAX_BODY_BYTES} bytes")
+    return await reader.readexactly(length) if length else b""
+
+
+def _wants_keep_alive(version: str, headers: dict[str, str]) -> bool:
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return connection == "keep-alive"
+    return connection != "close"
+
+
+def _parse_json(body: bytes) -> dict[str, Any]:
+    try:
+        request = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise HTTPError(400, f"Request body is not valid JSON: {exc}") from exc
+    if not isinstance(request, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return request
+
+
+def _result_json(result: TransformResult | RecordError) -> dict[str, Any]:
+    if isinstance(result, RecordError):
+        return {"index": result.index, "error": str(result.error)}
+    return {
+        "payload": result.payload,
+        "report": asdict(result.report) if result.report is not None else None,
+    }
+
+
+async def _write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: dict[str, Any],
+    *,
+    keep_alive: bool,
+    headers: dict[str, str] | None = None,
+) -> None:
+    data = json.dumps(body, separators=(",", ":"), default=str).encode("utf-8")
+    lines = [
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+        "Content-Type: application/json",
+        f"Content-Length: {len(data)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + data)
+    await writer.drain()
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m omni_api.serve",
+        description="Serve /transform and /transform/batch over a schema registry.",
+    )
+    parser.add_argument(
+        "--schemas",
+        default=DEFAULT_SCHEMA_DIR,
+        help=f"schema registry root (default: {DEFAULT_SCHEMA_DIR})",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"bind address (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"bind port (default: {DEFAULT_PORT})")
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"concurrent transform tasks (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"queued requests before answering 503 (default: {DEFAULT_QUEUE_SIZE})",
+    )
+    parser.add_argument(
+        "--report",
+        choices=REPORT_MODES,
+        default="full",
+        help="default report mode when a request does not set one (default: full)",
+    )
+    parser.add_argument("--plan-store", metavar="DIR", help="load pinned plans from this PlanStore directory")
+    parser.add_argument("--llm-provider", help="align payloads with a registered LLM provider (e.g. ollama)")
+    parser.add_argument("--llm-model", help="LLM model name")
+    parser.add_argument("--llm-base-url", help="LLM provider base URL (default: the provider's)")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.queue_size < 1:
+        parser.error("--queue-size must be >= 1")
+    if args.llm_provider and args.llm_provider not in available_providers():
+        parser.error(f"unknown --llm-provider {args.llm_provider!r}; available: {available_providers()}")
+
+    try:
+        store = PlanStore(args.plan_store) if args.plan_store else None
+    except (OSError, TransformPlanError) as exc:
+        parser.error(f"--plan-store: {exc}")
+    server = TransformServer(
+        SchemaRegistry(args.schemas),
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        plan_cache=PlanCache(store=store),
+        llm_provider=args.llm_provider,
+        llm_model=args.llm_model,
+        llm_base_url=args.llm_base_url,
+        llm_cache=LLMResponseCache() if args.llm_provider else None,
+        report=args.report,
+    )
+
+    async def run() -> None:
+        async with server:
+            print(f"omni-api: serving on http://{server.host}:{server.port}", file=sys.stderr, flush=True)
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
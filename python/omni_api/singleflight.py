@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import copy
+from dataclasses import dataclass
+from threading import Event, Lock
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, TypeVar
+
+if TYPE_CHECKING:
+    import asyncio
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class SingleFlightStats:
+    calls: int
+    coalesced: int
+    in_flight: int
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time; concurrent callers with the same key share it.
+
+    The first caller runs the function. Callers arriving while it is in flight
+    wait for its result (a deep copy, so nobody shares a mutable payload) or
+    its exception. ``coalesced`` counts the calls saved this way. Threaded and
+    asyncio callers are tracked separately, since a thread cannot await a
+    future owned by another event loop.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: dict[str, _Call] = {}
+        self._futures: dict[tuple[int, str], asyncio.Future[Any]] = {}
+        self._leaders = 0
+        self._coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], _T]) -> tuple[_T, bool]:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.value), True
+
+        try:
+            call.value = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[_T]]) -> tuple[_T, bool]:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        flight = (id(loop), key)
+        with self._lock:
+            future = self._futures.get(flight)
+            leader = future is None
+            if future is None:
+                future = self._futures[flight] = loop.create_future()
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            try:
+                value = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if future.cancelled() and task is not None and not task.cancelling():
+                    # The leader was cancelled, not us: run the call ourselves.
+                    return await self.do_async(key, fn)
+                raise
+            return copy.deepcopy(value), True
+
+        try:
+            value = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # retrieved here, so no "never retrieved" log without waiters
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            with self._lock:
+                del self._futures[flight]
+        return value, False
+
+    def stats(self) -> SingleFlightStats:
+        with self._lock:
+            return SingleFlightStats(
+                calls=self._leaders,
+                coalesced=self._coalesced,
+                in_flight=len(self._calls) + len(self._futures),
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._leaders = 0
+            self._coalesced = 0
+
+
+default_singleflight = SingleFlight()
@@ -1,22 +1,267 @@
 from __future__ import annotations
 
-from typing import Any
+import re
+from typing import Any, Callable, Iterable
 
 from .errors import TransformValidationError
+from .schema import CompiledSchema, SchemaLike, as_compiled
 
+_MISSING = object()
 
-def validate_payload(
+
+class _Sentinel:
+    pass
+
+
+# Distinct one-element sets, so ``type(value) in ...`` is always False for them.
+_ANY: frozenset[Any] = frozenset({_Sentinel})
+_UNKNOWN: frozenset[Any] = frozenset({type("_Unknown", (), {})})
+
+_INTEGER_TEXT = re.compile(r"-?\d+")
+_NUMBER_TEXT = re.compile(r"-?\d+(\.\d+)?([eE][-+]?\d+)?")
+
+# JSON Schema type -> Python types accepted by an exact ``type(value)`` lookup.
+_EXACT_TYPES: dict[str, tuple[type, ...]] = {
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+    "null": (type(None),),
+}
+
+
+def _is_instance(kind: str, value: Any) -> bool:
+    # Slow path for subclasses and integral floats; bool is never a number.
+    if isinstance(value, bool):
+        return kind == "boolean"
+    if kind == "integer":
+        return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+    return isinstance(value, _EXACT_TYPES[kind])
+
+
+def _coerce_integer(value: Any) -> Any:
+    if isinstance(value, str) and _INTEGER_TEXT.fullmatch(value):
+        return int(value)
+    return _MISSING
+
+
+def _coerce_number(value: Any) -> Any:
+    if isinstance(value, str) and _NUMBER_TEXT.fullmatch(value):
+        return int(value) if _INTEGER_TEXT.fullmatch(value) else float(value)
+    return _MISSING
+
+
+def _coerce_boolean(value: Any) -> Any:
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in ("true", "false"):
+            return lowered == "true"
+    return _MISSING
+
+
+_COERCERS: dict[str, Callable[[Any], Any]] = {
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "boolean": _coerce_boolean,
+}
+
+
+class _TypeCheck:
+    __slots__ = ("kinds", "exact", "expected", "coercers")
+
+    def __init__(self, kinds: tuple[str, ...]) -> None:
+        self.kinds = kinds
+        self.exact = frozenset(t for kind in kinds for t in _EXACT_TYPES[kind])
+        self.expected = " or ".join(kinds)
+        self.coercers = tuple(_COERCERS[kind] for kind in kinds if kind in _COERCERS)
+
+    def matches(self, value: Any) -> bool:
+        return any(_is_instance(kind, value) for kind in self.kinds)
+
+    def coerce(self, value: Any) -> Any:
+        for coercer in self.coercers:
+            coerced = coercer(value)
+            if coerced is not _MISSING:
+                return coerced
+        return _MISSING
+
+
+def _type_check(spec: Any) -> _TypeCheck | None:
+    declared = spec.get("type") if isinstance(spec, dict) else None
+    if isinstance(declared, str):
+        kinds: tuple[Any, ...] = (declared,)
+    elif isinstance(declared, list) and all(isinstance(kind, str) for kind in declared):
+        kinds = tuple(declared)
+    else:
+        return None
+    # Unknown type names are left unchecked rather than rejecting every value.
+    kinds = tuple(kind for kind in kinds if kind in _EXACT_TYPES)
+    return _TypeCheck(kinds) if kinds else None
+
+
+class PayloadValidator:
+    """Schema compiled into a per-key table of type checks.
+
+    Built once per ``CompiledSchema`` (see ``CompiledSchema.validator``). A
+    value passes on an exact ``type()`` lookup; only misses fall through to
+    ``isinstance`` checks and, with ``coerce=True``, to string coercions
+    (numeric text to numbers, ``"true"``/``"false"`` to booleans).
+    """
+
+    __slots__ = ("_exact", "_checks", "_items")
+
+    def __init__(self, schema: CompiledSchema) -> None:
+        properties = schema.source.get("properties", {})
+        self._checks: dict[str, _TypeCheck | None] = {
+            key: _type_check(properties[key]) for key in schema.properties
+        }
+        # Hot-path table: every allowed key maps to the exact types that pass
+        # without further work; unchecked keys map to _ANY.
+        self._exact: dict[str, frozenset[Any]] = {
+            key: _ANY if check is None else check.exact for key, check in self._checks.items()
+        }
+        self._items: tuple[tuple[str, CompiledSchema], ...] = tuple(schema.item_schemas.items())
+
+    def __call__(
+        self,
+        payload: dict[str, Any],
+        required: Iterable[str],
+        coerce: bool = False,
+    ) -> None:
+        exact = self._exact
+        unknown: list[str] | None = None
+        mismatched: list[str] | None = None
+        for key, value in payload.items():
+            types = exact.get(key, _UNKNOWN)
+            if type(value) in types or types is _ANY:
+                continue
+            if types is _UNKNOWN:
+                unknown = [] if unknown is None else unknown
+                unknown.append(key)
+                continue
+            problem = _check_value(payload, key, value, self._checks[key], coerce)
+            if problem is not None:
+                mismatched = [] if mismatched is None else mismatched
+                mismatched.append(problem)
+        if unknown is not None:
+            raise TransformValidationError(f"Output contains unknown keys: {sorted(unknown)}")
+
+        missing_required = sorted(key for key in required if key not in payload)
+        if self._items:
+            mismatched = self._check_items(payload, missing_required, mismatched, coerce)
+        if missing_required:
+            raise TransformValidationError(f"Missing required fields: {missing_required}")
+        if mismatched is not None:
+            raise TransformValidationError(f"Type mismatch: {mismatched}")
+
+    def check_column(
+        self,
+        key: str,
+        values: list[Any],
+        skip: Iterable[int] = (),
+        coerce: bool = False,
+    ) -> tuple[list[int], str | None]:
+        """Check one target key down a column of values.
+
+        Returns the failing row indexes and the first problem found. Rows in
+        ``skip`` (unresolved cells) are not checked; with ``coerce=True``
+        coerced cells are replaced in ``values``.
+        """
+        exact = self._exact.get(key, _ANY)
+        item_schema = next((schema for name, schema in self._items if name == key), None)
+        if exact is _ANY and item_schema is None:
+            return [], None
+        skipped = set(skip)
+        if item_schema is None:
+            # Only cells that miss the exact type lookup reach the slow path.
+            suspects: Iterable[int] = [
+                index for index, value in enumerate(values) if type(value) not in exact
+            ]
+        else:
+            suspects = range(len(values))
+        bad: list[int] = []
+        problem: str | None = None
+        for index in suspects:
+            if index in skipped:
+                continue
+            value = values[index]
+            if exact is not _ANY and type(value) not in exact:
+                cell = {key: value}
+                found = _check_value(cell, key, value, self._checks[key], coerce)
+                values[index] = cell[key]
+                if found is not None:
+                    bad.append(index)
+                    problem = problem or found
+                    continue
+            if item_schema is not None and isinstance(value, list):
+                missing: list[str] = []
+                found_items = self._check_items({key: value}, missing, None, coerce)
+                if missing or found_items:
+                    bad.append(index)
+                    problem = problem or (found_items[0] if found_items else f"missing {missing[0]}")
+        return bad, problem
+
+    def _check_items(
+        self,
+        payload: dict[str, Any],
+        missing: list[str],
+        mismatched: list[str] | None,
+        coerce: bool,
+    ) -> list[str] | None:
+        for key, item_schema in self._items:
+            items = payload.get(key)
+            if not isinstance(items, list):
+                continue
+            required = item_schema.required
+            validator = item_schema.validator
+            exact, checks = validator._exact, validator._checks
+            for position, item in enumerate(items):
+                if not isinstance(item, dict):
+                    continue
+                for field in required:
+                    if field not in item:
+                        missing.append(f"{key}[{position}].{field}")
+                for field, value in item.items():
+                    types = exact.get(field, _ANY)
+                    if type(value) in types or types is _ANY:
+                        continue
+                    problem = _check_value(item, field, value, checks[field], coerce)
+                    if problem is not None:
+                        mismatched = [] if mismatched is None else mismatched
+                        mismatched.append(f"{key}[{position}].{problem}")
+        return mismatched
+
+
+def _check_value(
     payload: dict[str, Any],
-    target_schema: dict[str, Any],
-    required: list[str],
-) -> list[str]:
-    allowed = set(target_schema.get("properties", {}).keys())
-    unknown = sorted(key for key in payload.keys() if key not in allowed)
-    if unknown:
-        raise TransformValidationError(f"Output contains unknown keys: {unknown}")
+    key: str,
+    value: Any,
+    check: _TypeCheck,
+    coerce: bool,
+) -> str | None:
+    if check.matches(value):
+        return None
+    if coerce:
+        coerced = check.coerce(value)
+        if coerced is not _MISSING:
+            payload[key] = coerced
+            return None
+    return f"{key}: expected {check.expected}, got {type(value).__name__}"
 
-    missing_required = sorted(key for key in required if key not in payload)
-    if missing_required:
-        raise TransformValidationError(f"Missing required fields: {missing_required}")
 
-    return missing_required
+def compile_validator(target_schema: SchemaLike) -> PayloadValidator:
+    return as_compiled(target_schema).validator
+
+
+def validate_payload(
+    payload: dict[str, Any],
+    target_schema: SchemaLike,
+    required: Iterable[str],
+    *,
+    coerce: bool = False,
+) -> list[str]:
+    compile_validator(target_schema)(payload, required, coerce)
+    # Failures raise, so a returned report never lists missing fields.
+    return []
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlsplit
+
+DEMO_ROUTE = "demo/person"
+DEMO_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "email": {"type": "string"},
+        "age": {"type": "integer"},
+        "city": {"type": "string"},
+    },
+    "required": ["name"],
+}
+
+
+def demo_record(i: int) -> dict[str, Any]:
+    return {
+        "full_name": f"user {i}",
+        "contact": {"email": f"u{i}@example.com", "phone": "555"},
+        "age": i % 90,
+        "address": {"city": "Springfield", "zip": "00000"},
+        "tracking": {"session": f"s{i}", "ts": i},
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_ready(host: str, port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        return
+
+
+async def post(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str, body: bytes) -> int:
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: loadtest\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+        + body
+    )
+    await writer.drain()
+    status = int((await reader.readuntil(b"\r\n")).split()[1])
+    length = 0
+    while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(
+    host: str,
+    port: int,
+    path: str,
+    bodies: list[bytes],
+    latencies: list[float],
+    statuses: dict[int, int],
+) -> None:
+    # One keep-alive connection per client, as a pooled service caller would use.
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            status = await post(reader, writer, path, body)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_load(host: str, port: int, args: argparse.Namespace) -> dict[str, Any]:
+    if args.batch:
+        path = "/transform/batch"
+        make = lambda i: {  # noqa: E731
+            "route": args.route,
+            "records": [demo_record(i * args.batch + j) for j in range(args.batch)],
+            "report": args.report,
+        }
+    else:
+        path = "/transform"
+        make = lambda i: {"route": args.route, "payload": demo_record(i), "report": args.report}  # noqa: E731
+    bodies = [json.dumps(make(i)).encode("utf-8") for i in range(args.requests)]
+    shares = [bodies[c :: args.concurrency] for c in range(args.concurrency)]
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    await wait_ready(host, port)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, path, share, latencies, statuses) for share in shares))
+    elapsed = time.perf_counter() - start
+
+    records = args.requests * (args.batch or 1)
+    return {
+        "path": path,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_sec": round(args.requests / elapsed, 1),
+        "records_per_sec": round(records / elapsed, 1),
+        "latency_ms": {
+            name: round(percentile(latencies, fraction) * 1000, 3)
+            for name, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("max", 1.0))
+        },
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load-test the omni_api HTTP transform service.")
+    parser.add_argument("--url", help="existing server (default: start one on a free localhost port)")
+    parser.add_argument("--route", default=DEMO_ROUTE, help=f"schema route (default: {DEMO_ROUTE})")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=0, help="records per /transform/batch request (0: /transform)")
+    parser.add_argument("--report", default="counts", choices=["full", "counts", "none"])
+    parser.add_argument("--workers", type=int, default=4, help="server workers when starting one")
+    parser.add_argument("--queue-size", type=int, default=128, help="server queue size when starting one")
+    args = parser.parse_args()
+
+    if args.url:
+        parts = urlsplit(args.url)
+        return _report(asyncio.run(run_load(parts.hostname or "127.0.0.1", parts.port or 80, args)))
+
+    with tempfile.TemporaryDirectory() as schemas:
+        provider, endpoint = DEMO_ROUTE.split("/")
+        (Path(schemas) / provider).mkdir()
+        (Path(schemas) / provider / f"{endpoint}.json").write_text(json.dumps(DEMO_SCHEMA), encoding="utf-8")
+        port = free_port()
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "omni_api.serve",
+                "--schemas",
+                schemas,
+                "--port",
+                str(port),
+                "--workers",
+                str(args.workers),
+                "--queue-size",
+                str(args.queue_size),
+            ],
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            return _report(asyncio.run(run_load("127.0.0.1", port, args)))
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+
+def _report(result: dict[str, Any]) -> int:
+    print(json.dumps(result, indent=2))
+    return 0 if set(result["statuses"]) == {"200"} else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
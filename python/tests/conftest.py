@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator
+
+import pytest
+
+
+class OllamaStub:
+    """Local stand-in for the Ollama /api/generate endpoint."""
+
+    def __init__(self) -> None:
+        self.requests: list[dict[str, Any]] = []
+        self.connections = 0
+        self.fail_next = 0
+        self.delay = 0.0
+        self.respond: Callable[[dict[str, Any]], str] = lambda body: json.dumps({"name": "Stub"})
+        self.stream_piece_size = 8
+        self.stream_delay = 0.0
+        self.stream_aborted = threading.Event()
+        self.base_url = ""
+
+
+@pytest.fixture
+def ollama_stub() -> Iterator[OllamaStub]:
+    stub = OllamaStub()
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            with lock:
+                stub.connections += 1
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with lock:
+                stub.requests.append(body)
+                failing = stub.fail_next > 0
+                if failing:
+                    stub.fail_next -= 1
+            if stub.delay:
+                time.sleep(stub.delay)
+            if failing:
+                self._send(503, {"error": "busy"})
+                return
+            if body.get("stream"):
+                self._stream(body["model"], stub.respond(body))
+                return
+            self._send(200, {"model": body["model"], "response": stub.respond(body), "done": True})
+
+        def _stream(self, model: str, text: str) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            size = stub.stream_piece_size
+            pieces = [text[i : i + size] for i in range(0, len(text), size)]
+            lines = [{"model": model, "response": piece, "done": False} for piece in pieces]
+            lines.append({"model": model, "response": "", "done": True})
+            try:
+                for line in lines:
+                    data = (json.dumps(line) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+                    if stub.stream_delay:
+                        time.sleep(stub.stream_delay)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                stub.stream_aborted.set()
+                self.close_connection = True
+
+        def _send(self, status: int, payload: dict[str, Any]) -> None:
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    class Server(ThreadingHTTPServer):
+        def handle_error(self, request: Any, client_address: Any) -> None:
+            pass  # clients that time out on purpose close their sockets early
+
+    server = Server(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    stub.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    try:
+        yield stub
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,120 @@
+import pickle
+
+import pytest
+
+from omni_api import (
+    Mapping,
+    TransformPlan,
+    TransformValidationError,
+    apply_plan,
+    compile_plan,
+    dump_plan,
+    load_plan,
+    transform,
+    transform_columnar,
+)
+from omni_api.plan_cache import shape_fingerprint
+from omni_api.planner import build_plan
+
+ITEM = {
+    "type": "object",
+    "properties": {"sku": {"type": "string"}, "qty": {"type": "integer"}, "amount": {"type": "number"}},
+    "required": ["sku"],
+}
+SCHEMA = {
+    "type": "object",
+    "properties": {"order_id": {"type": "string"}, "items": {"type": "array", "items": ITEM}},
+    "required": ["order_id"],
+}
+SOURCE = {
+    "order_id": "o-1",
+    "items": [
+        {"sku": "a", "qty": 1, "price": {"amount": 1.5}, "note": "x"},
+        {"sku": "b", "qty": 2, "price": {"amount": 2.5}},
+        "not an object",
+    ],
+}
+
+
+def test_array_of_object_target_gets_each_sub_plan() -> None:
+    plan = build_plan(SOURCE, SCHEMA)
+
+    each = plan.mappings[1]
+    assert (each.from_path, each.to_key, each.op) == ("items", "items", "each")
+    assert [(m.from_path, m.to_key) for m in each.items.mappings] == [
+        ("sku", "sku"),
+        ("qty", "qty"),
+        ("price.amount", "amount"),
+    ]
+    assert each.items.drops == ("note",)
+    assert each.items.required == ("sku",)
+
+
+def test_sub_plan_runs_over_every_element() -> None:
+    result = transform(SOURCE, SCHEMA, plan_cache=None)
+
+    assert result.payload == {
+        "order_id": "o-1",
+        "items": [{"sku": "a", "qty": 1, "amount": 1.5}, {"sku": "b", "qty": 2, "amount": 2.5}],
+    }
+    plan = result.plan
+    assert apply_plan(SOURCE, SCHEMA, plan)[0] == compile_plan(plan, SCHEMA)(SOURCE)[0]
+
+
+def test_missing_required_item_field_names_the_element() -> None:
+    source = {"order_id": "o-1", "items": [{"sku": "a"}, {"qty": 2}]}
+
+    with pytest.raises(TransformValidationError, match=r"items\[1\]\.sku"):
+        transform(source, SCHEMA, plan_cache=None)
+
+
+def test_wildcard_path_collects_values_per_element() -> None:
+    schema = {
+        "type": "object",
+        "properties": {"skus": {"type": "array"}, "amounts": {"type": "array"}},
+        "required": [],
+    }
+    plan = TransformPlan(
+        mappings=[Mapping("items.*.sku", "skus"), Mapping("items.*.price.amount", "amounts")]
+    )
+
+    payload, report = compile_plan(plan, schema)(SOURCE)
+    assert payload == {"skus": ["a", "b", None], "amounts": [1.5, 2.5, None]}
+    assert report.mapped == ["amounts", "skus"]
+    assert apply_plan(SOURCE, schema, plan)[0] == payload
+
+    payload, report = compile_plan(plan, schema)({"items": {"sku": "a"}})
+    assert payload == {}
+    assert "Missing source path 'items.*.sku' for target 'skus'" in report.warnings
+
+
+def test_each_requires_items() -> None:
+    with pytest.raises(ValueError, match="items is required"):
+        Mapping("items", "items", op="each")
+    with pytest.raises(ValueError, match="op must be one of"):
+        Mapping("items", "items", op="explode")
+
+
+def test_each_plans_round_trip_through_json_and_pickle() -> None:
+    plan = build_plan(SOURCE, SCHEMA)
+
+    assert load_plan(dump_plan(plan)) == plan
+    restored = pickle.loads(pickle.dumps(plan))
+    assert restored == plan
+    assert restored.content_hash == plan.content_hash
+    assert hash(restored) == hash(plan)
+
+
+def test_item_shape_is_part_of_the_fingerprint() -> None:
+    other = {"order_id": "o-1", "items": [{"code": "a"}]}
+
+    assert shape_fingerprint(SOURCE) != shape_fingerprint(other)
+    assert shape_fingerprint({"items": []}) == shape_fingerprint({"items": [1, 2]})
+
+
+def test_columnar_expands_each_mappings() -> None:
+    records = [SOURCE, {"order_id": "o-2", "items": []}]
+    result = transform_columnar(records, SCHEMA, plan_cache=None)
+
+    assert result.columns["order_id"] == ["o-1", "o-2"]
+    assert result.columns["items"] == [transform(SOURCE, SCHEMA, plan_cache=None).payload["items"], []]
@@ -0,0 +1,28 @@
+from benchmarks.generators import ambiguous_leaf, large_llm_text
+from benchmarks.run import compare, main
+from omni_api.llm import _extract_json_object
+
+
+def _result(stage: str, us: float, kib: float = 10.0) -> dict:
+    return {"case": "wide", "stage": stage, "us_per_op": us, "ops_per_sec": 1e6 / us, "peak_kib": kib}
+
+
+def test_compare_flags_only_regressions_past_threshold() -> None:
+    baseline = [_result("build_plan", 100.0), _result("apply_plan", 10.0), _result("gone", 1.0)]
+    current = [_result("build_plan", 120.0), _result("apply_plan", 14.0, kib=20.0), _result("new", 5.0)]
+
+    regressions = compare(current, baseline, threshold=0.25)
+
+    assert len(regressions) == 2
+    assert all(line.startswith("wide/apply_plan") for line in regressions)
+
+
+def test_generators_are_deterministic() -> None:
+    assert ambiguous_leaf(groups=3, targets=2) == ambiguous_leaf(groups=3, targets=2)
+    assert _extract_json_object(large_llm_text(50))["name"] == "Jane"
+
+
+def test_suite_writes_json_and_compares(tmp_path) -> None:
+    out = tmp_path / "bench.json"
+    assert main(["--quick", "--only", "validate_payload", "--out", str(out)]) == 0
+    assert main(["--quick", "--only", "validate_payload", "--compare", str(out), "--threshold", "100"]) == 0
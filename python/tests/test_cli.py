@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from omni_api.cli import main
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def _write_inputs(tmp_path, count: int):
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA))
+    records = tmp_path / "in.ndjson"
+    lines = []
+    for i in range(count):
+        if i % 10 == 3:
+            lines.append(json.dumps({"email": f"e{i}"}))
+        elif i % 10 == 7:
+            lines.append("{not json")
+        else:
+            lines.append(json.dumps({"full_name": f"n{i}", "contact": {"email": f"e{i}"}}))
+    records.write_text("\n".join(lines) + "\n\n")
+    return schema, records
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_cli_writes_results_and_errors_in_order(tmp_path, workers: int) -> None:
+    schema, records = _write_inputs(tmp_path, 50)
+    out = tmp_path / "out.ndjson"
+    err = tmp_path / "err.ndjson"
+
+    code = main(
+        [str(records), "-s", str(schema), "-o", str(out), "-e", str(err),
+         "--workers", str(workers), "--chunk-size", "4"]
+    )
+
+    assert code == 1
+    payloads = [json.loads(line) for line in out.read_text().splitlines()]
+    errors = [json.loads(line) for line in err.read_text().splitlines()]
+    assert [p["name"] for p in payloads] == [
+        f"n{i}" for i in range(50) if i % 10 not in (3, 7)
+    ]
+    assert [e["line"] for e in errors] == [i + 1 for i in range(50) if i % 10 in (3, 7)]
+    assert {e["type"] for e in errors} == {"TransformValidationError", "JSONDecodeError"}
+
+
+def test_cli_rejects_unsupported_schema(tmp_path) -> None:
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps({"type": "array"}))
+    assert main([str(tmp_path / "missing.ndjson"), "-s", str(schema)]) == 2
+
+
+def test_cli_reports_unreadable_files(tmp_path, capsys) -> None:
+    schema, records = _write_inputs(tmp_path, 1)
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+
+    assert main([str(records), "-s", str(tmp_path / "nope.json")]) == 2
+    assert main([str(records), "-s", str(broken)]) == 2
+    assert main([str(tmp_path / "missing.ndjson"), "-s", str(schema)]) == 2
+    assert main([str(records), "-s", str(schema), "-o", str(tmp_path / "no" / "out.ndjson")]) == 2
+
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 4
+    assert all(line.startswith("omni-api: ") for line in lines)
+    assert "invalid JSON" in lines[1]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cli_reports_a_broken_plan_store_before_starting(tmp_path, capsys, workers: int) -> None:
+    schema, records = _write_inputs(tmp_path, 1)
+    store_dir = tmp_path / "plans"
+    (store_dir / "abc").mkdir(parents=True)
+    (store_dir / "abc" / "schema.json").write_text("[1]")
+
+    code = main([str(records), "-s", str(schema), "--plan-store", str(store_dir), "-w", str(workers)])
+
+    assert code == 2
+    assert capsys.readouterr().err.startswith("omni-api: ")
+
+
+def test_cli_fails_only_the_line_with_invalid_utf8(tmp_path) -> None:
+    schema, _ = _write_inputs(tmp_path, 0)
+    records = tmp_path / "in.ndjson"
+    records.write_bytes(b'{"full_name": "a"}\n{"full_name": "\xff"}\n{"full_name": "\xc3\xa9"}\n')
+    out = tmp_path / "out.ndjson"
+    err = tmp_path / "err.ndjson"
+
+    assert main([str(records), "-s", str(schema), "-o", str(out), "-e", str(err)]) == 1
+    assert [json.loads(line)["name"] for line in out.read_text(encoding="utf-8").splitlines()] == ["a", "é"]
+    error = json.loads(err.read_text())
+    assert (error["line"], error["type"]) == (2, "UnicodeDecodeError")
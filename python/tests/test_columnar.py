@@ -0,0 +1,95 @@
+import pytest
+
+from omni_api import TransformValidationError, transform, transform_columnar
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}, "age": {"type": "integer"}},
+    "required": ["name"],
+}
+
+RECORDS = [
+    {"full_name": "a", "contact": {"email": "a@x"}, "age": 1, "noise": True},
+    {"full_name": "b", "contact": {"email": "b@x"}, "age": 2, "noise": False},
+    {"full_name": "c", "contact": {}, "age": 3, "noise": None},
+]
+
+
+def test_rows_become_columns_matching_per_record_transform() -> None:
+    result = transform_columnar(RECORDS[:2], SCHEMA, plan_cache=None)
+
+    rows = [transform(record, SCHEMA, plan_cache=None).payload for record in RECORDS[:2]]
+    assert result.rows == 2
+    assert list(result.columns) == ["name", "email", "age"]
+    assert [dict(zip(result.columns, cells)) for cells in zip(*result.columns.values())] == rows
+    assert result.report.dropped == ["noise"]
+    assert result.missing == {}
+
+
+def test_missing_cells_are_reported_once_per_column() -> None:
+    result = transform_columnar(RECORDS, SCHEMA, plan_cache=None)
+
+    assert result.columns["email"] == ["a@x", "b@x", None]
+    assert result.missing == {"email": [2]}
+    assert "Missing source for target 'email' in 1 of 3 rows" in result.report.warnings
+
+
+def test_missing_required_raises_or_collects() -> None:
+    records = [{"full_name": "a"}, {"other": 1}]
+    with pytest.raises(TransformValidationError, match="Missing required fields"):
+        transform_columnar(records, SCHEMA, plan_cache=None)
+
+    result = transform_columnar(records, SCHEMA, errors="collect", plan_cache=None)
+    assert result.report.missing_required == ["name"]
+    assert result.missing == {"name": [1]}
+
+
+def test_column_dict_input() -> None:
+    columns = {"full_name": ["a", "b"], "contact.email": ["a@x", "b@x"], "meta": [{"age": 1}, {"age": 2}]}
+    result = transform_columnar(columns, SCHEMA, plan_cache=None)
+
+    assert result.columns == {"name": ["a", "b"], "email": ["a@x", "b@x"], "age": [1, 2]}
+    with pytest.raises(ValueError, match="same length"):
+        transform_columnar({"full_name": ["a"], "age": []}, SCHEMA)
+
+
+def test_empty_batch() -> None:
+    result = transform_columnar([], SCHEMA, plan_cache=None)
+    assert (result.rows, result.columns) == (0, {})
+
+
+def test_numpy_columns() -> None:
+    np = pytest.importorskip("numpy")
+    result = transform_columnar(RECORDS[:2], SCHEMA, as_numpy=True, plan_cache=None)
+    assert isinstance(result.columns["age"], np.ndarray)
+    assert result.columns["age"].tolist() == [1, 2]
+
+
+def test_column_types_are_checked_and_coerced() -> None:
+    records = [{"full_name": "a", "age": 1}, {"full_name": "b", "age": "2"}, {"full_name": "c"}]
+    with pytest.raises(TransformValidationError, match=r"age: expected integer, got str in 1 of 3 rows"):
+        transform_columnar(records, SCHEMA, plan_cache=None)
+
+    collected = transform_columnar(records, SCHEMA, errors="collect", plan_cache=None)
+    assert collected.invalid == {"age": [1]}
+    assert collected.missing == {"age": [2]}
+
+    coerced = transform_columnar(records, SCHEMA, coerce=True, plan_cache=None)
+    assert coerced.columns["age"] == [1, 2, None]
+    assert coerced.invalid == {}
+
+
+def test_array_item_columns_are_checked_per_element() -> None:
+    schema = {
+        "type": "object",
+        "properties": {
+            "lines": {
+                "type": "array",
+                "items": {"type": "object", "properties": {"qty": {"type": "integer"}}, "required": ["qty"]},
+            }
+        },
+    }
+    records = [{"lines": [{"qty": 1}]}, {"lines": [{"qty": "x"}]}, {"lines": [{}]}]
+
+    result = transform_columnar(records, schema, errors="collect", plan_cache=None)
+    assert result.invalid == {"lines": [1, 2]}
@@ -0,0 +1,43 @@
+from omni_api import apply_plan, compile_plan
+from omni_api.plan_types import Mapping, TransformPlan
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}, "age": {"type": "number"}},
+}
+
+
+def test_compiled_plan_matches_apply_plan() -> None:
+    plan = TransformPlan(
+        mappings=[
+            Mapping(from_path="full_name", to_key="name"),
+            Mapping(from_path="contact.email", to_key="email"),
+            Mapping(from_path="extra", to_key="not_in_schema"),
+        ],
+        drops=["z", "a"],
+        warnings=["planner warning"],
+    )
+    source = {"full_name": "Jo", "contact": {"email": "jo@x"}, "extra": 1}
+
+    assert compile_plan(plan, SCHEMA)(source) == apply_plan(source, SCHEMA, plan)
+
+
+def test_compiled_plan_reports_missing_paths_like_apply_plan() -> None:
+    plan = TransformPlan(
+        mappings=[
+            Mapping(from_path="contact.email", to_key="email"),
+            Mapping(from_path="age", to_key="age"),
+        ],
+    )
+    compiled = compile_plan(plan, SCHEMA)
+
+    for source in ({"age": 3}, {"contact": "not-a-dict", "age": 3}, {}):
+        assert compiled(source) == apply_plan(source, SCHEMA, plan)
+
+
+def test_compiled_plan_reports_are_independent() -> None:
+    compiled = compile_plan(TransformPlan(mappings=[Mapping("name", "name")], warnings=["w"]), SCHEMA)
+    _, first = compiled({"name": "a"})
+    first.warnings.append("mutated")
+    _, second = compiled({"name": "b"})
+    assert second.warnings == ["w"]
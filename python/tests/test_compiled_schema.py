@@ -0,0 +1,78 @@
+import pickle
+
+import pytest
+
+from omni_api import CompiledSchema, TransformSchemaError, compile_schema, transform, transform_many
+from omni_api.executor import apply_plan
+from omni_api.planner import build_plan
+from omni_api.schema import schema_fingerprint
+from omni_api.validator import validate_payload
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name", 3],
+}
+
+
+def test_compile_schema_unpacks_keys_once() -> None:
+    compiled = compile_schema(SCHEMA)
+
+    assert compiled.properties == ("name", "email")
+    assert compiled.allowed == frozenset({"name", "email"})
+    assert compiled.required == ("name",)
+    assert compile_schema(compiled) is compiled
+
+
+def test_compiled_schema_is_hashable_by_content() -> None:
+    first = compile_schema(SCHEMA)
+    second = compile_schema(dict(SCHEMA))
+
+    assert first == second
+    assert len({first, second}) == 1
+    assert first != compile_schema({**SCHEMA, "required": []})
+
+
+def test_compile_schema_copies_and_validates() -> None:
+    raw = {"type": "object", "properties": {"name": {}}}
+    compiled = compile_schema(raw)
+    raw["properties"]["late"] = {}
+    assert compiled.source["properties"] == {"name": {}}
+
+    with pytest.raises(TransformSchemaError):
+        compile_schema({"type": "array"})
+
+
+def test_property_order_is_part_of_the_content_hash() -> None:
+    forward = {"type": "object", "properties": {"sku": {}, "b": {}}}
+    backward = {"type": "object", "properties": {"b": {}, "sku": {}}}
+    source = {"b": 5, "sku": 4}
+
+    assert compile_schema(forward) != compile_schema(backward)
+    assert compile_schema(forward) == compile_schema({"properties": {"sku": {}, "b": {}}, "type": "object"})
+    assert list(transform(source, backward).payload) == ["b", "sku"]
+    assert list(transform(source, forward).payload) == ["sku", "b"]
+
+
+def test_compiled_schema_source_is_read_only_and_picklable() -> None:
+    compiled = compile_schema(SCHEMA)
+    with pytest.raises(TypeError):
+        compiled.source["type"] = "array"  # type: ignore[index]
+
+    restored = pickle.loads(pickle.dumps(compiled))
+    assert restored == compiled
+    assert restored.source == compiled.source
+    assert compiled.content_hash == schema_fingerprint(SCHEMA)
+
+
+def test_entry_points_accept_compiled_schema() -> None:
+    compiled = compile_schema(SCHEMA)
+    source = {"full_name": "Jo", "contact": {"email": "jo@x"}}
+
+    plan = build_plan(source, compiled)
+    assert plan == build_plan(source, SCHEMA)
+    assert apply_plan(source, compiled, plan) == apply_plan(source, SCHEMA, plan)
+    assert validate_payload({"name": "Jo"}, compiled, compiled.required) == []
+    assert transform(source, compiled).payload == transform(source, SCHEMA).payload
+    assert [r.payload for r in transform_many([source], compiled)] == [{"name": "Jo", "email": "jo@x"}]
+    assert isinstance(compiled, CompiledSchema)
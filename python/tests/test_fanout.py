@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from omni_api import (
+    PlanCache,
+    PlannerOptions,
+    RecordError,
+    SchemaRegistry,
+    TransformValidationError,
+    transform,
+    transform_fanout,
+)
+from omni_api.planner import build_plan, build_plans
+
+SOURCE = {
+    "full_name": "Ada",
+    "contact": {"email": "ada@x", "phone": "123"},
+    "address": {"city": "London", "zip": "N1"},
+    "noise": True,
+}
+
+PERSON = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+LOCATION = {
+    "type": "object",
+    "properties": {"city": {"type": "string"}, "zip": {"type": "string"}, "name": {"type": "string"}},
+    "required": ["city"],
+}
+STRICT = {
+    "type": "object",
+    "properties": {"account_id": {"type": "string"}},
+    "required": ["account_id"],
+}
+
+
+def test_results_match_per_target_transform() -> None:
+    results = transform_fanout(SOURCE, {"person": PERSON, "location": LOCATION}, plan_cache=None)
+
+    assert list(results) == ["person", "location"]
+    for name, schema in (("person", PERSON), ("location", LOCATION)):
+        single = transform(SOURCE, schema, plan_cache=None)
+        assert results[name].payload == single.payload
+        assert results[name].plan == single.plan
+        assert results[name].report == single.report
+
+
+def test_shared_scan_plans_match_build_plan() -> None:
+    plans = build_plans(SOURCE, [PERSON, LOCATION, STRICT])
+
+    assert plans == [build_plan(SOURCE, schema) for schema in (PERSON, LOCATION, STRICT)]
+
+
+@pytest.mark.parametrize("drops", ["full", "summary"])
+def test_shared_scan_respects_planner_options(drops: str) -> None:
+    options = {"max_depth": 1, "max_nodes": 3, "drops": drops}
+    plans = build_plans(SOURCE, [PERSON, LOCATION], **options)
+
+    assert plans == [build_plan(SOURCE, schema, **options) for schema in (PERSON, LOCATION)]
+
+
+@pytest.mark.parametrize("drops", ["full", "summary"])
+def test_fanout_plans_match_transform_and_leave_the_cache_consistent(drops: str) -> None:
+    source = {"b": 5, "sku": 4, "a": {"addr": {"items": 3}}, "user_id": {"qty": 5}}
+    targets = {
+        "s1": {"type": "object", "properties": {"b": {}, "sku": {}}},
+        "s2": {"type": "object", "properties": {"items": {}}},
+    }
+    options = PlannerOptions(drops=drops)
+    fresh = {
+        name: transform(source, schema, plan_cache=None, planner_options=options)
+        for name, schema in targets.items()
+    }
+
+    cache = PlanCache()
+    fanned = transform_fanout(source, targets, plan_cache=cache, planner_options=options)
+    for name, schema in targets.items():
+        assert fanned[name].plan == fresh[name].plan
+        assert transform(source, schema, plan_cache=cache, planner_options=options).plan == fresh[name].plan
+    assert cache.stats().hits == 2
+
+
+def test_plans_are_cached_per_target() -> None:
+    cache = PlanCache()
+    options = PlannerOptions(drops="summary")
+    transform_fanout(SOURCE, {"person": PERSON, "location": LOCATION}, plan_cache=cache, planner_options=options)
+    transform_fanout(SOURCE, {"location": LOCATION}, plan_cache=cache, planner_options=options)
+
+    assert cache.stats().misses == 2
+    assert cache.stats().hits == 1
+    assert transform(SOURCE, PERSON, plan_cache=cache, planner_options=options).plan.warnings
+
+
+def test_missing_required_raises_or_collects() -> None:
+    targets = {"person": PERSON, "strict": STRICT}
+    with pytest.raises(TransformValidationError, match="account_id"):
+        transform_fanout(SOURCE, targets, plan_cache=None)
+
+    results = transform_fanout(SOURCE, targets, errors="collect", plan_cache=None)
+    assert results["person"].payload == {"name": "Ada", "email": "ada@x"}
+    assert isinstance(results["strict"], RecordError)
+    assert results["strict"].index == 1
+
+
+def test_string_targets_are_registry_routes(tmp_path) -> None:
+    (tmp_path / "crm").mkdir()
+    (tmp_path / "crm" / "person.json").write_text(json.dumps(PERSON), encoding="utf-8")
+    registry = SchemaRegistry(tmp_path)
+
+    results = transform_fanout(
+        SOURCE, {"person": "crm/person", "location": LOCATION}, registry=registry, report="none"
+    )
+
+    assert results["person"].payload == {"name": "Ada", "email": "ada@x"}
+    assert results["person"].report is None
+    assert results["location"].payload == {"city": "London", "zip": "N1", "name": "Ada"}
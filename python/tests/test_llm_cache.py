@@ -0,0 +1,100 @@
+import asyncio
+
+import omni_api.providers.ollama as ollama_module
+from omni_api import LLMResponseCache, transform, transform_async
+from omni_api.llm_cache import llm_cache_key
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def test_repeated_llm_transform_hits_cache(monkeypatch) -> None:
+    calls = []
+
+    def fake_generate(prompt, model, base_url, timeout=60.0):
+        calls.append(prompt)
+        return {"name": "Jane"}
+
+    monkeypatch.setattr(ollama_module, "_generate", fake_generate)
+    cache = LLMResponseCache()
+
+    first = transform({"who": "jane"}, SCHEMA, llm_provider="ollama", llm_cache=cache)
+    second = transform({"who": "jane"}, SCHEMA, llm_provider="ollama", llm_cache=cache)
+    transform({"who": "jane"}, SCHEMA, llm_provider="ollama", llm_model="other", llm_cache=cache)
+
+    assert len(calls) == 2
+    assert first.payload == second.payload == {"name": "Jane"}
+    assert second.report.warnings == ["aligned via ollama llm (cache hit)"]
+    assert second.payload is not first.payload
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 2)
+
+
+def test_cache_key_covers_provider_and_base_url(monkeypatch) -> None:
+    calls = []
+
+    def fake_generate(prompt, model, base_url, timeout=60.0):
+        calls.append(base_url)
+        return {"name": base_url}
+
+    monkeypatch.setattr(ollama_module, "_generate", fake_generate)
+    cache = LLMResponseCache()
+    for base_url in ("http://a:11434", "http://b:11434", "http://a:11434"):
+        result = transform({"who": "jane"}, SCHEMA, llm_provider="ollama", llm_base_url=base_url, llm_cache=cache)
+        assert result.payload == {"name": base_url}
+
+    assert calls == ["http://a:11434", "http://b:11434"]
+    assert llm_cache_key("ollama", "u", "m", "p") != llm_cache_key("other", "u", "m", "p")
+
+
+def test_ttl_expires_entries() -> None:
+    now = [100.0]
+    cache = LLMResponseCache(ttl=10, clock=lambda: now[0])
+    cache.put("k", {"a": 1})
+    now[0] = 105.0
+    assert cache.get("k") == {"a": 1}
+    now[0] = 111.0
+    assert cache.get("k") is None
+    assert cache.stats().expirations == 1
+
+
+def test_lru_eviction() -> None:
+    cache = LLMResponseCache(maxsize=2)
+    cache.put("a", {})
+    cache.put("b", {})
+    cache.get("a")
+    cache.put("c", {})
+    assert cache.get("b") is None
+    assert cache.get("a") == {}
+    assert cache.stats().evictions == 1
+
+
+def test_sqlite_store_survives_restart(tmp_path) -> None:
+    path = tmp_path / "llm.sqlite"
+    key = llm_cache_key("ollama", "http://localhost:11434", "m", "prompt")
+    first = LLMResponseCache(path=path)
+    first.put(key, {"name": "Persisted"})
+    first.close()
+
+    second = LLMResponseCache(path=path)
+    assert second.get(key) == {"name": "Persisted"}
+    assert second.get(key) == {"name": "Persisted"}
+    stats = second.stats()
+    assert (stats.disk_hits, stats.hits) == (1, 1)
+
+
+def test_async_path_uses_cache(ollama_stub) -> None:
+    cache = LLMResponseCache()
+
+    async def run():
+        for _ in range(3):
+            result = await transform_async(
+                {"x": 1}, SCHEMA, llm_provider="ollama", llm_base_url=ollama_stub.base_url, llm_cache=cache
+            )
+        return result
+
+    assert asyncio.run(run()).payload == {"name": "Stub"}
+    assert len(ollama_stub.requests) == 1
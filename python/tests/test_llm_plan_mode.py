@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pytest
+
+import omni_api.providers.ollama as ollama_module
+from omni_api import (
+    PlanCache,
+    RecordError,
+    TransformValidationError,
+    apply_plan,
+    transform,
+    transform_async,
+    transform_many,
+)
+from omni_api.plan_types import Mapping, TransformPlan
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}, "tier": {"type": "string"}},
+    "required": ["name", "tier"],
+}
+
+LLM_PLAN = {
+    "mappings": [
+        {"from_path": "who.full", "to_key": "name"},
+        {"from_path": "who.mail", "to_key": "email"},
+        {"from_path": "not.a.path", "to_key": "email"},
+    ],
+    "defaults": [{"key": "tier", "value": "free"}, {"key": "bogus", "value": 1}],
+}
+
+
+def test_llm_plans_once_per_shape(monkeypatch) -> None:
+    prompts = []
+
+    def fake_generate(prompt, model, base_url, timeout=60.0):
+        prompts.append(prompt)
+        return LLM_PLAN
+
+    monkeypatch.setattr(ollama_module, "_generate", fake_generate)
+    records = [{"who": {"full": f"n{i}", "mail": f"e{i}"}, "noise": i} for i in range(5)]
+    cache = PlanCache()
+
+    results = list(transform_many(records, SCHEMA, llm_provider="ollama", llm_mode="plan", plan_cache=cache))
+
+    assert len(prompts) == 1
+    assert '"who.full"' in prompts[0] and "n0" not in prompts[0]
+    assert [r.payload for r in results] == [
+        {"name": f"n{i}", "email": f"e{i}", "tier": "free"} for i in range(5)
+    ]
+    plan = results[0].plan
+    assert plan.drops == ("noise",)
+    assert plan.defaults == ({"key": "tier", "value": "free"},)
+    assert any("Rejected LLM mapping" in w for w in plan.warnings)
+    assert any("Rejected LLM default" in w for w in plan.warnings)
+
+
+def test_llm_plan_without_mappings_list_is_rejected(monkeypatch) -> None:
+    monkeypatch.setattr(ollama_module, "_generate", lambda *a, **k: {"name": "x"})
+    with pytest.raises(TransformValidationError):
+        transform({"a": 1}, SCHEMA, llm_provider="ollama", llm_mode="plan", plan_cache=None)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        {"mappings": [{"from_path": ["who", "full"], "to_key": "name"}], "defaults": []},
+        {"mappings": [{"from_path": "who.full", "to_key": {"name": 1}}], "defaults": []},
+        {"mappings": [], "defaults": [{"key": ["tier"], "value": "free"}]},
+    ],
+)
+def test_llm_plan_with_non_string_fields_is_collected(monkeypatch, raw) -> None:
+    monkeypatch.setattr(ollama_module, "_generate", lambda *a, **k: raw)
+    records = [{"who": {"full": "n"}}]
+
+    results = list(
+        transform_many(records, SCHEMA, llm_provider="ollama", llm_mode="plan", plan_cache=None, errors="collect")
+    )
+
+    assert isinstance(results[0], RecordError)
+    assert isinstance(results[0].error, TransformValidationError)
+    assert "must be a string" in str(results[0].error)
+
+
+def test_unknown_llm_mode_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        transform({"a": 1}, SCHEMA, llm_mode="other")
+
+
+def test_executor_applies_defaults_without_overriding_mappings() -> None:
+    plan = TransformPlan(
+        mappings=[Mapping(from_path="n", to_key="name")],
+        defaults=[{"key": "name", "value": "unused"}, {"key": "tier", "value": ["x"]}],
+    )
+    payload, report = apply_plan({"n": "Jo"}, SCHEMA, plan)
+    assert payload == {"name": "Jo", "tier": ["x"]}
+    assert report.mapped == ["name"]
+    assert payload["tier"] is not plan.defaults[1]["value"]
+
+
+def test_async_plan_mode(ollama_stub) -> None:
+    ollama_stub.respond = lambda body: json.dumps(LLM_PLAN)
+    cache = PlanCache()
+
+    async def run():
+        results = []
+        for i in range(3):
+            results.append(
+                await transform_async(
+                    {"who": {"full": f"n{i}", "mail": "m"}},
+                    SCHEMA,
+                    llm_provider="ollama",
+                    llm_mode="plan",
+                    llm_base_url=ollama_stub.base_url,
+                    plan_cache=cache,
+                )
+            )
+        return results
+
+    results = asyncio.run(run())
+    assert [r.payload["name"] for r in results] == ["n0", "n1", "n2"]
+    assert len(ollama_stub.requests) == 1
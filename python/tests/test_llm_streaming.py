@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import pytest
+
+from omni_api import AsyncOllamaClient, TransformValidationError, transform
+from omni_api.jsonscan import IncrementalJsonScanner
+from omni_api.providers.ollama import _stream_fragment
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "note": {"type": "string"}},
+    "required": ["name"],
+}
+CHATTY = 'Here you go: {"name": "Streamed", "note": "a } and { in a string"}' + " and more prose" * 200
+
+
+def _scan(chunks: list[str]):
+    scanner = IncrementalJsonScanner()
+    for chunk in chunks:
+        result = scanner.feed(chunk)
+        if result is not None:
+            return result
+    return None
+
+
+def test_scanner_finds_first_object_across_any_split() -> None:
+    text = 'noise {bad} [1] {"k": "v\\\\\\"}", "n": [1, {"m": 2}]} {"later": 1}'
+    expected = {"k": 'v\\"}', "n": [1, {"m": 2}]}
+    assert _scan([text]) == expected
+    for split in range(1, len(text)):
+        assert _scan([text[:split], text[split:]]) == expected
+    assert _scan(list(text)) == expected
+
+
+def test_scanner_returns_none_without_object() -> None:
+    assert _scan(["[1, 2]", " no braces", '"{"']) is None
+
+
+def test_sync_streaming_stops_after_first_object(ollama_stub) -> None:
+    ollama_stub.respond = lambda body: CHATTY
+    ollama_stub.stream_delay = 0.005
+
+    start = time.perf_counter()
+    result = transform(
+        {"x": 1}, SCHEMA, llm_provider="ollama", llm_stream=True, llm_base_url=ollama_stub.base_url
+    )
+
+    assert result.payload == {"name": "Streamed", "note": "a } and { in a string"}
+    assert time.perf_counter() - start < 0.5
+    assert ollama_stub.requests[0]["stream"] is True
+    assert ollama_stub.stream_aborted.wait(2)
+
+
+def test_async_streaming_stops_after_first_object(ollama_stub) -> None:
+    ollama_stub.respond = lambda body: CHATTY
+    ollama_stub.stream_delay = 0.005
+
+    async def run():
+        async with AsyncOllamaClient(ollama_stub.base_url) as client:
+            first = await client.generate_object("m", "p")
+            second = await client.generate_object("m", "p")
+            return first, second, client.connections_opened
+
+    first, second, opened = asyncio.run(run())
+    assert first == second == {"name": "Streamed", "note": "a } and { in a string"}
+    assert opened == 2
+    assert ollama_stub.stream_aborted.wait(2)
+
+
+def test_streaming_without_object_raises(ollama_stub) -> None:
+    ollama_stub.respond = lambda body: "I cannot help with that."
+
+    with pytest.raises(TransformValidationError, match="Failed to parse"):
+        transform({"x": 1}, SCHEMA, llm_provider="ollama", llm_stream=True, llm_base_url=ollama_stub.base_url)
+
+
+def test_invalid_json_lines_raise_validation_errors(monkeypatch) -> None:
+    with pytest.raises(TransformValidationError, match=r"invalid JSON .*'\{\"response\": \"a'"):
+        _stream_fragment(b'{"response": "a')
+    with pytest.raises(TransformValidationError, match="invalid JSON"):
+        _stream_fragment(b"\xff")
+
+    async def garbage(self, path, body):
+        return b"<html>busy</html>"
+
+    async def run():
+        async with AsyncOllamaClient("http://127.0.0.1:9", retries=0) as client:
+            await client.generate("m", "p")
+
+    monkeypatch.setattr(AsyncOllamaClient, "_request", garbage)
+    with pytest.raises(TransformValidationError, match="<html>busy</html>"):
+        asyncio.run(run())
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+import omni_api.providers.ollama as ollama_module
+from omni_api import (
+    LLMResponseCache,
+    MetricsCollector,
+    PlanCache,
+    TransformSchemaError,
+    TransformValidationError,
+    register_observer,
+    transform,
+    transform_async,
+    transform_many,
+    unregister_observer,
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+@pytest.fixture
+def collector():
+    observer = MetricsCollector()
+    register_observer(observer)
+    yield observer
+    unregister_observer(observer)
+
+
+def test_report_timings_are_opt_in() -> None:
+    plain = transform({"name": "a"}, SCHEMA, plan_cache=PlanCache())
+    timed = transform({"name": "a"}, SCHEMA, plan_cache=PlanCache(), timings=True)
+
+    assert plain.report.timings is None
+    assert set(timed.report.timings) == {"schema", "plan", "apply", "validate", "total"}
+    assert timed.report.timings["total"] >= timed.report.timings["plan"]
+    assert timed.payload == plain.payload
+
+
+def test_timings_without_a_report_are_rejected() -> None:
+    assert transform({"name": "a"}, SCHEMA, report="counts", timings=True).report.timings
+    with pytest.raises(ValueError, match="timings"):
+        transform({"name": "a"}, SCHEMA, report="none", timings=True)
+    with pytest.raises(ValueError, match="timings"):
+        transform_many([{"name": "a"}], SCHEMA, report="none", timings=True)
+    with pytest.raises(ValueError, match="timings"):
+        asyncio.run(transform_async({"name": "a"}, SCHEMA, report="none", timings=True))
+
+
+def test_observer_receives_stages_cache_hits_and_sizes(collector) -> None:
+    cache = PlanCache()
+    transform({"name": "a", "extra": 1}, SCHEMA, plan_cache=cache)
+    transform({"name": "b", "extra": 2}, SCHEMA, plan_cache=cache)
+
+    snapshot = collector.snapshot()
+    assert snapshot["stage_counts"]["total"] == 2
+    assert snapshot["events"]["plan_cache.miss"] == 1
+    assert snapshot["events"]["plan_cache.hit"] == 1
+    assert snapshot["events"]["payload.source_keys"] == 4
+    assert snapshot["events"]["payload.output_keys"] == 2
+
+
+def test_observer_counts_errors(collector) -> None:
+    results = list(transform_many([{"name": "a"}, {"email": "x"}], SCHEMA, errors="collect"))
+
+    assert results[0].report.timings is None
+    events = collector.snapshot()["events"]
+    assert events["errors.validation"] == 1
+    with pytest.raises(TransformSchemaError):
+        transform({"name": "a"}, {"type": "object"})
+    assert collector.snapshot()["events"]["errors.schema"] == 1
+
+
+def test_llm_stage_and_cache_events(collector, monkeypatch) -> None:
+    monkeypatch.setattr(ollama_module, "_generate", lambda prompt, model, base_url: {"name": "Jane"})
+    cache = LLMResponseCache()
+
+    first = transform({"who": "jane"}, SCHEMA, llm_provider="ollama", llm_cache=cache, timings=True)
+    transform({"who": "jane"}, SCHEMA, llm_provider="ollama", llm_cache=cache)
+
+    assert "llm" in first.report.timings
+    snapshot = collector.snapshot()
+    assert snapshot["stage_counts"]["llm"] == 1
+    assert (snapshot["events"]["llm_cache.miss"], snapshot["events"]["llm_cache.hit"]) == (1, 1)
+
+
+def test_async_transform_reports_timings(collector) -> None:
+    result = asyncio.run(transform_async({"name": "a"}, SCHEMA, plan_cache=None, timings=True))
+
+    assert {"plan", "apply", "validate", "total"} <= set(result.report.timings)
+    assert collector.snapshot()["stage_counts"]["total"] == 1
+
+
+def test_unregistered_observer_sees_nothing() -> None:
+    observer = MetricsCollector()
+    register_observer(observer)
+    unregister_observer(observer)
+    with pytest.raises(TransformValidationError):
+        transform({"email": "x"}, SCHEMA)
+    assert observer.snapshot()["events"] == {}
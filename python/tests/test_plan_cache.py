@@ -0,0 +1,63 @@
+from omni_api import PlanCache, transform
+from omni_api.plan_cache import shape_fingerprint
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def test_same_shape_reuses_cached_plan() -> None:
+    cache = PlanCache()
+    first = transform({"name": "a", "contact": {"email": "x"}}, SCHEMA, plan_cache=cache)
+    second = transform({"name": "b", "contact": {"email": "y"}}, SCHEMA, plan_cache=cache)
+
+    assert second.plan is first.plan
+    assert second.payload == {"name": "b", "email": "y"}
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size) == (1, 1, 1)
+
+
+def test_different_shape_or_schema_misses() -> None:
+    cache = PlanCache()
+    transform({"name": "a"}, SCHEMA, plan_cache=cache)
+    transform({"name": "a", "email": "x"}, SCHEMA, plan_cache=cache)
+    transform({"name": "a"}, {**SCHEMA, "required": []}, plan_cache=cache)
+
+    assert cache.stats().misses == 3
+    assert cache.stats().hits == 0
+
+
+def test_lru_eviction_is_counted() -> None:
+    cache = PlanCache(maxsize=1)
+    transform({"name": "a"}, SCHEMA, plan_cache=cache)
+    transform({"name": "a", "x": 1}, SCHEMA, plan_cache=cache)
+
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.size == 1
+
+
+def test_opt_out_builds_fresh_plan() -> None:
+    first = transform({"name": "a"}, SCHEMA, plan_cache=None)
+    second = transform({"name": "a"}, SCHEMA, plan_cache=None)
+    assert first.plan is not second.plan
+
+
+def test_shape_fingerprint_distinguishes_nested_from_leaf() -> None:
+    assert shape_fingerprint({"a": {}}) != shape_fingerprint({"a": 1})
+    assert shape_fingerprint({"a": 1}) == shape_fingerprint({"a": "x"})
+
+
+def test_shape_fingerprint_is_the_same_for_wide_and_subclassed_objects() -> None:
+    class Record(dict):
+        pass
+
+    wide = {f"k{i}": i for i in range(40)}
+    wide.update(nested={"x": 1}, items=[{"sku": "a"}], tags=["t"], empty=[])
+
+    assert shape_fingerprint(wide) == shape_fingerprint(dict(wide, nested=Record(x=1)))
+    assert shape_fingerprint(wide) == shape_fingerprint(wide, max_nodes=10_000)
+    assert shape_fingerprint(wide) != shape_fingerprint(dict(wide, items=[{"code": "a"}]))
+    assert shape_fingerprint(wide) != shape_fingerprint(dict(wide, tags={"t": 1}))
@@ -0,0 +1,57 @@
+import dataclasses
+import pickle
+
+import pytest
+
+from omni_api import Mapping, PlanCache, TransformPlan, transform
+from omni_api.planner import build_plan
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def test_lists_are_stored_as_tuples_and_plans_are_hashable() -> None:
+    plan = TransformPlan(
+        mappings=[Mapping("contact.email", "email")],
+        defaults=[{"key": "name", "value": {"nested": [1]}}],
+        drops=["x"],
+    )
+    assert isinstance(plan.mappings, tuple) and isinstance(plan.drops, tuple)
+    twin = TransformPlan(
+        mappings=(Mapping("contact.email", "email"),),
+        defaults=({"key": "name", "value": {"nested": [1]}},),
+        drops=("x",),
+    )
+    assert plan == twin
+    assert hash(plan) == hash(twin)
+    assert plan.content_hash == twin.content_hash
+    assert len({plan, twin}) == 1
+    assert TransformPlan(drops=["y"]).content_hash != plan.content_hash
+
+
+def test_plans_are_immutable_and_slotted() -> None:
+    plan = build_plan({"name": "a"}, SCHEMA)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        plan.drops = ()
+    assert not hasattr(plan, "__dict__")
+    assert not hasattr(plan.mappings[0], "__dict__")
+
+
+def test_mapping_paths_are_presplit_and_interned() -> None:
+    first = Mapping("".join(["contact", ".email"]), "email")
+    second = Mapping("contact.email", "email")
+    assert first.path == ("contact", "email")
+    assert first.path[0] is second.path[0]
+    assert first.from_path is second.from_path
+
+
+def test_pickle_round_trip_restores_derived_fields() -> None:
+    plan = transform({"full_name": "a", "contact": {"email": "x"}}, SCHEMA, plan_cache=PlanCache()).plan
+
+    restored = pickle.loads(pickle.dumps(plan))
+    assert restored == plan
+    assert restored.content_hash == plan.content_hash
+    assert [m.path for m in restored.mappings] == [m.path for m in plan.mappings]
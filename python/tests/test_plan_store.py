@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from omni_api import (
+    Mapping,
+    PlanCache,
+    PlanStore,
+    TransformPlan,
+    TransformPlanError,
+    TransformValidationError,
+    dump_plan,
+    load_plan,
+    transform,
+)
+from omni_api.cli import main
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def test_plan_json_round_trip() -> None:
+    plan = TransformPlan(
+        mappings=[Mapping(from_path="user.full_name", to_key="name")],
+        defaults=[{"key": "email", "value": None}],
+        drops=["user.age"],
+        required=["name"],
+        warnings=["w"],
+    )
+    assert load_plan(dump_plan(plan)) == plan
+
+
+def test_load_plan_rejects_unknown_version_and_bad_entries() -> None:
+    with pytest.raises(TransformPlanError, match="version"):
+        load_plan(json.dumps({"version": "99", "mappings": []}))
+    with pytest.raises(TransformPlanError, match="Malformed"):
+        load_plan(json.dumps({"version": "1", "mappings": [{"to_key": "name"}]}))
+
+
+def test_pinned_plan_is_used_across_key_orders(tmp_path) -> None:
+    # The heuristic planner would record drops; the pinned plan has none.
+    pinned = TransformPlan(mappings=[Mapping(from_path="a", to_key="name")], required=["name"])
+    PlanStore(tmp_path).save({"a": "x", "b": {"c": 1}}, SCHEMA, pinned)
+
+    store = PlanStore(tmp_path)
+    cache = PlanCache(store=store)
+    result = transform({"b": {"c": 2}, "a": "y"}, SCHEMA, plan_cache=cache)
+
+    assert len(store) == 1
+    assert result.payload == {"name": "y"}
+    assert result.plan == pinned
+
+
+def test_unpinned_shape_falls_back_or_fails_when_strict(tmp_path) -> None:
+    source = {"name": "a", "email": "x"}
+    assert transform(source, SCHEMA, plan_cache=PlanCache(store=PlanStore(tmp_path))).payload == source
+
+    strict = PlanCache(store=PlanStore(tmp_path, strict=True))
+    with pytest.raises(TransformValidationError, match="No pinned plan"):
+        transform(source, SCHEMA, plan_cache=strict)
+
+
+def test_cli_loads_plan_store(tmp_path) -> None:
+    store_dir = tmp_path / "plans"
+    PlanStore(store_dir).save({"full_name": "n"}, SCHEMA)
+    schema = tmp_path / "schema.json"
+    schema.write_text(json.dumps(SCHEMA))
+    records = tmp_path / "in.ndjson"
+    records.write_text(json.dumps({"full_name": "a"}) + "\n" + json.dumps({"name": "b", "x": 1}) + "\n")
+    out = tmp_path / "out.ndjson"
+    err = tmp_path / "err.ndjson"
+
+    code = main([str(records), "-s", str(schema), "-o", str(out), "-e", str(err),
+                 "--plan-store", str(store_dir), "--strict-plans"])
+
+    assert code == 1
+    assert out.read_text().splitlines() == [json.dumps({"name": "a"})]
+    assert "No pinned plan" in err.read_text()
+
+
+def test_pinned_plan_is_not_reused_for_a_different_item_shape(tmp_path) -> None:
+    schema = {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {"type": "object", "properties": {"code": {}, "sku": {}}},
+            }
+        },
+    }
+    PlanStore(tmp_path).save({"items": [{"code": "a"}]}, schema)
+    cache = PlanCache(store=PlanStore(tmp_path))
+
+    assert transform({"items": [{"code": "b"}]}, schema, plan_cache=cache).payload == {"items": [{"code": "b"}]}
+    assert transform({"items": [{"sku": "x"}]}, schema, plan_cache=cache).payload == {"items": [{"sku": "x"}]}
+
+
+@pytest.mark.parametrize("text", ["{not json", "[1]", json.dumps({"plan": {"version": "99"}})])
+def test_reload_reports_the_broken_file(tmp_path, text) -> None:
+    PlanStore(tmp_path).save({"name": "a"}, SCHEMA)
+    broken = next(path for path in tmp_path.glob("*/*.json") if path.name != "schema.json")
+    broken.write_text(text)
+
+    with pytest.raises(TransformPlanError, match=str(broken)):
+        PlanStore(tmp_path)
+
+
+@pytest.mark.parametrize("text", ["", "[1]", json.dumps({"type": "array"})])
+def test_reload_reports_a_broken_schema_file(tmp_path, text) -> None:
+    PlanStore(tmp_path).save({"name": "a"}, SCHEMA)
+    schema_file = next(tmp_path.glob("*/schema.json"))
+    schema_file.write_text(text)
+
+    with pytest.raises(TransformPlanError, match=str(schema_file)):
+        PlanStore(tmp_path)
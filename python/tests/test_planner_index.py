@@ -0,0 +1,101 @@
+import random
+
+from omni_api.planner import (
+    SourceIndex,
+    _flatten_paths,
+    _normalize,
+    _tie_break,
+    _tokenize,
+    build_plan,
+)
+from omni_api.plan_types import Mapping, TransformPlan
+
+
+def _reference_candidates(target_key: str, source_paths: list[str]) -> tuple[list[str], list[str]]:
+    exact = [path for path in source_paths if path == target_key]
+    if exact:
+        return exact, []
+    target_norm = _normalize(target_key)
+    direct = [p for p in source_paths if "." not in p and _normalize(p) == target_norm]
+    if direct:
+        return direct, []
+    target_tokens = set(_tokenize(target_key))
+    tokens = [
+        p for p in source_paths
+        if "." not in p and target_tokens and target_tokens.issubset(set(_tokenize(p)))
+    ]
+    if tokens:
+        return tokens, []
+    nested = [p for p in source_paths if "." in p and _normalize(p.rsplit(".", 1)[1]) == target_norm]
+    if nested:
+        return nested, nested
+    return [], []
+
+
+def _reference_plan(source: dict, schema: dict) -> TransformPlan:
+    source_paths = [path for path, _ in _flatten_paths(source)]
+    mappings, warnings, ambiguous, mapped_from = [], [], [], set()
+    for target_key in schema["properties"]:
+        candidates, group = _reference_candidates(target_key, source_paths)
+        if not candidates:
+            continue
+        chosen = _tie_break(candidates)
+        mappings.append(Mapping(from_path=chosen, to_key=target_key))
+        mapped_from.add(chosen)
+        if len(group) > 1:
+            warnings.append(
+                f"Ambiguous mapping for '{target_key}': candidates={sorted(group)}; chose '{chosen}'"
+            )
+            ambiguous.append((target_key, sorted(group)))
+    drops = sorted(p for p in source_paths if p not in mapped_from)
+    return TransformPlan(mappings=mappings, drops=drops, required=[], warnings=warnings, ambiguous=ambiguous)
+
+
+WORDS = ["user", "name", "email", "Email", "full", "id", "user_id", "UserId", "addr", "city", "zip"]
+
+
+def _random_source(rng: random.Random, depth: int = 0) -> dict:
+    source = {}
+    for _ in range(rng.randint(1, 6)):
+        key = "_".join(rng.sample(WORDS, rng.randint(1, 2))) if rng.random() < 0.5 else rng.choice(WORDS)
+        source[key] = _random_source(rng, depth + 1) if depth < 3 and rng.random() < 0.3 else 1
+    return source
+
+
+def test_index_plans_match_linear_reference() -> None:
+    rng = random.Random(1234)
+    targets = ["user_id", "name", "email", "fullname", "city", "zip", "user.name", "missing"]
+    for _ in range(300):
+        source = _random_source(rng)
+        schema = {"type": "object", "properties": {key: {} for key in rng.sample(targets, 5)}}
+        assert build_plan(source, schema) == _reference_plan(source, schema)
+
+
+def test_index_token_lookup_requires_all_target_tokens() -> None:
+    index = SourceIndex(["user-name-x", "user_id", "name"])
+    assert index.candidates("user name") == (["user-name-x"], [])
+    assert index.candidates("id") == (["user_id"], [])
+    assert index.candidates("nope") == ([], [])
+
+
+def test_candidate_lookup_cost_is_independent_of_source_width(monkeypatch) -> None:
+    import omni_api.planner as planner_module
+
+    calls = 0
+    original = planner_module._normalize
+
+    def counting_normalize(value: str) -> str:
+        nonlocal calls
+        calls += 1
+        return original(value)
+
+    per_lookup = []
+    for width in (10, 1000):
+        index = SourceIndex([f"group.attr_{i}" for i in range(width)] + [f"top_{i}" for i in range(width)])
+        monkeypatch.setattr(planner_module, "_normalize", counting_normalize)
+        calls = 0
+        index.candidates("attr_5")
+        per_lookup.append(calls)
+        monkeypatch.setattr(planner_module, "_normalize", original)
+
+    assert per_lookup[0] == per_lookup[1] == 1
@@ -0,0 +1,100 @@
+import pytest
+
+from omni_api import PlanCache, PlannerOptions, transform
+from omni_api.planner import _flatten_paths, build_plan
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def _deep(depth: int) -> dict:
+    node: dict = {"email": "deep@x"}
+    for _ in range(depth):
+        node = {"n": node}
+    return node
+
+
+def test_deep_payloads_do_not_hit_recursion_limit() -> None:
+    source = {"name": "a", "blob": _deep(5000)}
+
+    plan = build_plan(source, SCHEMA)
+    assert [m.from_path for m in plan.mappings] == ["name", "blob" + ".n" * 5000 + ".email"]
+    assert len(_flatten_paths(source)) == 2
+
+
+def test_deep_payloads_go_through_the_default_plan_cache() -> None:
+    source = {"name": "a", "blob": _deep(1500)}
+
+    bounded = transform(source, SCHEMA, planner_options=PlannerOptions(max_depth=5))
+    assert bounded.payload == {"name": "a"}
+    assert transform(source, SCHEMA).payload == {"name": "a", "email": "deep@x"}
+
+
+def test_fingerprint_stops_where_the_planner_does() -> None:
+    cache = PlanCache()
+    options = PlannerOptions(max_depth=2, max_nodes=3)
+    for blob in ({"inner": {"email": "x"}}, {"inner": {"other": 1}}):
+        transform({"name": "a", "blob": blob}, SCHEMA, plan_cache=cache, planner_options=options)
+    assert cache.stats().hits == 1
+
+    transform({"name": "a", "blob": {"inner": 1, "more": 2}}, SCHEMA, plan_cache=cache, planner_options=options)
+    assert cache.stats().misses == 2
+
+
+def test_flatten_paths_keeps_sorted_depth_first_order() -> None:
+    source = {"b": 1, "a": {"z": 1, "c": {"d": 1}}, "aa": 2}
+    assert [path for path, _ in _flatten_paths(source)] == ["a.c.d", "a.z", "aa", "b"]
+
+
+def test_depth_cap_treats_deeper_subtrees_as_opaque() -> None:
+    source = {"name": "a", "contact": {"inner": {"email": "x"}}}
+
+    plan = build_plan(source, SCHEMA, max_depth=2)
+    assert [m.to_key for m in plan.mappings] == ["name"]
+    assert plan.drops == ("contact.inner",)
+    assert "Source traversal truncated at max_depth=2" in plan.warnings
+
+
+def test_node_cap_stops_traversal() -> None:
+    source = {"name": "a", "meta": {f"k{i}": i for i in range(100)}}
+
+    plan = build_plan(source, SCHEMA, max_nodes=10)
+    assert len(plan.drops) == 8
+    assert "Source traversal stopped at max_nodes=10" in plan.warnings
+
+
+def test_drops_summary_skips_unneeded_subtrees() -> None:
+    source = {"name": "a", "email": "e", "x": 1, "meta": {f"k{i}": {"v": i} for i in range(50)}}
+
+    plan = build_plan(source, SCHEMA, drops="summary")
+    assert plan.drops == ("meta", "x")
+    assert plan.warnings == ("Dropped 1 source paths under ['x']; not traversed: ['meta']",)
+
+
+def test_drops_summary_counts_traversed_subtrees() -> None:
+    source = {"name": "a", "meta": {f"k{i}": i for i in range(50)}, "contact": {"email": "e", "phone": 1}}
+
+    plan = build_plan(source, SCHEMA, drops="summary")
+    assert plan.drops == ("contact", "meta")
+    assert plan.warnings == ("Dropped 51 source paths under ['contact', 'meta']",)
+
+
+def test_planner_options_are_part_of_the_cache_key() -> None:
+    cache = PlanCache()
+    source = {"name": "a", "x": {"y": 1}}
+    full = transform(source, SCHEMA, plan_cache=cache)
+    summary = transform(source, SCHEMA, plan_cache=cache, planner_options=PlannerOptions(drops="summary"))
+
+    assert full.plan.drops == ("x.y",)
+    assert summary.plan.drops == ("x",)
+    assert cache.stats().misses == 2
+
+
+def test_invalid_options() -> None:
+    with pytest.raises(ValueError, match="drops"):
+        PlannerOptions(drops="some")
+    with pytest.raises(ValueError, match="max_depth"):
+        build_plan({}, SCHEMA, max_depth=0)
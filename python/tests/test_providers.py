@@ -0,0 +1,149 @@
+import os
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+from typing import Any
+
+import pytest
+
+import omni_api
+import omni_api.providers as providers_module
+from omni_api import LLMProvider, PlanCache, available_providers, register_provider, transform, unregister_provider
+from omni_api.providers import get_provider
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+class EchoProvider(LLMProvider):
+    name = "echo"
+    default_model = "echo-1"
+    default_base_url = "http://echo.invalid"
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, str]] = []
+
+    def generate(self, prompt: str, model: str, base_url: str) -> dict[str, Any]:
+        self.calls.append((model, base_url))
+        if "source_paths" in prompt:
+            return {"mappings": [{"from_path": "full_name", "to_key": "name"}], "defaults": []}
+        return {"name": "Echo"}
+
+
+@pytest.fixture
+def echo() -> EchoProvider:
+    provider = EchoProvider()
+    register_provider("echo", provider)
+    yield provider
+    unregister_provider("echo")
+
+
+def test_import_does_not_load_the_llm_or_network_stack() -> None:
+    heavy = ["asyncio", "ssl", "urllib.request", "http.client", "sqlite3", "omni_api.llm", "omni_api.async_api"]
+    code = f"import sys, omni_api; print([m for m in {heavy!r} if m in sys.modules])"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_async_exports_load_on_first_access() -> None:
+    assert "transform_async" in dir(omni_api)
+    assert callable(omni_api.transform_async)
+    assert omni_api.AsyncOllamaClient.__name__ == "AsyncOllamaClient"
+    with pytest.raises(AttributeError):
+        omni_api.not_a_symbol
+
+
+def test_registered_provider_aligns_payloads(echo) -> None:
+    result = transform({"x": 1}, SCHEMA, llm_provider="echo", plan_cache=None)
+
+    assert result.payload == {"name": "Echo"}
+    assert result.report.warnings == ["aligned via echo llm"]
+    assert echo.calls == [("echo-1", "http://echo.invalid")]
+
+
+def test_registered_provider_plans_once_per_shape(echo) -> None:
+    cache = PlanCache()
+    for name in ("Ada", "Grace"):
+        result = transform(
+            {"full_name": name}, SCHEMA, llm_provider="echo", llm_mode="plan", llm_model="m", plan_cache=cache
+        )
+        assert result.payload == {"name": name}
+
+    assert len(echo.calls) == 1
+    assert result.plan.warnings[0] == "planned via echo llm (m)"
+
+
+def test_provider_registered_by_reference_is_imported_on_first_use() -> None:
+    register_provider("echo-ref", f"{__name__}:EchoProvider")
+    try:
+        provider = get_provider("echo-ref")
+        assert isinstance(provider, EchoProvider)
+        assert get_provider("echo-ref") is provider
+    finally:
+        unregister_provider("echo-ref")
+
+
+def test_provider_module_may_register_itself_while_imported(tmp_path) -> None:
+    (tmp_path / "selfreg_provider.py").write_text(
+        "from omni_api import LLMProvider, register_provider\n"
+        "class P(LLMProvider):\n"
+        "    name = 'selfreg'\n"
+        "    def generate(self, prompt, model, base_url):\n"
+        "        return {}\n"
+        "register_provider('selfreg-extra', P())\n"
+    )
+    code = (
+        "from omni_api.providers import get_provider, register_provider\n"
+        "register_provider('selfreg', 'selfreg_provider:P')\n"
+        "print(get_provider('selfreg').name, get_provider('selfreg-extra').name)\n"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(tmp_path), *sys.path])}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=10)
+
+    assert out.stdout.split() == ["selfreg", "selfreg"], out.stderr
+
+
+def test_entry_point_providers_are_discovered(monkeypatch) -> None:
+    entry_point = EntryPoint(name="echo-plugin", value=f"{__name__}:EchoProvider", group="omni_api.providers")
+    monkeypatch.setattr("importlib.metadata.entry_points", lambda group: [entry_point])
+    monkeypatch.setattr(providers_module, "_entry_points_loaded", False)
+    monkeypatch.setattr(providers_module, "_providers", dict(providers_module._providers))
+
+    assert "echo-plugin" in available_providers()
+    assert transform({"x": 1}, SCHEMA, llm_provider="echo-plugin", plan_cache=None).payload == {"name": "Echo"}
+
+
+def test_incomplete_providers_fail_when_registered_or_resolved() -> None:
+    class Incomplete(LLMProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    with pytest.raises(TypeError, match=r"does not implement \['generate'\]"):
+        register_provider("incomplete", Incomplete)
+    with pytest.raises(TypeError, match="is not an LLMProvider"):
+        register_provider("incomplete", object())
+    assert "incomplete" not in available_providers()
+
+    register_provider("incomplete-ref", f"{__name__}:LLMProvider")
+    try:
+        with pytest.raises(TypeError, match="does not implement"):
+            get_provider("incomplete-ref")
+    finally:
+        unregister_provider("incomplete-ref")
+
+
+def test_provider_classes_can_be_registered_directly() -> None:
+    register_provider("echo-class", EchoProvider)
+    try:
+        assert isinstance(get_provider("echo-class"), EchoProvider)
+    finally:
+        unregister_provider("echo-class")
+
+
+def test_unknown_provider_is_rejected() -> None:
+    with pytest.raises(ValueError, match="Unknown llm_provider 'nope'"):
+        transform({"x": 1}, SCHEMA, llm_provider="nope")
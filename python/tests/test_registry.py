@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+from omni_api import SchemaRegistry, TransformSchemaError, transform, transform_many
+from omni_api.cli import main
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def _write(root, route: str, schema: dict) -> None:
+    path = root / f"{route}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(schema))
+
+
+def test_routes_are_indexed_without_parsing(tmp_path) -> None:
+    _write(tmp_path, "crm/contact", SCHEMA)
+    (tmp_path / "crm" / "broken.json").write_text("{not json")
+    registry = SchemaRegistry(tmp_path)
+
+    assert registry.routes() == ["crm/broken", "crm/contact"]
+    assert "crm/contact" in registry and "crm/missing" not in registry
+    assert (len(registry), registry.loads) == (0, 0)
+    with pytest.raises(TransformSchemaError, match="not valid JSON"):
+        registry.get("crm/broken")
+
+
+def test_transform_by_route_compiles_once(tmp_path) -> None:
+    _write(tmp_path, "crm/contact", SCHEMA)
+    registry = SchemaRegistry(tmp_path, reload_interval=None)
+
+    first = transform({"full_name": "a"}, route="crm/contact", registry=registry)
+    results = list(transform_many([{"name": "b"}], route="crm/contact", registry=registry))
+
+    assert first.payload == {"name": "a"}
+    assert results[0].payload == {"name": "b"}
+    assert registry.loads == 1
+
+
+def test_changed_file_is_reloaded_after_interval(tmp_path) -> None:
+    now = [0.0]
+    _write(tmp_path, "crm/contact", SCHEMA)
+    registry = SchemaRegistry(tmp_path, reload_interval=5, clock=lambda: now[0])
+    original = registry.get("crm/contact")
+
+    updated = {**SCHEMA, "properties": {**SCHEMA["properties"], "email": {"type": "string"}}}
+    _write(tmp_path, "crm/contact", updated)
+    path = tmp_path / "crm" / "contact.json"
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert registry.get("crm/contact") is original
+
+    now[0] = 10.0
+    assert registry.get("crm/contact").allowed == {"name", "email"}
+    now[0] = 20.0
+    registry.get("crm/contact")
+    assert registry.loads == 2
+
+
+def test_bad_routes_and_arguments(tmp_path) -> None:
+    registry = SchemaRegistry(tmp_path)
+    with pytest.raises(TransformSchemaError, match="Unknown schema route"):
+        transform({"name": "a"}, route="crm/missing", registry=registry)
+    with pytest.raises(TransformSchemaError, match="provider/endpoint"):
+        registry.get("../etc")
+    with pytest.raises(TypeError):
+        transform({"name": "a"}, SCHEMA, route="crm/contact", registry=registry)
+    with pytest.raises(TypeError):
+        transform({"name": "a"})
+
+
+def test_cli_accepts_route(tmp_path) -> None:
+    _write(tmp_path / "schemas", "crm/contact", SCHEMA)
+    records = tmp_path / "in.ndjson"
+    records.write_text(json.dumps({"full_name": "a"}) + "\n")
+    out = tmp_path / "out.ndjson"
+
+    code = main([str(records), "--route", "crm/contact", "--schemas", str(tmp_path / "schemas"),
+                 "-o", str(out)])
+
+    assert code == 0
+    assert out.read_text() == json.dumps({"name": "a"}) + "\n"
@@ -0,0 +1,142 @@
+import copy
+import random
+
+import omni_api.planner as planner_module
+from omni_api import TransformPlan, dump_plan, load_plan
+from omni_api.planner import build_plan, replan, shape_diff
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "user_id": {},
+        "email": {},
+        "city": {},
+        "profile.email": {},
+        "items": {"type": "array", "items": {"type": "object", "properties": {"sku": {}, "qty": {}}}},
+    },
+}
+SOURCE = {
+    "userId": "u-1",
+    "contact": {"email": "a@example.com"},
+    "billing": {"email": "b@example.com", "city": "Springfield"},
+    "items": [{"sku": "a", "qty": 1}],
+    "noise": 1,
+}
+
+
+def _replan(previous, source, schema=SCHEMA, **options):
+    added, removed = shape_diff(previous, source)
+    return replan(previous, source, schema, added=added, removed=removed, **options)
+
+
+def test_shape_diff_reads_previous_paths_from_the_plan() -> None:
+    previous = build_plan(SOURCE, SCHEMA)
+    drifted = dict(SOURCE, tracking="t")
+    del drifted["noise"]
+
+    assert shape_diff(previous, drifted) == (["tracking"], ["noise"])
+
+
+def test_added_path_only_replans_the_targets_it_can_match(monkeypatch) -> None:
+    schema = {"type": "object", "properties": {"user_id": {}, "email": {}}}
+    source = {k: v for k, v in SOURCE.items() if k != "items"}
+    previous = build_plan(source, schema)
+    monkeypatch.setattr(planner_module, "SourceScan", None)  # a full re-plan would fail
+    drifted = dict(source, user_id="u-2", extra=1)
+
+    plan = _replan(previous, drifted, schema)
+
+    monkeypatch.undo()
+    assert plan == build_plan(drifted, schema)
+    assert plan.mappings[0].from_path == "user_id"
+    assert "userId" in plan.drops and "extra" in plan.drops
+
+
+def test_nested_ambiguity_warning_tracks_the_group() -> None:
+    previous = build_plan(SOURCE, SCHEMA)
+    assert any("candidates=['billing.email', 'contact.email']" in w for w in previous.warnings)
+    assert previous.ambiguous == (("email", ("billing.email", "contact.email")),)
+
+    fewer = copy.deepcopy(SOURCE)
+    del fewer["billing"]["email"]
+    plan = _replan(previous, fewer)
+    assert plan == build_plan(fewer, SCHEMA)
+    assert not plan.warnings
+
+    more = copy.deepcopy(SOURCE)
+    more["shipping"] = {"email": "c@example.com"}
+    assert _replan(previous, more) == build_plan(more, SCHEMA)
+
+
+def test_removed_mapping_without_known_alternatives_is_planned_from_scratch() -> None:
+    source = dict(SOURCE, user_id="u-1")
+    previous = build_plan(source, SCHEMA)
+    assert previous.mappings[0].from_path == "user_id"
+
+    plan = _replan(previous, SOURCE)
+
+    assert plan == build_plan(SOURCE, SCHEMA)
+    assert plan.mappings[0].from_path == "userId"
+
+
+def test_array_sub_plans_follow_the_new_element_shape() -> None:
+    previous = build_plan(SOURCE, SCHEMA)
+    drifted = dict(SOURCE, items=[{"sku": "a", "quantity": 1, "qty": 2}])
+
+    assert _replan(previous, drifted) == build_plan(drifted, SCHEMA)
+
+
+def test_bounded_or_summarized_plans_fall_back_to_a_full_build() -> None:
+    previous = build_plan(SOURCE, SCHEMA, drops="summary")
+    drifted = dict(SOURCE, email="e")
+
+    assert replan(previous, drifted, SCHEMA, added=["email"], drops="summary") == build_plan(
+        drifted, SCHEMA, drops="summary"
+    )
+    assert replan(build_plan(SOURCE, SCHEMA, max_depth=1), drifted, SCHEMA, added=["email"], max_depth=1) == (
+        build_plan(drifted, SCHEMA, max_depth=1)
+    )
+
+
+def test_replan_matches_full_build_on_random_drift() -> None:
+    rng = random.Random(7)
+    top = ["user_id", "userid", "UserId", "user", "id", "user_id_code", "email", "e_mail", "city", "items"]
+    leaves = ["email", "user_id", "userId", "city", "zip"]
+    schema = copy.deepcopy(SCHEMA)
+    schema["properties"].update({"id": {}, "user": {}, "zip": {}})
+
+    def random_source() -> dict:
+        source: dict = {key: 1 for key in rng.sample(top, rng.randint(0, len(top)))}
+        if "items" in source:
+            source["items"] = [{"sku": "x", "qty": 1}]
+        for group in rng.sample(["a", "b", "profile"], rng.randint(0, 3)):
+            source[group] = {leaf: 1 for leaf in rng.sample(leaves, rng.randint(0, 3))}
+        return source
+
+    for _ in range(500):
+        source = random_source()
+        drifted = copy.deepcopy(source)
+        for _ in range(rng.randint(1, 3)):
+            if drifted and rng.random() < 0.4:
+                del drifted[rng.choice(list(drifted))]
+            elif rng.random() < 0.5:
+                drifted[rng.choice(top)] = 2
+            else:
+                group = drifted.setdefault(rng.choice(["a", "b", "profile"]), {})
+                if isinstance(group, dict):
+                    group[rng.choice(leaves)] = 2
+        assert _replan(build_plan(source, schema), drifted, schema) == build_plan(drifted, schema)
+
+
+def test_ambiguity_candidates_are_read_from_the_plan_not_its_warnings() -> None:
+    previous = load_plan(dump_plan(build_plan(SOURCE, SCHEMA)))
+    assert previous.ambiguous == (("email", ("billing.email", "contact.email")),)
+    fewer = copy.deepcopy(SOURCE)
+    del fewer["contact"]["email"]
+    assert _replan(previous, fewer) == build_plan(fewer, SCHEMA)
+
+    # Warnings without recorded candidates (e.g. older plan files) are planned from scratch.
+    legacy = TransformPlan(
+        mappings=previous.mappings, drops=previous.drops, required=previous.required, warnings=previous.warnings
+    )
+    assert _replan(legacy, fewer) == build_plan(fewer, SCHEMA)
@@ -0,0 +1,68 @@
+import pytest
+
+from omni_api import (
+    Mapping,
+    PlanCache,
+    ReportCounts,
+    TransformPlan,
+    apply_plan,
+    compile_plan,
+    transform,
+)
+from omni_api.planner import build_plan
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+SOURCE = {"full_name": "a", "contact": {"email": "x"}, "age": 3, "extra": {"x": 1}}
+
+
+def test_report_modes_share_the_payload() -> None:
+    cache = PlanCache()
+    full = transform(SOURCE, SCHEMA, plan_cache=cache)
+    counts = transform(SOURCE, SCHEMA, plan_cache=cache, report="counts")
+    none = transform(SOURCE, SCHEMA, plan_cache=cache, report="none")
+
+    assert full.payload == counts.payload == none.payload
+    assert none.report is None
+    assert counts.report == ReportCounts(
+        mapped=len(full.report.mapped),
+        dropped=len(full.report.dropped),
+        warnings=len(full.report.warnings),
+    )
+
+
+def test_counts_include_missing_path_warnings() -> None:
+    plan = TransformPlan(
+        mappings=[
+            Mapping(from_path="name", to_key="name"),
+            Mapping(from_path="contact.email", to_key="email"),
+        ],
+        warnings=["planned"],
+    )
+    compiled = compile_plan(plan, SCHEMA)
+
+    _, full = compiled({"name": "a"})
+    _, counts = compiled({"name": "a"}, "counts")
+    assert counts == ReportCounts(mapped=1, dropped=0, warnings=2)
+    assert len(full.warnings) == counts.warnings
+
+
+def test_apply_plan_report_modes() -> None:
+    plan = build_plan(SOURCE, SCHEMA)
+    payload, full = apply_plan(SOURCE, SCHEMA, plan)
+    assert apply_plan(SOURCE, SCHEMA, plan, report="none") == (payload, None)
+    _, counts = apply_plan(SOURCE, SCHEMA, plan, report="counts")
+    assert (counts.mapped, counts.dropped) == (len(full.mapped), len(full.dropped))
+
+
+def test_timings_attach_to_counts() -> None:
+    result = transform(SOURCE, SCHEMA, plan_cache=None, report="counts", timings=True)
+    assert "total" in result.report.timings
+
+
+def test_invalid_report_mode() -> None:
+    with pytest.raises(ValueError, match="report must be one of"):
+        transform(SOURCE, SCHEMA, report="partial")
@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+import pytest
+
+from omni_api import PlanCache, SchemaRegistry
+from omni_api.serve import TransformServer, main
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+@pytest.fixture
+def registry(tmp_path) -> SchemaRegistry:
+    (tmp_path / "crm").mkdir()
+    (tmp_path / "crm" / "person.json").write_text(json.dumps(SCHEMA), encoding="utf-8")
+    return SchemaRegistry(tmp_path)
+
+
+async def _request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    method: str,
+    path: str,
+    body: dict | None = None,
+) -> tuple[int, dict[str, str], dict]:
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n\r\n".encode("latin-1")
+        + data
+    )
+    await writer.drain()
+    status = int((await reader.readuntil(b"\r\n")).split()[1])
+    headers = {}
+    while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    payload = json.loads(await reader.readexactly(int(headers["content-length"])))
+    return status, headers, payload
+
+
+def _serve(registry: SchemaRegistry, **options) -> TransformServer:
+    return TransformServer(registry, port=0, plan_cache=PlanCache(), **options)
+
+
+def test_transform_and_batch_share_one_keep_alive_connection(registry) -> None:
+    async def run() -> list:
+        async with _serve(registry) as server:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            one = await _request(reader, writer, "POST", "/transform", {
+                "route": "crm/person",
+                "payload": {"full_name": "Ada", "contact": {"email": "a@x"}},
+            })
+            batch = await _request(reader, writer, "POST", "/transform/batch", {
+                "route": "crm/person",
+                "records": [{"full_name": "Bo", "contact": {"email": "b@x"}}, {"other": 1}],
+                "report": "none",
+            })
+            health = await _request(reader, writer, "GET", "/healthz")
+            writer.close()
+            hits = server.plan_cache.stats().hits
+            return [one, batch, health, hits]
+
+    one, batch, health, hits = asyncio.run(run())
+    assert one[0] == 200
+    assert one[1]["connection"] == "keep-alive"
+    assert one[2]["payload"] == {"name": "Ada", "email": "a@x"}
+    assert one[2]["report"]["mapped"] == ["email", "name"]
+    assert batch[0] == 200
+    assert batch[2]["results"][0] == {"payload": {"name": "Bo", "email": "b@x"}, "report": None}
+    assert batch[2]["results"][1]["index"] == 1
+    assert "Missing required fields" in batch[2]["results"][1]["error"]
+    assert batch[2]["errors"] == 1
+    assert health[2]["served"] == 2
+    assert hits == 1
+
+
+def test_error_statuses(registry) -> None:
+    async def run() -> list[tuple[int, dict]]:
+        async with _serve(registry) as server:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            responses = [
+                await _request(reader, writer, "POST", "/transform", {"route": "crm/nope", "payload": {}}),
+                await _request(reader, writer, "POST", "/transform", {"route": "crm/person", "payload": {}}),
+                await _request(reader, writer, "POST", "/transform", {"route": "crm/person"}),
+                await _request(reader, writer, "GET", "/transform"),
+                await _request(reader, writer, "POST", "/elsewhere", {}),
+            ]
+            writer.close()
+            return [(status, body) for status, _, body in responses]
+
+    statuses = [status for status, _ in asyncio.run(run())]
+    assert statuses == [404, 422, 400, 405, 404]
+
+
+def test_full_queue_answers_503(registry, ollama_stub) -> None:
+    ollama_stub.delay = 0.3
+
+    async def run() -> list[int]:
+        server = _serve(
+            registry,
+            workers=1,
+            queue_size=1,
+            llm_provider="ollama",
+            llm_base_url=ollama_stub.base_url,
+        )
+        async with server:
+            async def call() -> tuple[int, dict[str, str]]:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                status, headers, _ = await _request(
+                    reader, writer, "POST", "/transform", {"route": "crm/person", "payload": {"x": 1}}
+                )
+                writer.close()
+                return status, headers
+
+            first = asyncio.create_task(call())
+            while not ollama_stub.requests:
+                await asyncio.sleep(0.01)
+            rest = await asyncio.gather(call(), call())
+            responses = [await first, *rest]
+            assert server.rejected == 1
+            rejected = [headers for status, headers in responses if status == 503]
+            assert rejected[0]["retry-after"] == "1"
+            return sorted(status for status, _ in responses)
+
+    assert asyncio.run(run()) == [200, 200, 503]
+
+
+def test_main_rejects_bad_options() -> None:
+    with pytest.raises(SystemExit):
+        main(["--workers", "0"])
+
+
+def test_main_reports_a_broken_plan_store(tmp_path, capsys) -> None:
+    (tmp_path / "abc").mkdir()
+    (tmp_path / "abc" / "schema.json").write_text("{not json")
+    with pytest.raises(SystemExit) as exc:
+        main(["--plan-store", str(tmp_path)])
+
+    assert exc.value.code == 2
+    assert "--plan-store" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("size_line", [b"zz\r\n", b"-1\r\n"])
+def test_bad_chunk_size_is_a_client_error(registry, size_line: bytes) -> None:
+    async def run() -> int:
+        async with _serve(registry) as server:
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(
+                b"POST /transform HTTP/1.1\r\nHost: test\r\nTransfer-Encoding: chunked\r\n\r\n" + size_line
+            )
+            await writer.drain()
+            status = int((await reader.readuntil(b"\r\n")).split()[1])
+            writer.close()
+            return status
+
+    assert asyncio.run(run()) == 400
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+
+import pytest
+
+from omni_api import (
+    MetricsCollector,
+    SingleFlight,
+    TransformValidationError,
+    default_singleflight,
+    register_observer,
+    transform,
+    transform_async,
+    unregister_observer,
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def _run_threads(count: int, target) -> list:
+    barrier = threading.Barrier(count)
+    results: list = [None] * count
+
+    def run(i: int) -> None:
+        barrier.wait()
+        try:
+            results[i] = target()
+        except Exception as exc:
+            results[i] = exc
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_identical_threaded_calls_share_one_request(ollama_stub) -> None:
+    ollama_stub.delay = 0.2
+    before = default_singleflight.stats()
+    collector = MetricsCollector()
+    register_observer(collector)
+    try:
+        results = _run_threads(
+            6,
+            lambda: transform({"x": 1}, SCHEMA, llm_provider="ollama", llm_base_url=ollama_stub.base_url),
+        )
+    finally:
+        unregister_observer(collector)
+
+    after = default_singleflight.stats()
+    assert len(ollama_stub.requests) == 1
+    assert [r.payload for r in results] == [{"name": "Stub"}] * 6
+    assert len({id(r.payload) for r in results}) == 6
+    assert after.calls - before.calls == 1
+    assert after.coalesced - before.coalesced == 5
+    assert collector.snapshot()["events"]["llm.coalesced"] == 5
+
+
+def test_waiters_receive_the_leaders_error(ollama_stub) -> None:
+    ollama_stub.delay = 0.2
+    ollama_stub.fail_next = 1
+
+    results = _run_threads(
+        4,
+        lambda: transform({"y": 1}, SCHEMA, llm_provider="ollama", llm_base_url=ollama_stub.base_url),
+    )
+
+    assert len(ollama_stub.requests) == 1
+    assert all(isinstance(r, TransformValidationError) for r in results)
+
+
+def test_concurrent_identical_async_calls_share_one_request(ollama_stub) -> None:
+    ollama_stub.delay = 0.2
+
+    async def run() -> list:
+        return await asyncio.gather(
+            *(
+                transform_async({"z": 1}, SCHEMA, llm_provider="ollama", llm_base_url=ollama_stub.base_url)
+                for _ in range(5)
+            )
+        )
+
+    results = asyncio.run(run())
+    assert len(ollama_stub.requests) == 1
+    assert [r.payload for r in results] == [{"name": "Stub"}] * 5
+
+
+def test_sequential_calls_are_not_coalesced() -> None:
+    flight = SingleFlight()
+    calls = []
+
+    for _ in range(3):
+        value, shared = flight.do("k", lambda: calls.append(1) or {"v": len(calls)})
+        assert not shared
+
+    assert len(calls) == 3
+    assert flight.stats().calls == 3
+    assert flight.stats().in_flight == 0
+
+
+def test_cancelled_async_leader_hands_over_to_a_waiter() -> None:
+    flight = SingleFlight()
+    started = []
+
+    async def slow() -> dict:
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return {"v": len(started)}
+
+    async def run() -> tuple:
+        leader = asyncio.ensure_future(flight.do_async("k", slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(flight.do_async("k", slow))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    value, shared = asyncio.run(run())
+    assert value == {"v": 2}
+    assert not shared
+    assert flight.stats().in_flight == 0
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from omni_api import AsyncOllamaClient, RecordError, TransformValidationError, transform_async, transform_many_async
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "idx": {"type": "number"}},
+    "required": ["name"],
+}
+
+
+def _echo_index(body: dict) -> str:
+    source = json.loads(body["prompt"].split("source_payload:\n", 1)[1].split("\n", 1)[0])
+    if "bad" in source:
+        return json.dumps({"idx": source["i"]})
+    return "Sure! " + json.dumps({"name": "n", "idx": source["i"]})
+
+
+def test_transform_async_deterministic_path() -> None:
+    result = asyncio.run(transform_async({"full_name": "Jo"}, SCHEMA))
+    assert result.payload == {"name": "Jo"}
+
+
+def test_transform_async_calls_ollama(ollama_stub) -> None:
+    result = asyncio.run(
+        transform_async({"x": 1}, SCHEMA, llm_provider="ollama", llm_base_url=ollama_stub.base_url)
+    )
+    assert result.payload == {"name": "Stub"}
+    assert ollama_stub.requests[0]["stream"] is False
+
+
+def test_transform_many_async_reuses_connections_in_order(ollama_stub) -> None:
+    ollama_stub.respond = _echo_index
+
+    async def run() -> tuple[list, int]:
+        async with AsyncOllamaClient(ollama_stub.base_url, max_in_flight=2) as client:
+            results = [
+                r async for r in transform_many_async(
+                    [{"i": i} for i in range(12)], SCHEMA, llm_provider="ollama", client=client
+                )
+            ]
+            return results, client.connections_opened
+
+    results, opened = asyncio.run(run())
+    assert [r.payload["idx"] for r in results] == list(range(12))
+    assert opened <= 2
+    assert ollama_stub.connections <= 2
+
+
+def test_transform_many_async_collects_errors(ollama_stub) -> None:
+    ollama_stub.respond = _echo_index
+
+    async def run() -> list:
+        return [
+            r async for r in transform_many_async(
+                [{"i": 0}, {"i": 1, "bad": True}, {"i": 2}],
+                SCHEMA,
+                errors="collect",
+                llm_provider="ollama",
+                llm_base_url=ollama_stub.base_url,
+            )
+        ]
+
+    results = asyncio.run(run())
+    assert isinstance(results[1], RecordError)
+    assert results[1].index == 1
+    assert results[2].payload == {"name": "n", "idx": 2}
+
+
+def test_client_retries_with_backoff(ollama_stub) -> None:
+    ollama_stub.fail_next = 2
+
+    async def run(retries: int) -> str:
+        async with AsyncOllamaClient(ollama_stub.base_url, retries=retries, backoff=0.01) as client:
+            return await client.generate("m", "p")
+
+    assert json.loads(asyncio.run(run(2))) == {"name": "Stub"}
+    assert len(ollama_stub.requests) == 3
+
+    ollama_stub.fail_next = 1
+    with pytest.raises(TransformValidationError, match="503"):
+        asyncio.run(run(0))
+
+
+def test_client_enforces_per_request_timeout(ollama_stub) -> None:
+    ollama_stub.delay = 0.5
+
+    async def run() -> str:
+        async with AsyncOllamaClient(ollama_stub.base_url, timeout=0.05, retries=0) as client:
+            return await client.generate("m", "p")
+
+    with pytest.raises(TransformValidationError, match="connection failed"):
+        asyncio.run(run())
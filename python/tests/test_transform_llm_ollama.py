@@ -2,12 +2,12 @@ from __future__ import annotations
 
 from typing import Any
 
-import omni_api.api as api_module
+import omni_api.providers.ollama as ollama_module
 from omni_api import transform
 
 
 def test_transform_uses_ollama_llm_when_provider_selected(monkeypatch) -> None:
-    monkeypatch.setattr(api_module, "_ollama_generate", lambda *args, **kwargs: {
+    monkeypatch.setattr(ollama_module, "_generate", lambda *args, **kwargs: {
         "name": "Jane Doe",
         "age": 28,
         "email": "jane@example.com",
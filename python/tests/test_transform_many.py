@@ -0,0 +1,56 @@
+import pytest
+
+from omni_api import PlanCache, RecordError, TransformSchemaError, TransformValidationError, transform_many
+
+SCHEMA = {
+    "type": "object",
+    "properties": {"name": {"type": "string"}, "email": {"type": "string"}},
+    "required": ["name"],
+}
+
+
+def test_transform_many_yields_lazily_and_reuses_plans() -> None:
+    consumed = []
+
+    def records():
+        for i in range(3):
+            consumed.append(i)
+            yield {"name": f"n{i}", "contact": {"email": f"e{i}"}}
+
+    cache = PlanCache()
+    results = transform_many(records(), SCHEMA, plan_cache=cache)
+    assert consumed == []
+
+    first = next(results)
+    assert consumed == [0]
+    assert first.payload == {"name": "n0", "email": "e0"}
+
+    rest = list(results)
+    assert [r.payload["name"] for r in rest] == ["n1", "n2"]
+    assert rest[-1].plan is first.plan
+    assert cache.stats().misses == 1
+    assert cache.stats().hits == 2
+
+
+def test_transform_many_raises_on_first_error_by_default() -> None:
+    results = transform_many([{"name": "a"}, {"email": "b"}, {"name": "c"}], SCHEMA)
+    assert next(results).payload == {"name": "a"}
+    with pytest.raises(TransformValidationError):
+        next(results)
+
+
+def test_transform_many_collects_errors() -> None:
+    results = list(
+        transform_many([{"name": "a"}, {"email": "b"}, {"name": "c"}], SCHEMA, errors="collect")
+    )
+
+    assert isinstance(results[1], RecordError)
+    assert results[1].index == 1
+    assert results[1].source_payload == {"email": "b"}
+    assert isinstance(results[1].error, TransformValidationError)
+    assert results[2].payload == {"name": "c"}
+
+
+def test_transform_many_validates_schema_eagerly() -> None:
+    with pytest.raises(TransformSchemaError):
+        transform_many([], {"type": "array"})
@@ -0,0 +1,137 @@
+import pytest
+
+from omni_api import TransformValidationError, compile_schema, transform
+from omni_api.validator import compile_validator, validate_payload
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "age": {"type": "integer"},
+        "score": {"type": "number"},
+        "active": {"type": "boolean"},
+        "nickname": {"type": ["string", "null"]},
+        "extra": {},
+    },
+    "required": ["name"],
+}
+
+
+def test_matching_types_pass() -> None:
+    payload = {"name": "Ada", "age": 36, "score": 1, "active": False, "nickname": None, "extra": [1]}
+    assert validate_payload(payload, SCHEMA, ["name"]) == []
+
+
+def test_type_mismatch_raises_with_key_and_types() -> None:
+    with pytest.raises(TransformValidationError, match=r"age: expected integer, got str"):
+        validate_payload({"name": "Ada", "age": "36"}, SCHEMA, ["name"])
+
+
+def test_bool_is_not_a_number_but_integral_float_is_an_integer() -> None:
+    with pytest.raises(TransformValidationError, match=r"score: expected number, got bool"):
+        validate_payload({"name": "Ada", "score": True}, SCHEMA, [])
+    assert validate_payload({"name": "Ada", "age": 36.0}, SCHEMA, []) == []
+    with pytest.raises(TransformValidationError, match=r"age: expected integer, got float"):
+        validate_payload({"name": "Ada", "age": 36.5}, SCHEMA, [])
+
+
+def test_union_types_and_untyped_properties() -> None:
+    with pytest.raises(TransformValidationError, match=r"nickname: expected string or null, got int"):
+        validate_payload({"name": "Ada", "nickname": 3}, SCHEMA, [])
+    assert validate_payload({"name": "Ada", "extra": object()}, SCHEMA, []) == []
+
+
+@pytest.mark.parametrize("declared", [5, None, ["string", ["null"]], ["string", {"x": 1}], {"type": "string"}])
+def test_malformed_type_declarations_are_left_unchecked(declared) -> None:
+    schema = {"type": "object", "properties": {"name": {"type": declared}}}
+    assert validate_payload({"name": 3}, schema, []) == []
+
+
+def test_missing_fields_are_reported_before_type_mismatches() -> None:
+    with pytest.raises(TransformValidationError, match=r"Missing required fields: \['name'\]"):
+        validate_payload({"age": "x"}, SCHEMA, ["name"])
+
+
+def test_coerce_converts_string_scalars_in_place() -> None:
+    payload = {"name": "Ada", "age": "42", "score": "1.5", "active": "TRUE"}
+    validate_payload(payload, SCHEMA, ["name"], coerce=True)
+    assert payload == {"name": "Ada", "age": 42, "score": 1.5, "active": True}
+
+    with pytest.raises(TransformValidationError, match=r"age: expected integer, got str"):
+        validate_payload({"name": "Ada", "age": "4.2"}, SCHEMA, [], coerce=True)
+
+
+def test_transform_threads_coerce() -> None:
+    source = {"name": "Ada", "age": "42"}
+    with pytest.raises(TransformValidationError, match="Type mismatch"):
+        transform(source, SCHEMA)
+    assert transform(source, SCHEMA, coerce=True).payload == {"name": "Ada", "age": 42}
+
+
+def test_array_item_types_are_checked_per_element() -> None:
+    schema = {
+        "type": "object",
+        "properties": {
+            "items": {
+                "type": "array",
+                "items": {"type": "object", "properties": {"qty": {"type": "integer"}}, "required": ["qty"]},
+            }
+        },
+    }
+    with pytest.raises(TransformValidationError, match=r"items\[1\]\.qty: expected integer, got str"):
+        validate_payload({"items": [{"qty": 1}, {"qty": "two"}]}, schema, [])
+    with pytest.raises(TransformValidationError, match=r"items\[0\]\.qty"):
+        validate_payload({"items": [{}]}, schema, [])
+
+    payload = {"items": [{"qty": "2"}]}
+    validate_payload(payload, schema, [], coerce=True)
+    assert payload == {"items": [{"qty": 2}]}
+
+
+def test_validator_is_compiled_once_per_schema() -> None:
+    compiled = compile_schema(SCHEMA)
+    assert compiled.validator is compiled.validator
+
+
+def test_dict_schemas_reuse_a_cached_validator() -> None:
+    schema = {"type": "object", "properties": {"n": {"type": "integer"}}}
+    first = compile_validator(schema)
+
+    assert compile_validator(dict(schema)) is first
+    schema["properties"]["n"] = {"type": "string"}
+    assert compile_validator(schema) is not first
+    assert validate_payload({"n": "x"}, schema, []) == []
+
+
+def test_transform_with_a_dict_schema_reuses_the_compiled_validator(monkeypatch) -> None:
+    import omni_api.validator as validator_module
+
+    built = []
+    original = validator_module.PayloadValidator.__init__
+
+    def counting_init(self, schema):
+        built.append(schema)
+        original(self, schema)
+
+    monkeypatch.setattr(validator_module.PayloadValidator, "__init__", counting_init)
+    schema = {"type": "object", "properties": {"name": {"type": "string"}, "zone": {"type": "integer"}}}
+    for name in ("a", "b", "c"):
+        transform({"name": name}, schema)
+    transform({"name": "d"}, dict(schema))
+
+    assert len(built) == 1
+    schema["properties"]["zone"] = {"type": "string"}
+    assert transform({"name": "e", "zone": "z"}, schema).payload == {"name": "e", "zone": "z"}
+    assert len(built) == 2
+
+
+def test_check_column_reports_failing_rows_and_skips_unresolved_cells() -> None:
+    validator = compile_validator(SCHEMA)
+    values = [1, "2", "x", None, 3.5]
+
+    assert validator.check_column("age", list(values), skip=[3]) == ([1, 2, 4], "age: expected integer, got str")
+    coerced = list(values)
+    bad, _ = validator.check_column("age", coerced, skip=[3], coerce=True)
+    assert bad == [2, 4]
+    assert coerced[1] == 2
+    assert validator.check_column("extra", list(values)) == ([], None)